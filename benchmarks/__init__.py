@@ -0,0 +1,9 @@
+"""Benchmarks for the LevelUp server
+
+Each module is a standalone script run from the project root, e.g.
+
+    python -m benchmarks.explain_indexes
+
+Scripts build their own throwaway SQLite database and never touch
+db.sqlite3.
+"""
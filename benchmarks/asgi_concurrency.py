@@ -0,0 +1,163 @@
+"""Compare how many slow clients WSGI threads and the ASGI views serve at once
+
+    python -m benchmarks.asgi_concurrency --threads 8 --client-delay 0.2
+
+Fires batches of concurrent GET --path requests at the app in process,
+through Django's WSGIHandler on a pool of --threads worker threads and
+through its ASGIHandler on one event loop with levelup.urls_asgi. Each
+client takes --client-delay seconds to receive its body: a WSGI worker
+is blocked for that long, an async view only awaits it. For each level
+of concurrency this prints the time to serve the whole batch, requests
+per second and the peak number of threads.
+
+WSGI tops out at --threads / --client-delay requests per second. The
+ASGI handler runs each request's async ORM calls on a thread of that
+request's own (Django's per-request ThreadSensitiveContext), so its
+thread count follows the number of clients, but those threads sit idle
+while the clients read and throughput is bound by CPU instead.
+"""
+import argparse
+import asyncio
+import io
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from benchmarks.datagen import SCALES, seed
+from benchmarks.utils import setup_django
+
+
+class PeakThreads:
+    """Sample threading.active_count() in the background"""
+
+    def __init__(self):
+        self.peak = threading.active_count()
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        while not self._done.wait(0.005):
+            self.peak = max(self.peak, threading.active_count())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._done.set()
+        self._thread.join()
+        # Leave the sampler itself out
+        self.peak -= 1
+
+
+def run_wsgi(path, token, concurrency, threads, client_delay):
+    """Serve one batch on a thread pool, each worker also feeding its slow client"""
+    # pylint: disable=import-outside-toplevel
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.db import connections
+
+    app = WSGIHandler()
+
+    def request():
+        environ = {
+            'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': '',
+            'SERVER_NAME': 'testserver', 'SERVER_PORT': '80',
+            'HTTP_AUTHORIZATION': f"Token {token}", 'wsgi.input': io.BytesIO(),
+            'wsgi.url_scheme': 'http',
+        }
+        statuses = []
+        body = b''.join(app(environ, lambda status, headers: statuses.append(status)))
+        time.sleep(client_delay)
+        connections.close_all()
+        return statuses[0], body
+
+    with PeakThreads() as peak, ThreadPoolExecutor(max_workers=threads) as pool:
+        start = time.perf_counter()
+        results = list(pool.map(lambda _: request(), range(concurrency)))
+        elapsed = time.perf_counter() - start
+    assert all(status.startswith('200') for status, _ in results), results[0][0]
+    return elapsed, peak.peak
+
+
+def run_asgi(path, token, concurrency, client_delay):
+    """Serve one batch on the event loop, every client awaiting its slow body"""
+    # pylint: disable=import-outside-toplevel
+    from django.core.handlers.asgi import ASGIHandler
+
+    app = ASGIHandler()
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': 'GET', 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+        'query_string': b'', 'root_path': '', 'server': ('testserver', 80),
+        'client': ('127.0.0.1', 50000),
+        'headers': [(b'host', b'testserver'), (b'authorization', f"Token {token}".encode())],
+    }
+
+    async def request():
+        statuses = []
+        sent = False
+
+        async def receive():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            # The client never hangs up early
+            await asyncio.Event().wait()
+            return None
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                statuses.append(message['status'])
+            elif not message.get('more_body'):
+                await asyncio.sleep(client_delay)
+
+        await app(scope, receive, send)
+        return statuses[0]
+
+    async def batch():
+        return await asyncio.gather(*(request() for _ in range(concurrency)))
+
+    with PeakThreads() as peak:
+        start = time.perf_counter()
+        results = asyncio.run(batch())
+        elapsed = time.perf_counter() - start
+    assert all(status == 200 for status in results), results[0]
+    return elapsed, peak.peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--path', default='/gametypes')
+    parser.add_argument('--scale', choices=SCALES, default='1k')
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--client-delay', type=float, default=0.2)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[8, 32, 128, 512])
+    args = parser.parse_args()
+
+    setup_django()
+
+    # pylint: disable=import-outside-toplevel
+    from django.conf import settings
+    from rest_framework.authtoken.models import Token
+    from levelupapi.models import Gamer
+
+    settings.DEBUG = False
+    settings.ALLOWED_HOSTS = ['testserver']
+    seed(**SCALES[args.scale])
+    user = Gamer.objects.order_by('pk').first().user
+    token = Token.objects.get_or_create(user=user)[0].key
+
+    print(f"GET {args.path}, {args.threads} WSGI threads, {args.client_delay * 1000:.0f} ms per client")
+    print(f"{'clients':>8} {'wsgi s':>8} {'req/s':>8} {'threads':>8} "
+          f"{'asgi s':>8} {'req/s':>8} {'threads':>8}")
+    for concurrency in args.concurrency:
+        settings.ROOT_URLCONF = 'levelup.urls'
+        wsgi_s, wsgi_threads = run_wsgi(args.path, token, concurrency, args.threads, args.client_delay)
+        settings.ROOT_URLCONF = 'levelup.urls_asgi'
+        asgi_s, asgi_threads = run_asgi(args.path, token, concurrency, args.client_delay)
+        print(f"{concurrency:>8} {wsgi_s:>8.2f} {concurrency / wsgi_s:>8.1f} {wsgi_threads:>8} "
+              f"{asgi_s:>8.2f} {concurrency / asgi_s:>8.1f} {asgi_threads:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""Compare the ways levelupreports can read a large raw SQL result set
+
+    python -m benchmarks.cursor_helpers --rows 1000000
+
+Generates --rows rows shaped like the events report (a date, a time, a
+name, an id and a title) with a recursive CTE, so no seeding is needed,
+and reads them back in each mode:
+
+  dicts      fetchall() and a dict per row, the old dict_fetch_all
+  tuples     fetchall() as plain tuples, the floor for a held result
+  namedtuple list(iter_rows()), held in memory as namedtuples
+  iter_rows  iter_rows() consumed a row at a time, nothing held
+  columns    fetch_columns(), one list per column
+
+Time is the median of --repeat runs; peak memory is measured in one
+extra run under tracemalloc, which slows it down.
+"""
+import argparse
+import tracemalloc
+from benchmarks.utils import setup_django, timed
+
+QUERY = """
+    WITH RECURSIVE seq(n) AS (
+        SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < %s
+    )
+    SELECT
+    date('2021-01-01', '+' || (n %% 365) || ' days') AS date,
+    printf('%%02d:00:00', n %% 24) AS time,
+    'Gamer ' || (n %% 1000) AS full_name,
+    n %% 1000 AS gamer_id,
+    'Game ' || (n %% 500) AS game_title
+    FROM seq
+"""
+
+
+def dict_fetch_all(cursor):
+    """The helper the reports used before iter_rows"""
+    columns = [col[0] for col in cursor.description]
+    return [
+        dict(zip(columns, row))
+        for row in cursor.fetchall()
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    setup_django()
+
+    # pylint: disable=import-outside-toplevel
+    from django.conf import settings
+    from django.db import connection
+    from levelupreports.views.helpers import fetch_columns, iter_rows
+
+    settings.DEBUG = False
+
+    def consume(rows):
+        count = 0
+        for row in rows:
+            count += row.gamer_id >= 0
+        return count
+
+    modes = {
+        'dicts': dict_fetch_all,
+        'tuples': lambda cursor: cursor.fetchall(),
+        'namedtuple': lambda cursor: list(iter_rows(cursor)),
+        'iter_rows': lambda cursor: consume(iter_rows(cursor)),
+        'columns': fetch_columns,
+    }
+
+    def run(read):
+        with connection.cursor() as db_cursor:
+            db_cursor.execute(QUERY, [args.rows])
+            return read(db_cursor)
+
+    baseline = run(lambda cursor: len(cursor.fetchall()))
+    assert baseline == args.rows, baseline
+
+    print(f"{args.rows} rows")
+    print(f"{'mode':<11} {'ms':>8} {'peak MB':>8}")
+    for name, read in modes.items():
+        elapsed = timed(lambda read=read: run(read), args.repeat)
+
+        tracemalloc.start()
+        result = run(read)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del result
+
+        print(f"{name:<11} {elapsed:>8.0f} {peak / 1024 / 1024:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+"""Synthetic LevelUp data for benchmarks
+
+    python -m benchmarks.datagen --scale 100k --db /tmp/levelup-100k.sqlite3
+
+Rows are generated and inserted a batch at a time, so even the 1m scale
+(a million events and three million attendances) seeds in bounded memory.
+"""
+import argparse
+import datetime
+import random
+from benchmarks.utils import setup_django
+
+# Row counts per table for each named scale; the name is the event count
+SCALES = {
+    '1k': {'gamers': 100, 'games': 100, 'events': 1000, 'attendances': 3000},
+    '10k': {'gamers': 1000, 'games': 1000, 'events': 10000, 'attendances': 30000},
+    '100k': {'gamers': 10000, 'games': 10000, 'events': 100000, 'attendances': 300000},
+    '1m': {'gamers': 100000, 'games': 100000, 'events': 1000000, 'attendances': 3000000},
+}
+
+GAME_TYPE_LABELS = ("Board game", "Card game", "Tabletop RPG", "Video game", "Dice game")
+BATCH_SIZE = 5000
+
+
+def _batches(count):
+    for start in range(0, count, BATCH_SIZE):
+        yield range(start, min(start + BATCH_SIZE, count))
+
+
+def seed(gamers=100, games=200, events=1000, attendances=5000, seed_value=42):
+    """Bulk insert a reproducible LevelUp dataset
+
+    Method arguments:
+      gamers -- Number of users and gamers to create
+      games -- Number of games, spread across the gamers
+      events -- Number of events, spread across the games
+      attendances -- Number of (event, gamer) attendance rows, spread across the events
+      seed_value -- Seed for the random generator so runs are comparable
+
+    Returns:
+        dict -- Number of rows inserted per table
+    """
+    # pylint: disable=import-outside-toplevel
+    from django.contrib.auth.models import User
+    from django.db import transaction
+    from levelupapi.models import Event, EventGamer, Game, GameType, Gamer
+    from levelupapi.models.event import event_start
+    from levelupreports.summaries import EVENTS, GAMES, rebuild
+
+    rng = random.Random(seed_value)
+    start_date = datetime.date(2021, 1, 1)
+    per_event, extra = divmod(attendances, max(events, 1))
+    attendance_count = 0
+
+    with transaction.atomic():
+        game_type_ids = [
+            game_type.pk for game_type in GameType.objects.bulk_create(
+                [GameType(label=label) for label in GAME_TYPE_LABELS])
+        ]
+
+        gamer_ids = []
+        for batch in _batches(gamers):
+            users = User.objects.bulk_create([
+                User(username=f"gamer{i}", first_name=f"First{i}",
+                     last_name=f"Last{i}", password="!")
+                for i in batch
+            ])
+            gamer_ids.extend(gamer.pk for gamer in Gamer.objects.bulk_create([
+                Gamer(user=user, bio="Seeded gamer") for user in users
+            ]))
+
+        game_ids = []
+        for batch in _batches(games):
+            game_ids.extend(game.pk for game in Game.objects.bulk_create([
+                Game(
+                    game_type_id=rng.choice(game_type_ids),
+                    title=f"Game {i}",
+                    maker=f"Maker {i % 37}",
+                    gamer_id=rng.choice(gamer_ids),
+                    number_of_players=rng.randint(2, 12),
+                    skill_level=rng.randint(1, 5)
+                )
+                for i in batch
+            ]))
+
+        def new_event(i, roster):
+            # Keep the draw order so a seed always gives the same dataset
+            game_id = rng.choice(game_ids)
+            date = start_date + datetime.timedelta(days=rng.randint(0, 730))
+            time = datetime.time(rng.randint(8, 22), rng.choice((0, 15, 30, 45)))
+            # bulk_create skips Event.save(), so starts_at is set here
+            return Event(
+                game_id=game_id,
+                description=f"Event {i}",
+                date=date,
+                time=time,
+                starts_at=event_start(date, time),
+                organizer_id=rng.choice(gamer_ids),
+                attendees_count=len(roster)
+            )
+
+        for batch in _batches(events):
+            rosters = [
+                rng.sample(gamer_ids, min(per_event + (i < extra), len(gamer_ids)))
+                for i in batch
+            ]
+            event_rows = Event.objects.bulk_create([
+                new_event(i, roster) for i, roster in zip(batch, rosters)
+            ])
+            attendance_rows = [
+                EventGamer(event_id=event.pk, gamer_id=gamer_id)
+                for event, roster in zip(event_rows, rosters)
+                for gamer_id in roster
+            ]
+            EventGamer.objects.bulk_create(attendance_rows, batch_size=BATCH_SIZE)
+            attendance_count += len(attendance_rows)
+
+        # bulk_create skips the signals that maintain the report tables
+        rebuild(GAMES)
+        rebuild(EVENTS)
+
+    return {
+        'gamers': len(gamer_ids),
+        'game_types': len(game_type_ids),
+        'games': len(game_ids),
+        'events': events,
+        'attendances': attendance_count,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Seed a LevelUp database with synthetic data')
+    parser.add_argument('--scale', choices=SCALES, default='10k')
+    parser.add_argument('--db', help='SQLite file to create, a temporary file if omitted')
+    args = parser.parse_args()
+
+    db_path = setup_django(args.db)
+    counts = seed(**SCALES[args.scale])
+    print(f"Seeded {db_path}: {counts}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,213 @@
+"""Time every API endpoint and both reports against a seeded database
+
+    python -m benchmarks.endpoints --scale 10k --output results.json
+    python -m benchmarks.endpoints --db seeded.sqlite3 --compare results.json
+
+For each endpoint this records the query count, p50/p99 latency over
+--iterations requests, and peak Python memory for a single request.
+Results are written as JSON; --compare prints the change against a
+previous results file so regressions stand out.
+"""
+import argparse
+import datetime
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+from benchmarks.datagen import SCALES, seed
+from benchmarks.utils import setup_django
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def build_endpoints():
+    """Collect (name, method, url, body, reset) for the router routes and reports
+
+    List and detail routes come from the router in levelup/urls.py so
+    new viewsets are picked up automatically. `reset` is an untimed
+    (method, url) request issued before every measured one: signing up
+    is preceded by leaving and leaving by signing up, so each iteration
+    takes the path that changes attendance rather than the no-op one.
+    POST /events adds one small event per request.
+    """
+    # pylint: disable=import-outside-toplevel
+    from django.db.models import F
+    from levelup.urls import router
+    from levelupapi.models import Event, Game, GameType
+
+    sample = {
+        'gametype': GameType.objects.order_by('pk').first(),
+        'game': Game.objects.order_by('pk')[Game.objects.count() // 2],
+        'event': Event.objects.order_by('pk')[Event.objects.count() // 2],
+    }
+
+    endpoints = []
+    for prefix, _, basename in router.registry:
+        endpoints.append((f"GET /{prefix}", 'get', f"/{prefix}", None, None))
+        endpoints.append((f"GET /{prefix}/{{id}}", 'get',
+                          f"/{prefix}/{sample[basename].pk}", None, None))
+
+    event = sample['event']
+    # Signing up needs a free seat, or every iteration would be a 409
+    open_event = Event.objects.filter(
+        attendees_count__lt=F('game__number_of_players')
+    ).order_by('pk').first() or event
+    signup = f"/events/{open_event.pk}/signup"
+    endpoints.extend([
+        ('GET /events?page_size=50', 'get', '/events?page_size=50', None, None),
+        ('GET /events?stream=ndjson', 'get', '/events?stream=ndjson', None, None),
+        ('GET /profile', 'get', '/profile', None, None),
+        ('POST /events/{id}/signup', 'post', signup, None, ('delete', signup)),
+        ('DELETE /events/{id}/signup', 'delete', signup, None, ('post', signup)),
+        ('POST /events', 'post', '/events', {
+            'date': '2022-01-01', 'time': '12:00:00',
+            'description': 'Benchmark', 'gameId': event.game_id,
+        }, None),
+        ('GET /reports/usergames', 'get', '/reports/usergames', None, None),
+        ('GET /reports/userevents', 'get', '/reports/userevents', None, None),
+    ])
+    return endpoints
+
+
+def run_request(client, method, url, body):
+    """Issue one request and consume the whole body, streamed or not"""
+    if body is None:
+        response = getattr(client, method)(url)
+    else:
+        response = getattr(client, method)(url, body, format='json')
+
+    if response.streaming:
+        b''.join(response.streaming_content)
+    return response
+
+
+def measure(client, method, url, body, reset, iterations):
+    """Time one endpoint and count its queries and peak memory
+
+    When `reset` is given it is requested, untimed, before every
+    measured request so each one starts from the same state.
+    """
+    # pylint: disable=import-outside-toplevel
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    def prepare():
+        if reset is not None:
+            run_request(client, *reset, None)
+
+    prepare()
+    run_request(client, method, url, body)
+
+    prepare()
+    with CaptureQueriesContext(connection) as queries:
+        response = run_request(client, method, url, body)
+    query_count = len(queries)
+
+    prepare()
+    tracemalloc.start()
+    run_request(client, method, url, body)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    durations = []
+    for _ in range(iterations):
+        prepare()
+        start = time.perf_counter()
+        run_request(client, method, url, body)
+        durations.append((time.perf_counter() - start) * 1000)
+
+    return {
+        'status': response.status_code,
+        'queries': query_count,
+        'p50_ms': round(percentile(durations, 50), 3),
+        'p99_ms': round(percentile(durations, 99), 3),
+        'mean_ms': round(statistics.fmean(durations), 3),
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
+
+
+def compare(results, previous_path):
+    """Print each metric next to the same metric from an earlier run"""
+    with open(previous_path, encoding='utf-8') as previous_file:
+        previous = json.load(previous_file)['results']
+
+    print(f"\n{'endpoint':<34} {'p50 ms':>16} {'p99 ms':>16} {'queries':>10}")
+    for name, current in results.items():
+        before = previous.get(name)
+        if before is None:
+            continue
+
+        def change(metric, current=current, before=before):
+            old, new = before[metric], current[metric]
+            delta = f"{(new - old) / old * 100:+.0f}%" if old else "n/a"
+            return f"{new:>9} {delta:>6}"
+
+        print(f"{name:<34} {change('p50_ms')} {change('p99_ms')} {change('queries'):>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', choices=SCALES, default='10k')
+    parser.add_argument('--db', help='Reuse a database seeded by benchmarks.datagen')
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--output', default='benchmark-results.json')
+    parser.add_argument('--compare', help='Previous results file to compare against')
+    args = parser.parse_args()
+
+    db_path = setup_django(args.db)
+
+    # pylint: disable=import-outside-toplevel
+    from django.conf import settings
+    from django.contrib.auth.models import User
+    from rest_framework.authtoken.models import Token
+    from rest_framework.test import APIClient
+    from levelupapi.models import Event, EventGamer, Game, Gamer
+
+    settings.DEBUG = False
+    settings.ALLOWED_HOSTS = ['testserver']
+
+    if args.db is None:
+        seed(**SCALES[args.scale])
+
+    user = Gamer.objects.order_by('pk').first().user
+    token, _ = Token.objects.get_or_create(user=user)
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+    results = {}
+    for name, method, url, body, reset in build_endpoints():
+        results[name] = measure(client, method, url, body, reset, args.iterations)
+        result = results[name]
+        print(f"{name:<34} {result['status']:>4} {result['queries']:>5} queries "
+              f"p50 {result['p50_ms']:>9.2f} ms  p99 {result['p99_ms']:>9.2f} ms  "
+              f"peak {result['peak_memory_kb']:>10.1f} KB")
+
+    report = {
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'database': db_path,
+        'python': platform.python_version(),
+        'iterations': args.iterations,
+        'rows': {
+            'users': User.objects.count(),
+            'games': Game.objects.count(),
+            'events': Event.objects.count(),
+            'attendances': EventGamer.objects.count(),
+        },
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as output:
+        json.dump(report, output, indent=2)
+    print(f"\nWrote {args.output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
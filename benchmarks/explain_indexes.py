@@ -0,0 +1,98 @@
+"""Compare query plans for the hot filter paths with and without their indexes
+
+    python -m benchmarks.explain_indexes --events 100000
+
+Seeds a throwaway database at the latest migration, prints the
+EXPLAIN QUERY PLAN and median timing of each query, then drops the
+indexes added in 0004_hot_path_indexes and prints them again.
+"""
+import argparse
+from benchmarks.utils import setup_django, timed
+
+
+def hot_queries():
+    """The access patterns the indexes are meant to serve, keyed by label"""
+    # pylint: disable=import-outside-toplevel
+    from levelupapi.models import Event, EventGamer, Game, Gamer
+    from levelupapi.pagination import EventPagination, KeysetPagination
+
+    event = Event.objects.order_by('pk')[Event.objects.count() // 2]
+    attendance = EventGamer.objects.order_by('pk').first()
+    game_type_id = Game.objects.values_list('game_type_id', flat=True).first()
+    user_id = Gamer.objects.values_list('user_id', flat=True).last()
+
+    return {
+        'events for a game by date/time':
+            Event.objects.filter(game_id=event.game_id).order_by('date', 'time'),
+        'signup lookup by (event, gamer)':
+            EventGamer.objects.filter(event_id=attendance.event_id, gamer_id=attendance.gamer_id),
+        'games by game type':
+            Game.objects.filter(game_type_id=game_type_id).order_by('id'),
+        'gamer by user':
+            Gamer.objects.filter(user_id=user_id),
+        'keyset page over (date, time, id)':
+            Event.objects.filter(
+                KeysetPagination._seek(  # pylint: disable=protected-access
+                    EventPagination.ordering, [event.date, event.time, event.id])
+            ).order_by(*EventPagination.ordering)[:50],
+    }
+
+
+def report(title):
+    """Print the plan and timing of every hot query"""
+    # pylint: disable=import-outside-toplevel
+    from django.db import connection
+
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+    print(f"\n=== {title} ===")
+    for label, queryset in hot_queries().items():
+        duration = timed(lambda qs=queryset: list(qs.all()), repeat=7)
+        print(f"\n{label}  ({duration:.2f} ms)")
+        for line in queryset.explain().splitlines():
+            print(f"    {line}")
+
+
+def drop_hot_path_indexes():
+    """Remove the indexes and constraint from 0004_hot_path_indexes"""
+    # pylint: disable=import-outside-toplevel
+    from django.db import connection
+    from levelupapi.models import Event, EventGamer
+
+    constraints = EventGamer._meta.constraints
+    with connection.schema_editor() as editor:
+        for index in Event._meta.indexes:
+            editor.remove_index(Event, index)
+
+        # SQLite drops a unique constraint by rebuilding the table from the
+        # model's Meta, so hide the constraint while the table is rebuilt
+        EventGamer._meta.constraints = []
+        try:
+            for constraint in constraints:
+                editor.remove_constraint(EventGamer, constraint)
+        finally:
+            EventGamer._meta.constraints = constraints
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--gamers', type=int, default=2000)
+    parser.add_argument('--games', type=int, default=5000)
+    parser.add_argument('--events', type=int, default=100000)
+    parser.add_argument('--attendances', type=int, default=300000)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from benchmarks.datagen import seed  # pylint: disable=import-outside-toplevel
+    seed(gamers=args.gamers, games=args.games,
+         events=args.events, attendances=args.attendances)
+
+    report('with indexes')
+    drop_hot_path_indexes()
+    report('without indexes')
+
+
+if __name__ == '__main__':
+    main()
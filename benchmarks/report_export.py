@@ -0,0 +1,74 @@
+"""Measure time and peak memory of the report pages and their streaming exports
+
+    python -m benchmarks.report_export --scales 1k 10k 100k
+
+Seeds each scale into its own database and fetches /reports/userevents
+as HTML, ?format=csv and ?format=ndjson, reading streamed bodies a chunk
+at a time the way a client download would. Peak memory is the largest
+amount traced by tracemalloc while the request ran; for the exports it
+should stay flat as the report grows.
+"""
+import argparse
+import time
+import tracemalloc
+from benchmarks.datagen import SCALES, seed
+from benchmarks.utils import setup_django
+
+FORMATS = ('html', 'csv', 'ndjson')
+
+
+def fetch(client, url):
+    """Fetch a URL, dropping streamed chunks as they arrive
+
+    Returns:
+        tuple -- (bytes received, seconds, peak traced MB)
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    response = client.get(url)
+    assert response.status_code == 200, (url, response.status_code)
+    if response.streaming:
+        size = sum(len(chunk) for chunk in response.streaming_content)
+    else:
+        size = len(response.content)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, elapsed, peak / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scales', choices=SCALES, nargs='+', default=['1k', '10k'])
+    args = parser.parse_args()
+
+    db_path = setup_django()
+
+    # pylint: disable=import-outside-toplevel
+    from django.conf import settings
+    from django.core.management import call_command
+    from django.db import connections
+    from django.test import Client
+
+    settings.DEBUG = False
+    settings.ALLOWED_HOSTS = ['testserver']
+    client = Client()
+
+    print(f"{'scale':>6} {'format':>7} {'rows':>9} {'MB sent':>9} {'seconds':>8} {'peak MB':>8}")
+    for scale in args.scales:
+        connections.close_all()
+        settings.DATABASES['default']['NAME'] = f"{db_path}.{scale}"
+        call_command('migrate', verbosity=0)
+        counts = seed(**SCALES[scale])
+
+        for export_format in FORMATS:
+            url = '/reports/userevents'
+            if export_format != 'html':
+                url += f"?format={export_format}"
+            size, elapsed, peak = fetch(client, url)
+            print(f"{scale:>6} {export_format:>7} {counts['attendances']:>9} "
+                  f"{size / 1024 / 1024:>9.1f} {elapsed:>8.2f} {peak:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""Time report pages with cold, warm and partly dirty fragment caches
+
+    python -m benchmarks.report_fragments --scale 10k --page-size 50
+
+Renders the first page of /reports/userevents and /reports/usergames
+with an empty reports cache, again with every gamer section cached, and
+after --dirty gamers on the page had one of their games renamed, so only
+their sections are rendered again.
+"""
+import argparse
+import time
+from benchmarks.datagen import SCALES, seed
+from benchmarks.utils import setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', choices=SCALES, default='10k')
+    parser.add_argument('--page-size', type=int, default=50)
+    parser.add_argument('--dirty', type=int, default=2)
+    args = parser.parse_args()
+
+    setup_django()
+
+    # pylint: disable=import-outside-toplevel
+    from django.conf import settings
+    from django.test import Client
+    from levelupapi.models import Game
+    from levelupreports.cache import clear_report_fragments
+
+    settings.DEBUG = False
+    settings.ALLOWED_HOSTS = ['testserver']
+    seed(**SCALES[args.scale])
+    client = Client()
+
+    def fetch(url):
+        start = time.perf_counter()
+        response = client.get(url)
+        assert response.status_code == 200, (url, response.status_code)
+        return response.content, (time.perf_counter() - start) * 1000
+
+    print(f"{args.scale}, {args.page_size} gamers per page, {args.dirty} dirty")
+    print(f"{'report':>11} {'cold ms':>8} {'warm ms':>8} {'dirty ms':>9}")
+    for report in ('userevents', 'usergames'):
+        url = f"/reports/{report}?page_size={args.page_size}"
+        clear_report_fragments()
+        cold_body, cold = fetch(url)
+        warm_body, warm = fetch(url)
+        assert warm_body == cold_body, f"{report}: cached page differs"
+
+        # Outside a transaction the new stamps are set straight away
+        for game in Game.objects.filter(gamer_id__lte=args.dirty).order_by('gamer_id', 'id')[:args.dirty]:
+            game.title = f"{game.title}*"
+            game.save()
+
+        dirty_body, dirty = fetch(url)
+        clear_report_fragments()
+        fresh_body, _ = fetch(url)
+        assert dirty_body == fresh_body, f"{report}: cached page is stale"
+        print(f"{report:>11} {cold:>8.1f} {warm:>8.1f} {dirty:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""Compare the old linear-scan grouping in the reports with group_rows
+
+    python -m benchmarks.report_grouping
+
+Groups synthetic report rows (ten per gamer) at growing sizes. The old
+algorithm scanned the output list for every row, so it is only run up to
+--quadratic-limit rows; group_rows is run all the way to --max-rows.
+"""
+import argparse
+import random
+from benchmarks.utils import timed
+from levelupreports.views.helpers import group_rows, iter_grouped_rows
+
+GROUP_FIELDS = ('gamer_id', 'full_name')
+ITEM_FIELDS = ('game_title', 'date', 'time')
+
+
+def make_rows(count, rows_per_gamer=10, sort=False):
+    """Build flat report rows for count / rows_per_gamer gamers"""
+    rng = random.Random(42)
+    gamers = max(1, count // rows_per_gamer)
+    rows = [
+        {
+            'gamer_id': gamer_id,
+            'full_name': f"First{gamer_id} Last{gamer_id}",
+            'game_title': f"Game {i}",
+            'date': '2021-12-23',
+            'time': '12:00:00',
+        }
+        for i, gamer_id in enumerate(rng.randrange(gamers) for _ in range(count))
+    ]
+    if sort:
+        rows.sort(key=lambda row: row['gamer_id'])
+    return rows
+
+
+def linear_scan_grouping(rows):
+    """The grouping the reports used before group_rows"""
+    grouped = []
+    for row in rows:
+        item = {field: row[field] for field in ITEM_FIELDS}
+        user_dict = next(
+            (group for group in grouped if group['gamer_id'] == row['gamer_id']),
+            None
+        )
+        if user_dict:
+            user_dict['events'].append(item)
+        else:
+            grouped.append({
+                'gamer_id': row['gamer_id'],
+                'full_name': row['full_name'],
+                'events': [item]
+            })
+    return grouped
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--max-rows', type=int, default=100000)
+    parser.add_argument('--quadratic-limit', type=int, default=20000)
+    args = parser.parse_args()
+
+    # 1k, 2k, 5k, 10k, 20k, 50k, ... up to --max-rows
+    sizes = [
+        step * 10 ** exponent
+        for exponent in range(3, 9) for step in (1, 2, 5)
+        if step * 10 ** exponent <= args.max_rows
+    ]
+
+    print(f"{'rows':>8} {'linear scan ms':>15} {'group_rows ms':>14} "
+          f"{'us/row':>7} {'sorted stream ms':>17}")
+    for size in sizes:
+        rows = make_rows(size)
+        sorted_rows = make_rows(size, sort=True)
+
+        if size <= args.quadratic_limit:
+            old = f"{timed(lambda: linear_scan_grouping(rows), repeat=3):15.1f}"
+        else:
+            old = f"{'skipped':>15}"
+        new = timed(lambda: group_rows(rows, 'gamer_id', GROUP_FIELDS, ITEM_FIELDS, 'events'))
+        streamed = timed(lambda: sum(1 for _ in iter_grouped_rows(
+            sorted_rows, 'gamer_id', GROUP_FIELDS, ITEM_FIELDS, 'events')))
+
+        print(f"{size:>8} {old} {new:14.1f} {new * 1000 / size:7.2f} {streamed:17.1f}")
+
+
+if __name__ == '__main__':
+    main()
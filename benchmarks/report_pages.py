@@ -0,0 +1,64 @@
+"""Time report pages as the summary tables grow
+
+    python -m benchmarks.report_pages --scales 1k 10k 100k --page-size 50
+
+Seeds each scale into its own database and renders the first page and
+a page from the middle of /reports/userevents and /reports/usergames,
+plus the events report for one month. Every page holds --page-size
+gamers, so the times should stay flat from scale to scale.
+"""
+import argparse
+from benchmarks.datagen import SCALES, seed
+from benchmarks.utils import setup_django, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scales', choices=SCALES, nargs='+', default=['1k', '10k', '100k'])
+    parser.add_argument('--page-size', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    db_path = setup_django()
+
+    # pylint: disable=import-outside-toplevel
+    from django.conf import settings
+    from django.core.management import call_command
+    from django.db import connections
+    from django.test import Client
+
+    settings.DEBUG = False
+    settings.ALLOWED_HOSTS = ['testserver']
+    client = Client()
+
+    def fetch(url):
+        response = client.get(url)
+        assert response.status_code == 200, (url, response.status_code)
+        return response
+
+    print(f"{'scale':>6} {'report':>11} {'page':>7} {'gamers':>7} {'KB':>7} {'ms':>8}")
+    for scale in args.scales:
+        connections.close_all()
+        settings.DATABASES['default']['NAME'] = f"{db_path}.{scale}"
+        call_command('migrate', verbosity=0)
+        counts = seed(**SCALES[scale])
+        middle = counts['gamers'] // 2
+
+        for report in ('userevents', 'usergames'):
+            pages = {
+                'first': f"/reports/{report}?page_size={args.page_size}",
+                'middle': f"/reports/{report}?page_size={args.page_size}&after={middle}",
+            }
+            if report == 'userevents':
+                pages['month'] = (f"/reports/{report}?page_size={args.page_size}"
+                                  f"&from=2021-03-01&to=2021-03-31")
+
+            for name, url in pages.items():
+                response = fetch(url)
+                elapsed = timed(lambda url=url: fetch(url), args.repeat)
+                print(f"{scale:>6} {report:>11} {name:>7} {response.content.count(b'<h2>'):>7} "
+                      f"{len(response.content) / 1024:>7.0f} {elapsed:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
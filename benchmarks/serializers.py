@@ -0,0 +1,71 @@
+"""Compare the ModelSerializer and row serializer paths of the list endpoints
+
+    python -m benchmarks.serializers --rows 10000
+
+Seeds --rows events and --rows games, then fetches /events, /games and
+/profile with LEVELUP_FAST_SERIALIZERS off and on. Both bodies must be
+byte for byte identical; the script stops if they are not.
+"""
+import argparse
+from benchmarks.datagen import seed
+from benchmarks.utils import setup_django, timed
+
+URLS = ('/events', '/games', '/profile')
+
+
+def fetch(client, url):
+    """Fetch a URL with a cold profile cache and return the body"""
+    # pylint: disable=import-outside-toplevel
+    from django.core.cache import caches
+    from levelupapi.cache import PROFILE_CACHE
+
+    caches[PROFILE_CACHE].clear()
+    response = client.get(url)
+    assert response.status_code == 200, (url, response.status_code)
+    return response.content
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+
+    # pylint: disable=import-outside-toplevel
+    from django.conf import settings
+    from django.test import override_settings
+    from rest_framework.authtoken.models import Token
+    from rest_framework.test import APIClient
+    from levelupapi.models import Gamer
+
+    settings.DEBUG = False
+    settings.ALLOWED_HOSTS = ['testserver']
+
+    # A hundred events per gamer gives the profile a realistic size
+    seed(gamers=max(1, args.rows // 100), games=args.rows,
+         events=args.rows, attendances=args.rows * 3)
+
+    user = Gamer.objects.order_by('pk').first().user
+    token, _ = Token.objects.get_or_create(user=user)
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+    print(f"{'endpoint':<10} {'bytes':>10} {'serializer ms':>14} {'rows ms':>10} {'speedup':>8}")
+    for url in URLS:
+        durations, bodies = [], []
+        for fast in (False, True):
+            with override_settings(LEVELUP_FAST_SERIALIZERS=fast):
+                bodies.append(fetch(client, url))
+                durations.append(timed(lambda url=url: fetch(client, url), args.repeat))
+
+        if bodies[0] != bodies[1]:
+            raise SystemExit(f"{url}: the two serializer paths returned different JSON")
+
+        slow, fast = durations
+        print(f"{url:<10} {len(bodies[0]):>10} {slow:>14.1f} {fast:>10.1f} {slow / fast:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
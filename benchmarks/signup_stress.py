@@ -0,0 +1,118 @@
+"""Hammer one event's signup endpoint from many threads and check the count
+
+    python -m benchmarks.signup_stress --gamers 300 --capacity 50 --threads 32
+
+Creates an event whose game seats --capacity players and --gamers gamers
+with tokens, then has --threads threads sign every gamer up --attempts
+times at once against a file-backed SQLite database. Afterwards exactly
+--capacity signups must have been accepted, the stored attendees_count
+must equal the number of attendance rows, and no request may have
+failed. Exits non-zero when any of that does not hold.
+"""
+import argparse
+import statistics
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from benchmarks.utils import setup_django
+
+
+def create_fixture(gamer_count, capacity):
+    """Create the event and the gamers with their tokens
+
+    Returns:
+        tuple -- (Event, list of token keys)
+    """
+    # pylint: disable=import-outside-toplevel
+    from django.contrib.auth.models import User
+    from rest_framework.authtoken.models import Token
+    from levelupapi.models import Event, Game, Gamer, GameType
+
+    users = User.objects.bulk_create(
+        [User(username=f"stress{i}", first_name="Stress", last_name=str(i))
+         for i in range(gamer_count)])
+    gamers = Gamer.objects.bulk_create([Gamer(user=user, bio="") for user in users])
+    tokens = Token.objects.bulk_create(
+        [Token(key=Token.generate_key(), user=user) for user in users])
+
+    game = Game.objects.create(
+        game_type=GameType.objects.create(label="Board game"), title="Popular",
+        maker="Stress", gamer=gamers[0], number_of_players=capacity, skill_level=1)
+    event = Event.objects.create(
+        game=game, organizer=gamers[0], date="2022-01-01", time="12:00:00",
+        description="Everyone wants in")
+    return event, [token.key for token in tokens]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--gamers', type=int, default=300)
+    parser.add_argument('--capacity', type=int, default=50)
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--attempts', type=int, default=2,
+                        help='Signups per gamer; repeats must be answered as duplicates')
+    args = parser.parse_args()
+
+    db_path = setup_django()
+
+    # pylint: disable=import-outside-toplevel
+    from django.conf import settings
+    from django.db import connections
+    from django.test import Client
+    from levelupapi.models import Event, EventGamer
+
+    settings.DEBUG = False
+    settings.ALLOWED_HOSTS = ['testserver']
+
+    event, keys = create_fixture(args.gamers, args.capacity)
+    connections.close_all()
+
+    local = threading.local()
+    start_line = threading.Barrier(args.threads)
+
+    def signup(key):
+        if not hasattr(local, 'client'):
+            local.client = Client()
+            # Release every thread at once for the worst case contention
+            start_line.wait()
+        start = time.perf_counter()
+        response = local.client.post(
+            f"/events/{event.pk}/signup", HTTP_AUTHORIZATION=f"Token {key}")
+        return response.status_code, (time.perf_counter() - start) * 1000
+
+    def close_connection(_):
+        connections.close_all()
+
+    work = [key for key in keys for _ in range(args.attempts)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        results = list(pool.map(signup, work))
+        list(pool.map(close_connection, range(args.threads)))
+    elapsed = time.perf_counter() - started
+
+    statuses = Counter(status for status, _ in results)
+    latencies = sorted(latency for _, latency in results)
+    event.refresh_from_db()
+    rows = EventGamer.objects.filter(event=event).count()
+
+    print(f"{db_path}: {len(work)} signups from {args.threads} threads in {elapsed:.2f} s "
+          f"({len(work) / elapsed:.0f}/s)")
+    print(f"latency p50 {statistics.median(latencies):.1f} ms, "
+          f"p99 {latencies[int(len(latencies) * 0.99) - 1]:.1f} ms")
+    print(f"statuses {dict(sorted(statuses.items()))}")
+    print(f"capacity {args.capacity}, attendees_count {event.attendees_count}, rows {rows}")
+
+    expected = min(args.capacity, args.gamers)
+    ok = (
+        statuses[201] == expected == rows == event.attendees_count and
+        set(statuses) <= {200, 201, 409} and
+        not Event.objects.filter(pk=event.pk, attendees_count__gt=args.capacity).exists()
+    )
+    print("OK" if ok else "FAILED")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
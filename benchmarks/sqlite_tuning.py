@@ -0,0 +1,168 @@
+"""Compare default SQLite settings with the production profile under mixed load
+
+    python -m benchmarks.sqlite_tuning --threads 16 --duration 5 --writes 0.2
+
+Seeds one database, copies it once per profile and then has --threads
+threads send requests through Django's WSGIHandler for --duration
+seconds each. A request is a write with probability --writes (a gamer
+joining an event and leaving it again) and otherwise a read of one
+event. Going through the handler keeps the request_started and
+request_finished signals, so CONN_MAX_AGE behaves as it does when the
+app is served.
+
+The "default" profile is levelup/settings.py as is: rollback journal,
+no pragmas, a new connection per request. The "production" profile
+applies the pragmas, CONN_MAX_AGE and BEGIN IMMEDIATE transactions of
+levelup/settings_production.py. Requests that failed (a 5xx, or "database is locked" reported in the
+body) are counted separately from the throughput.
+"""
+import argparse
+import io
+import random
+import shutil
+import threading
+import time
+from benchmarks.datagen import SCALES, seed
+from benchmarks.utils import setup_django
+
+LOCKED = b'database is locked'
+
+
+def percentile(values, fraction):
+    """Return the value below which `fraction` of the sorted values fall"""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def run_profile(app, tokens, event_ids, threads, duration, writes):
+    """Hammer the app from several threads and collect latencies per kind
+
+    Returns:
+        dict -- {'read': [ms], 'write': [ms], 'errors': int, 'connections': int}
+    """
+    # pylint: disable=import-outside-toplevel
+    from django.db import connections
+    from django.db.backends.signals import connection_created
+
+    results = {'read': [], 'write': [], 'errors': 0, 'connections': 0}
+    lock = threading.Lock()
+
+    def count_connection(sender, **kwargs):
+        with lock:
+            results['connections'] += 1
+
+    connection_created.connect(count_connection, weak=False)
+
+    def request(method, path, token):
+        environ = {
+            'REQUEST_METHOD': method, 'PATH_INFO': path, 'QUERY_STRING': '',
+            'SERVER_NAME': 'testserver', 'SERVER_PORT': '80',
+            'HTTP_AUTHORIZATION': f"Token {token}", 'wsgi.input': io.BytesIO(),
+            'wsgi.url_scheme': 'http',
+        }
+        statuses = []
+        body = b''.join(app(environ, lambda status, headers: statuses.append(status)))
+        return int(statuses[0].split()[0]) < 500 and LOCKED not in body
+
+    def worker(token, rng, deadline):
+        latencies = {'read': [], 'write': []}
+        errors = 0
+        while time.perf_counter() < deadline:
+            event_id = rng.choice(event_ids)
+            start = time.perf_counter()
+            if rng.random() < writes:
+                kind = 'write'
+                ok = (request('POST', f"/events/{event_id}/signup", token) and
+                      request('DELETE', f"/events/{event_id}/signup", token))
+            else:
+                kind = 'read'
+                ok = request('GET', f"/events/{event_id}", token)
+            latencies[kind].append((time.perf_counter() - start) * 1000)
+            errors += not ok
+        connections.close_all()
+        with lock:
+            results['read'].extend(latencies['read'])
+            results['write'].extend(latencies['write'])
+            results['errors'] += errors
+
+    deadline = time.perf_counter() + duration
+    workers = [
+        threading.Thread(target=worker, args=(tokens[i % len(tokens)], random.Random(i), deadline))
+        for i in range(threads)
+    ]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+
+    connection_created.disconnect(count_connection)
+    results['read'].sort()
+    results['write'].sort()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', choices=SCALES, default='10k')
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=5)
+    parser.add_argument('--writes', type=float, default=0.2,
+                        help='Fraction of requests that write')
+    args = parser.parse_args()
+
+    db_path = setup_django()
+
+    # pylint: disable=import-outside-toplevel
+    from django.conf import settings
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.db import connections
+    from rest_framework.authtoken.models import Token
+    from levelup import settings_production
+    from levelupapi.models import Event, Gamer
+
+    settings.DEBUG = False
+    settings.ALLOWED_HOSTS = ['testserver']
+    seed(**SCALES[args.scale])
+    tokens = [
+        Token.objects.get_or_create(user=gamer.user)[0].key
+        for gamer in Gamer.objects.select_related('user').order_by('pk')[:args.threads]
+    ]
+    event_ids = list(Event.objects.values_list('pk', flat=True))
+    connections.close_all()
+
+    production = settings_production.DATABASES['default']
+    profiles = {
+        'default': ({}, 0, {}),
+        'production': (
+            settings_production.LEVELUP_SQLITE_PRAGMAS,
+            production['CONN_MAX_AGE'],
+            production['OPTIONS'],
+        ),
+    }
+
+    print(f"{args.scale} events, {args.threads} threads, {args.duration:.0f} s, "
+          f"{args.writes:.0%} writes")
+    print(f"{'profile':<11} {'req/s':>8} {'read p50':>9} {'read p99':>9} "
+          f"{'write p50':>10} {'write p99':>10} {'errors':>7} {'conns':>7}")
+    for name, (pragmas, conn_max_age, options) in profiles.items():
+        # WAL is stored in the database file, so every profile starts
+        # from its own copy of the seeded rollback journal database
+        profile_path = f"{db_path}.{name}"
+        shutil.copyfile(db_path, profile_path)
+        settings.DATABASES['default']['NAME'] = profile_path
+        settings.DATABASES['default']['CONN_MAX_AGE'] = conn_max_age
+        settings.DATABASES['default']['OPTIONS'] = options
+        settings.LEVELUP_SQLITE_PRAGMAS = pragmas
+
+        results = run_profile(WSGIHandler(), tokens, event_ids,
+                              args.threads, args.duration, args.writes)
+        served = len(results['read']) + len(results['write'])
+        print(f"{name:<11} {served / args.duration:>8.0f} "
+              f"{percentile(results['read'], 0.5):>9.1f} {percentile(results['read'], 0.99):>9.1f} "
+              f"{percentile(results['write'], 0.5):>10.1f} {percentile(results['write'], 0.99):>10.1f} "
+              f"{results['errors']:>7} {results['connections']:>7}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""Compare fetching the next events from /events/upcoming with the full list
+
+    python -m benchmarks.upcoming_events --scale 100k --limit 50
+
+Seeded events fall in 2021-2022, so "now" is pinned to --from. Prints the
+plan of the upcoming query, then the median time of GET /events (the
+whole list, which clients used to filter and sort themselves) and of
+GET /events/upcoming for the same moment.
+"""
+import argparse
+from benchmarks.datagen import SCALES, seed
+from benchmarks.utils import setup_django, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', choices=SCALES, default='10k')
+    parser.add_argument('--from', dest='start', default='2022-01-01T18:00:00')
+    parser.add_argument('--limit', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+
+    # pylint: disable=import-outside-toplevel
+    from django.conf import settings
+    from django.utils import timezone
+    from django.utils.dateparse import parse_datetime
+    from rest_framework.authtoken.models import Token
+    from rest_framework.test import APIClient
+    from levelupapi.models import Event, Gamer
+
+    settings.DEBUG = False
+    settings.ALLOWED_HOSTS = ['testserver']
+    seed(**SCALES[args.scale])
+
+    user = Gamer.objects.order_by('pk').first().user
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Token {Token.objects.get_or_create(user=user)[0].key}")
+
+    start = timezone.make_aware(parse_datetime(args.start))
+    queryset = Event.objects.filter(starts_at__gte=start).order_by('starts_at', 'id')[:args.limit]
+    print(f"{Event.objects.count()} events, upcoming from {args.start}, limit {args.limit}")
+    for line in queryset.explain().splitlines():
+        print(f"    {line}")
+
+    def fetch(url):
+        response = client.get(url)
+        assert response.status_code == 200, (url, response.status_code)
+        return response
+
+    upcoming = f"/events/upcoming?from={args.start}&limit={args.limit}"
+    assert len(fetch(upcoming).data) == min(args.limit, queryset.count())
+
+    print(f"{'request':<32} {'ms':>9}")
+    for label, url in (('GET /events (everything)', '/events'),
+                       ('GET /events/upcoming', upcoming)):
+        print(f"{label:<32} {timed(lambda url=url: fetch(url), args.repeat):>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
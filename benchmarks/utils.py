@@ -0,0 +1,48 @@
+"""Shared setup for the benchmark scripts"""
+import os
+import tempfile
+import time
+
+
+def setup_django(db_path=None):
+    """Configure Django against a throwaway SQLite file and migrate it
+
+    A file-based reports cache gets a throwaway directory too, so
+    clearing it never touches the fragments a local server has cached.
+
+    Method arguments:
+      db_path -- Database file to use, a new temporary file if omitted
+
+    Returns:
+        str -- Path of the database file
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'levelup.settings')
+    os.environ.setdefault('MY_SECRET_KEY', 'benchmarks')
+
+    import django  # pylint: disable=import-outside-toplevel
+    from django.conf import settings  # pylint: disable=import-outside-toplevel
+
+    if db_path is None:
+        handle, db_path = tempfile.mkstemp(prefix='levelup-bench-', suffix='.sqlite3')
+        os.close(handle)
+
+    settings.DATABASES['default']['NAME'] = db_path
+    reports = settings.CACHES['reports']
+    if reports['BACKEND'].endswith('FileBasedCache'):
+        reports['LOCATION'] = tempfile.mkdtemp(prefix='levelup-bench-reports-')
+    django.setup()
+
+    from django.core.management import call_command  # pylint: disable=import-outside-toplevel
+    call_command('migrate', verbosity=0)
+    return db_path
+
+
+def timed(func, repeat=5):
+    """Run a callable several times and return the median duration in ms"""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - start) * 1000)
+    durations.sort()
+    return durations[len(durations) // 2]
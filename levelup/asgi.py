@@ -13,4 +13,7 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'levelup.settings')
 
+# Route the read-only endpoints to their async views, see levelup/urls_asgi.py
+os.environ.setdefault('LEVELUP_URLCONF', 'levelup.urls_asgi')
+
 application = get_asgi_application()
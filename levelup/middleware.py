@@ -0,0 +1,160 @@
+"""Per-request query and timing instrumentation"""
+import logging
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger('levelup.requests')
+
+# The metrics of the request being handled, for serializer_timing()
+_current_metrics = ContextVar('levelup_request_metrics', default=None)
+
+
+class _RequestMetrics:
+    """Accumulates timings for a single request"""
+
+    def __init__(self, slow_query_ms):
+        self.slow_query_ms = slow_query_ms
+        self.queries = 0
+        self.db_ms = 0.0
+        self.view_db_ms = None
+        self.slow_queries = []
+        self.view_started = None
+        self.view_ms = None
+        self.render_started = None
+        self.render_ms = 0.0
+        self.serializer_ms = 0.0
+        self.serializing = False
+
+    def record_query(self, execute, sql, params, many, context):
+        """Database execute wrapper that times every statement"""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = (time.perf_counter() - start) * 1000
+            self.queries += 1
+            self.db_ms += duration
+            if duration >= self.slow_query_ms:
+                self.slow_queries.append((duration, sql))
+
+
+@contextmanager
+def serializer_timing():
+    """Count the time spent in the block towards the request's `ser` metric
+
+    Queries the block runs (a lazy queryset evaluated by the serializer)
+    stay in `db`. Nested blocks are counted once, and outside a measured
+    request this does nothing.
+    """
+    metrics = _current_metrics.get()
+    if metrics is None or metrics.serializing:
+        yield
+        return
+
+    metrics.serializing = True
+    start, db_ms = time.perf_counter(), metrics.db_ms
+    try:
+        yield
+    finally:
+        metrics.serializing = False
+        elapsed = (time.perf_counter() - start) * 1000
+        metrics.serializer_ms += max(elapsed - (metrics.db_ms - db_ms), 0.0)
+
+
+class RequestMetricsMiddleware:
+    """Report query count, database time and view/render time for every request
+
+    Timings are sent back as a `Server-Timing` header and logged as one
+    logfmt line on the `levelup.requests` logger:
+
+      db      -- time spent executing SQL, with the query count; rows
+                 are fetched lazily, so fetching counts towards app
+      ser     -- time building payloads in serializer `data`, outside
+                 the database (see serializer_timing)
+      app     -- the rest of the view's time
+      render  -- time encoding the response body (DRF renderers)
+      total   -- wall time through the rest of the middleware stack
+
+    Statements slower than LEVELUP_SLOW_QUERY_MS are logged as warnings,
+    slowest first. With LEVELUP_REQUEST_METRICS off the middleware removes
+    itself from the stack at startup, so it costs nothing.
+
+    Streaming responses are measured up to the point the response is
+    returned; rows fetched while streaming the body are not counted.
+
+    The middleware is synchronous, so under ASGI turning it on puts
+    every request, async views included, back on a thread.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'LEVELUP_REQUEST_METRICS', False):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.slow_query_ms = getattr(settings, 'LEVELUP_SLOW_QUERY_MS', 100)
+        self.max_slow_queries = getattr(settings, 'LEVELUP_SLOW_QUERY_LOG_LIMIT', 5)
+
+    def __call__(self, request):
+        metrics = _RequestMetrics(self.slow_query_ms)
+        request._metrics = metrics
+        token = _current_metrics.set(metrics)
+
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics.record_query))
+                response = self.get_response(request)
+        finally:
+            _current_metrics.reset(token)
+        total_ms = (time.perf_counter() - start) * 1000
+
+        if metrics.view_ms is None and metrics.view_started is not None:
+            # Plain responses skip process_template_response
+            metrics.view_ms = total_ms - (metrics.view_started - start) * 1000
+            metrics.view_db_ms = metrics.db_ms
+        view_db_ms = metrics.view_db_ms or 0.0
+        app_ms = max((metrics.view_ms or 0.0) - view_db_ms - metrics.serializer_ms, 0.0)
+
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={metrics.db_ms:.2f};desc="{metrics.queries} queries"',
+            f'ser;dur={metrics.serializer_ms:.2f}',
+            f'app;dur={app_ms:.2f}',
+            f'render;dur={metrics.render_ms:.2f}',
+            f'total;dur={total_ms:.2f}',
+        ])
+
+        logger.info(
+            'method=%s path=%s status=%s queries=%d db_ms=%.2f ser_ms=%.2f '
+            'app_ms=%.2f render_ms=%.2f total_ms=%.2f',
+            request.method, request.path, response.status_code, metrics.queries,
+            metrics.db_ms, metrics.serializer_ms, app_ms, metrics.render_ms, total_ms
+        )
+
+        slowest = sorted(metrics.slow_queries, key=lambda query: query[0], reverse=True)
+        for duration, sql in slowest[:self.max_slow_queries]:
+            logger.warning('slow_query path=%s duration_ms=%.2f sql="%s"',
+                           request.path, duration, sql)
+
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._metrics.view_started = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        """Called after the view returns and right before DRF renders the body"""
+        metrics = request._metrics
+        now = time.perf_counter()
+        if metrics.view_started is not None:
+            metrics.view_ms = (now - metrics.view_started) * 1000
+        metrics.view_db_ms = metrics.db_ms
+        metrics.render_started = now
+
+        def rendered(response):
+            metrics.render_ms = (time.perf_counter() - metrics.render_started) * 1000
+
+        response.add_post_render_callback(rendered)
+        return response
@@ -1,4 +1,5 @@
 import os
+import tempfile
 
 """
 Django settings for levelup project.
@@ -48,19 +49,50 @@ INSTALLED_APPS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework.authentication.TokenAuthentication',
+        'levelupapi.authentication.GamerTokenAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # Encodes with orjson when it is installed, the stdlib otherwise
+    'DEFAULT_RENDERER_CLASSES': [
+        'levelupapi.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
+# Seconds a resolved auth token (with its user and gamer) is kept in
+# process; 0 looks the token up on every request
+LEVELUP_TOKEN_CACHE_TTL = int(os.environ.get('LEVELUP_TOKEN_CACHE_TTL', 0))
+
+# Seconds a process keeps its copy of the game type catalog before
+# reloading it; saves and deletes drop it immediately in their own process
+LEVELUP_GAME_TYPE_CACHE_TTL = int(os.environ.get('LEVELUP_GAME_TYPE_CACHE_TTL', 300))
+
+# Build the event, game and profile lists from `.values()` rows instead
+# of ModelSerializer instances; the JSON is identical either way
+LEVELUP_FAST_SERIALIZERS = os.environ.get('LEVELUP_FAST_SERIALIZERS', '1') == '1'
+
+# Default number of rows per page when a client asks for a paginated list
+LEVELUP_PAGE_SIZE = 50
+
+# Gamers per page of the HTML reports, see levelupreports/views/pages.py
+LEVELUP_REPORT_PAGE_SIZE = 50
+
+# Seconds a rendered gamer section of a report stays cached; changes
+# retire it sooner, see levelupreports/cache.py
+LEVELUP_REPORT_FRAGMENT_TTL = 60 * 60
+
+# Rows fetched per database round trip when streaming a whole listing
+LEVELUP_STREAM_CHUNK_SIZE = 2000
+
 CORS_ORIGIN_WHITELIST = (
     'http://localhost:3000',
     'http://127.0.0.1:3000'
 )
 
 MIDDLEWARE = [
+    'levelup.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -71,7 +103,16 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
-ROOT_URLCONF = 'levelup.urls'
+# Per-request query counts and timings as Server-Timing headers and log
+# lines; the middleware removes itself when this is off
+LEVELUP_REQUEST_METRICS = os.environ.get('LEVELUP_REQUEST_METRICS') == '1'
+
+# SQL statements slower than this many milliseconds are logged
+LEVELUP_SLOW_QUERY_MS = 100
+
+# levelup/asgi.py switches to levelup.urls_asgi, which serves the
+# read-only endpoints with async views
+ROOT_URLCONF = os.environ.get('LEVELUP_URLCONF', 'levelup.urls')
 
 TEMPLATES = [
     {
@@ -99,9 +140,61 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Tests run against a file instead of SQLite's default in-memory
+        # database, which every thread would share through one connection;
+        # the concurrent signup tests need a connection per thread
+        'TEST': {'NAME': os.path.join(tempfile.gettempdir(), 'levelup-tests.sqlite3')},
     }
 }
 
+# PRAGMA statements run on every new SQLite connection, see
+# levelupapi/database.py; levelup/settings_production.py turns on WAL
+LEVELUP_SQLITE_PRAGMAS = {}
+
+
+# Caches
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+#
+# Rendered profiles live in their own cache so the backend can be swapped
+# without touching anything else, e.g. a shared file or Redis cache:
+#   PROFILE_CACHE_BACKEND=django.core.cache.backends.filebased.FileBasedCache
+#   PROFILE_CACHE_LOCATION=/var/tmp/levelup_profiles
+#
+#   PROFILE_CACHE_BACKEND=django.core.cache.backends.redis.RedisCache
+#   PROFILE_CACHE_LOCATION=redis://127.0.0.1:6379
+#
+# The default LocMemCache is per process: the signals drop a changed
+# profile only in the worker that made the change, and other workers keep
+# serving their copy until it expires. It suits a single process (runserver,
+# tests); with several workers use one of the shared backends above.
+# PROFILE_CACHE_TIMEOUT bounds the staleness otherwise.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'profiles': {
+        'BACKEND': os.environ.get(
+            'PROFILE_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('PROFILE_CACHE_LOCATION', 'levelup-profiles'),
+        'TIMEOUT': int(os.environ.get('PROFILE_CACHE_TIMEOUT', 60)),
+    },
+    # Per-gamer sections of the HTML reports and their version stamps,
+    # configured the same way with REPORT_CACHE_BACKEND/LOCATION. Every
+    # worker must see the same stamps or it keeps serving sections another
+    # worker retired, so this must be a shared backend, never LocMemCache.
+    # Files work for the workers of one host, Redis across hosts.
+    'reports': {
+        'BACKEND': os.environ.get(
+            'REPORT_CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.environ.get(
+            'REPORT_CACHE_LOCATION', os.path.join(tempfile.gettempdir(), 'levelup-reports')),
+        'TIMEOUT': 60 * 60,
+        # A stamp culled early only costs a re-render, but keep culling rare
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -122,6 +215,26 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Logging
+# https://docs.djangoproject.com/en/3.2/topics/logging/
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'levelup': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+    },
+}
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/3.2/topics/i18n/
 
@@ -0,0 +1,60 @@
+"""
+Production settings for levelup project.
+
+    DJANGO_SETTINGS_MODULE=levelup.settings_production gunicorn levelup.wsgi
+
+Everything not overridden here comes from levelup/settings.py. The
+database is still SQLite, tuned for many concurrent readers and a
+steady stream of writers.
+"""
+
+import os
+
+from levelup.settings import *  # pylint: disable=wildcard-import,unused-wildcard-import
+
+DEBUG = False
+
+ALLOWED_HOSTS = os.environ.get('LEVELUP_ALLOWED_HOSTS', 'localhost').split(',')
+
+
+# Database
+# https://docs.djangoproject.com/en/3.2/ref/databases/#sqlite-notes
+#
+# Each worker thread keeps its connection between requests instead of
+# opening one (and re-running the pragmas below) for every request.
+# Health checks replace a connection that went bad while it sat idle.
+# Persistent connections only apply under WSGI; Django closes them at
+# the end of every request served by the async views.
+#
+# Atomic blocks start with BEGIN IMMEDIATE (Django 5.1+). A deferred
+# transaction that reads before it writes cannot wait for the write
+# lock under WAL: if another writer committed since its read, SQLite
+# fails it with "database is locked" at once, whatever busy_timeout says.
+
+DATABASES = {
+    'default': {
+        **DATABASES['default'],
+        'NAME': os.environ.get('LEVELUP_DB_PATH', DATABASES['default']['NAME']),
+        'CONN_MAX_AGE': int(os.environ.get('LEVELUP_CONN_MAX_AGE', 600)),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {'transaction_mode': 'IMMEDIATE'},
+    }
+}
+
+LEVELUP_SQLITE_PRAGMAS = {
+    # Readers see a snapshot and no longer wait for writers (or block
+    # them); the mode is stored in the database file
+    'journal_mode': 'WAL',
+    # With WAL, fsync at checkpoints only; a power loss can drop the
+    # last transactions but never corrupts the database
+    'synchronous': 'NORMAL',
+    # Wait up to 5 s for the write lock instead of failing at once with
+    # "database is locked"
+    'busy_timeout': 5000,
+    # 64 MB page cache per connection (negative values are KiB)
+    'cache_size': -64000,
+    # Read the first 256 MB of the file through a shared memory map
+    'mmap_size': 268435456,
+    # Sorts and temporary indexes stay in memory
+    'temp_store': 'MEMORY',
+}
@@ -0,0 +1,19 @@
+"""levelup URL Configuration when served over ASGI
+
+levelup/asgi.py selects this module. The read-only endpoints with async
+implementations are matched first; every other route, and every request
+those views don't serve themselves, goes to levelup/urls.py unchanged.
+"""
+from django.urls import path, re_path
+from levelup.urls import urlpatterns as sync_urlpatterns
+from levelupapi.views import asynchronous
+
+urlpatterns = [
+    path('gametypes', asynchronous.game_type_list),
+    re_path(r'^gametypes/(?P<pk>[^/.]+)$', asynchronous.game_type_detail),
+    path('events', asynchronous.event_list),
+    # Numeric ids only, so /events/upcoming reaches its own route
+    re_path(r'^events/(?P<pk>\d+)$', asynchronous.event_detail),
+    path('profile', asynchronous.profile),
+    *sync_urlpatterns,
+]
@@ -1,6 +1,29 @@
 from django.apps import AppConfig
+from django.core.signals import request_started
+from django.db.backends.signals import connection_created
+
+
+def warm_caches(sender, **kwargs):
+    """Load the game type catalog before the first request needs it"""
+    # pylint: disable=import-outside-toplevel
+    from levelupapi.cache import load_game_types
+    request_started.disconnect(warm_caches, dispatch_uid='levelupapi.warm_caches')
+    load_game_types()
 
 
 class LevelupapiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'levelupapi'
+
+    def ready(self):
+        # Connect the cache invalidation receivers
+        from levelupapi import signals  # pylint: disable=import-outside-toplevel,unused-import
+
+        # Django warns against queries in ready() (management commands
+        # such as migrate run it before the tables exist), so the game
+        # type catalog is warmed as the first request comes in instead
+        request_started.connect(warm_caches, dispatch_uid='levelupapi.warm_caches')
+
+        # Tune every SQLite connection as it opens, see levelupapi/database.py
+        from levelupapi.database import apply_sqlite_pragmas  # pylint: disable=import-outside-toplevel
+        connection_created.connect(apply_sqlite_pragmas, dispatch_uid='levelupapi.sqlite_pragmas')
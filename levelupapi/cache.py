@@ -0,0 +1,124 @@
+"""Caches for rendered API payloads and small, rarely changing tables"""
+import time
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from levelupapi.models import GameType, Tombstone
+
+PROFILE_CACHE = 'profiles'
+
+# The whole game type catalog, held in process as {id: GameType}, and
+# when a game type was last deleted as of loading it
+_game_types = None
+_game_types_deleted_at = None
+_game_types_loaded_at = 0.0
+
+
+def _profile_key(gamer_id):
+    return f"profile:{gamer_id}"
+
+
+def get_cached_profile(gamer_id):
+    """Return the cached profile payload for a gamer, or None on a miss"""
+    return caches[PROFILE_CACHE].get(_profile_key(gamer_id))
+
+
+async def aget_cached_profile(gamer_id):
+    """Async counterpart of get_cached_profile"""
+    return await caches[PROFILE_CACHE].aget(_profile_key(gamer_id))
+
+
+def cache_profile(gamer_id, profile):
+    """Store a rendered profile payload for a gamer"""
+    caches[PROFILE_CACHE].set(_profile_key(gamer_id), profile)
+
+
+async def acache_profile(gamer_id, profile):
+    """Async counterpart of cache_profile"""
+    await caches[PROFILE_CACHE].aset(_profile_key(gamer_id), profile)
+
+
+def invalidate_profiles(gamer_ids):
+    """Drop the cached profiles of every gamer whose payload changed"""
+    keys = [_profile_key(gamer_id) for gamer_id in gamer_ids if gamer_id is not None]
+    if keys:
+        caches[PROFILE_CACHE].delete_many(keys)
+
+
+def load_game_types():
+    """Read the whole game type catalog from the database into the cache
+
+    Returns:
+        dict -- Every GameType keyed by id
+    """
+    global _game_types, _game_types_deleted_at, _game_types_loaded_at  # pylint: disable=global-statement
+    catalog = {game_type.pk: game_type for game_type in GameType.objects.order_by('pk')}
+    _game_types_deleted_at = Tombstone.objects.filter(
+        table=GameType._meta.label).values_list('deleted_at', flat=True).first()
+    _game_types, _game_types_loaded_at = catalog, time.monotonic()
+    return catalog
+
+
+def game_types():
+    """Return the cached game type catalog, loading it when empty or expired
+
+    Saves and deletes drop the catalog in the process that made them;
+    `LEVELUP_GAME_TYPE_CACHE_TTL` bounds how long other processes can
+    keep serving the old one.
+    """
+    if _game_types_fresh():
+        return _game_types
+    return load_game_types()
+
+
+def game_types_deleted_at():
+    """When a game type was last deleted, as of the cached catalog, or None"""
+    game_types()
+    return _game_types_deleted_at
+
+
+async def agame_types():
+    """Async counterpart of game_types(), loading the catalog off the event loop"""
+    if _game_types_fresh():
+        return _game_types
+    return await sync_to_async(load_game_types)()
+
+
+def _game_types_fresh():
+    ttl = getattr(settings, 'LEVELUP_GAME_TYPE_CACHE_TTL', 300)
+    if _game_types is None:
+        return False
+    return not ttl or time.monotonic() - _game_types_loaded_at <= ttl
+
+
+def get_game_type(game_type_id):
+    """Look a game type up by id, or return None if there is no such type
+
+    An id the catalog doesn't know reloads it once, since the type may
+    have been added by another process.
+    """
+    try:
+        game_type_id = int(game_type_id)
+    except (TypeError, ValueError):
+        return None
+
+    game_type = game_types().get(game_type_id)
+    if game_type is None:
+        game_type = load_game_types().get(game_type_id)
+    return game_type
+
+
+def attach_game_types(games):
+    """Point each game at its cached game type so serializing it skips the join"""
+    catalog = game_types()
+    for game in games:
+        game_type = catalog.get(game.game_type_id)
+        if game_type is not None:
+            game.game_type = game_type
+    return games
+
+
+def invalidate_game_types():
+    """Drop the game type catalog so the next read loads it again"""
+    global _game_types  # pylint: disable=global-statement
+    _game_types = None
@@ -0,0 +1,151 @@
+"""Conditional GET support (ETag / Last-Modified) for the API views
+
+Validators are computed from the newest `updated_at` of each table a
+response is built from plus that table's Tombstone, which costs one
+index seek per table instead of serializing the whole body. A matching
+`If-None-Match` or `If-Modified-Since` gets a 304 before the view runs.
+
+`updated_at` catches inserts and edits, and each table's Tombstone row
+catches deletes, so Last-Modified moves forward for all three and a
+client sending only `If-Modified-Since` never keeps a listing that lost
+rows. Code that changes rows with `QuerySet.update()` has to set
+`updated_at` itself.
+"""
+import hashlib
+from asgiref.sync import sync_to_async
+from calendar import timegm
+from functools import wraps
+from django.db.models import Max
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from levelupapi.cache import game_types, game_types_deleted_at
+from levelupapi.models import Tombstone
+
+
+def _validators(request, parts, stamps):
+    """Hash the response inputs into a strong ETag and pick the newest stamp"""
+    parts = [
+        request.get_full_path(),
+        # The async views only ever answer with JSON
+        getattr(getattr(request, 'accepted_renderer', None), 'format', 'json'),
+        getattr(getattr(request, 'gamer', None), 'pk', None),
+        *parts,
+    ]
+    digest = hashlib.md5('|'.join(str(part) for part in parts).encode('utf-8'))
+    stamps = [stamp for stamp in stamps if stamp is not None]
+    return digest.hexdigest(), max(stamps) if stamps else None
+
+
+def collection_state(*models):
+    """Validators for a list built from every row of the given models
+
+    A bare MAX() over the indexed `updated_at` is answered from the end of
+    the index; a row count would scan all of it. Inserts and edits move
+    the maximum and deletes move the tombstone, so the count adds nothing.
+    """
+    def state(request, *args, **kwargs):
+        parts, stamps = [], []
+        for model in models:
+            last = model.objects.aggregate(last=Max('updated_at'))['last']
+            parts.extend([model._meta.label, last])
+            stamps.append(last)
+
+        deleted = Tombstone.objects.filter(
+            table__in=[model._meta.label for model in models]
+        ).values_list('table', 'deleted_at')
+        for table, deleted_at in sorted(deleted):
+            parts.extend([table, deleted_at])
+            stamps.append(deleted_at)
+        return _validators(request, parts, stamps)
+    return state
+
+
+def instance_state(model, *relations):
+    """Validators for one row plus the related rows nested in its payload"""
+    fields = ['updated_at', *[f"{relation}__updated_at" for relation in relations]]
+
+    def state(request, pk=None, **kwargs):
+        try:
+            stamps = model.objects.filter(pk=pk).values_list(*fields).first()
+        except (TypeError, ValueError):
+            stamps = None
+        if stamps is None:
+            # Let the view produce its usual error response
+            return None
+        return _validators(request, [model._meta.label, pk, *stamps], stamps)
+    return state
+
+
+def catalog_state(request, *args, **kwargs):
+    """Validators for game type responses, read from the in-process catalog"""
+    catalog = game_types()
+    stamps = [game_type.updated_at for game_type in catalog.values()]
+    deleted_at = game_types_deleted_at()
+    parts = ['levelupapi.GameType', len(catalog), max(stamps, default=None), deleted_at]
+    return _validators(request, parts, [*stamps, deleted_at])
+
+
+def _check(request, state):
+    """Quote the validators and build the 304 response if they still match
+
+    Returns:
+        tuple -- (etag, timestamp, 304 response or None)
+    """
+    etag, last_modified = state
+    etag = quote_etag(etag)
+    timestamp = timegm(last_modified.utctimetuple()) if last_modified else None
+    return etag, timestamp, get_conditional_response(
+        request, etag=etag, last_modified=timestamp)
+
+
+def _finish(response, etag, timestamp):
+    """Attach the validators and the headers the body varies on"""
+    if response.status_code in (200, 304):
+        response.setdefault('ETag', etag)
+        if timestamp is not None:
+            response.setdefault('Last-Modified', http_date(timestamp))
+
+    # Bodies differ per gamer and per negotiated format
+    patch_vary_headers(response, ('Accept', 'Authorization'))
+    return response
+
+
+def conditional_get(state_func):
+    """Answer GET/HEAD with 304 when the client's validators still match
+
+    Method arguments:
+      state_func -- Callable(request, *args, **kwargs) returning
+                    (etag, last_modified) or None to skip validation
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return method(self, request, *args, **kwargs)
+
+            state = state_func(request, *args, **kwargs)
+            if state is None:
+                return method(self, request, *args, **kwargs)
+
+            etag, timestamp, response = _check(request, state)
+            if response is None:
+                response = method(self, request, *args, **kwargs)
+            return _finish(response, etag, timestamp)
+        return wrapper
+    return decorator
+
+
+async def aconditional_response(request, state_func, view, *args, **kwargs):
+    """Async counterpart of conditional_get for the plain async views
+
+    The validator queries run in a worker thread; `view` is the coroutine
+    function producing the full response.
+    """
+    state = await sync_to_async(state_func)(request, *args, **kwargs)
+    if state is None:
+        return await view(request, *args, **kwargs)
+
+    etag, timestamp, response = _check(request, state)
+    if response is None:
+        response = await view(request, *args, **kwargs)
+    return _finish(response, etag, timestamp)
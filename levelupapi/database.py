@@ -0,0 +1,30 @@
+"""Per-connection SQLite tuning
+
+SQLite reads most of its tuning from PRAGMA statements that only last
+as long as the connection, so they are issued every time Django opens
+one. LevelupapiConfig.ready() connects apply_sqlite_pragmas to
+connection_created; LEVELUP_SQLITE_PRAGMAS lists the statements, e.g.
+
+    LEVELUP_SQLITE_PRAGMAS = {'journal_mode': 'WAL', 'busy_timeout': 5000}
+
+levelup/settings_production.py holds the values used in production.
+"""
+from django.conf import settings
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """Run the configured PRAGMA statements on a new SQLite connection"""
+    if connection.vendor != 'sqlite':
+        return
+
+    pragmas = getattr(settings, 'LEVELUP_SQLITE_PRAGMAS', None)
+    if not pragmas:
+        return
+
+    # PRAGMA takes no bound parameters, so names and values are checked
+    # before they are formatted into the statement
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            if not name.isidentifier() or not str(value).lstrip('-').isalnum():
+                raise ValueError(f"Invalid SQLite pragma: {name} = {value}")
+            cursor.execute(f"PRAGMA {name} = {value}")
@@ -0,0 +1,202 @@
+"""Query parameter filters, ordering and sparse fieldsets for the list views
+
+    http://localhost:8000/events?dateFrom=2022-01-01&hasFreeSlots=true&ordering=-date,time
+    http://localhost:8000/games?type=1&skillLevel=3&fields=id,title
+    http://localhost:8000/events/upcoming?from=2022-01-01T18:00&to=2022-01-02&limit=10
+"""
+import datetime
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ParseError
+
+
+def _integer(value):
+    return int(value)
+
+
+def _date(value):
+    date = parse_date(value)
+    if date is None:
+        raise ValueError(value)
+    return date
+
+
+def _datetime(value, whole_day=False):
+    """A datetime, or a date meaning its midnight, in TIME_ZONE unless offset
+
+    With `whole_day` a date means the midnight that ends it, so used as an
+    exclusive upper bound it still takes in every event on that day.
+    """
+    # parse_datetime() would take a bare date as its midnight too
+    day = parse_date(value)
+    if day is not None:
+        if whole_day:
+            day += datetime.timedelta(days=1)
+        moment = datetime.datetime.combine(day, datetime.time())
+    else:
+        moment = parse_datetime(value)
+        if moment is None:
+            raise ValueError(value)
+    if settings.USE_TZ and timezone.is_naive(moment):
+        moment = timezone.make_aware(moment, timezone.get_default_timezone())
+    return moment
+
+
+def _boolean(value):
+    lowered = value.lower()
+    if lowered in ('1', 'true', 'yes'):
+        return True
+    if lowered in ('0', 'false', 'no'):
+        return False
+    raise ValueError(value)
+
+
+def _free_slots(free):
+    condition = Q(attendees_count__lt=F('game__number_of_players'))
+    return condition if free else ~condition
+
+
+class ListQuery:
+    """Turn a list request's query parameters into queryset operations
+
+    Subclasses declare:
+      filters -- {parameter: (parse, lookup)}, where lookup is a field
+                 lookup or a callable building a Q from the parsed value
+      ordering_fields -- Fields clients may sort on with `ordering`
+      fields -- Payload fields clients may pick with `fields`
+
+    Unknown or malformed values answer 400 instead of being ignored.
+    """
+    filters = {}
+    ordering_fields = ()
+    fields = ()
+    ordering_param = 'ordering'
+    fields_param = 'fields'
+
+    def __init__(self, request):
+        self.params = request.query_params
+
+    def filter_queryset(self, queryset):
+        """Apply every filter present in the query string"""
+        for param, (parse, lookup) in self.filters.items():
+            raw = self.params.get(param)
+            if raw in (None, ''):
+                continue
+            try:
+                value = parse(raw)
+            except ValueError as ex:
+                raise ParseError(f"Invalid {param}: {raw}") from ex
+            condition = lookup(value) if callable(lookup) else Q(**{lookup: value})
+            queryset = queryset.filter(condition)
+        return queryset
+
+    def get_ordering(self):
+        """Return the requested sort keys, ending with `id` so rows never tie
+
+        Returns:
+            tuple -- e.g. ('-date', 'time', 'id'), or None when not requested
+        """
+        raw = self.params.get(self.ordering_param)
+        if not raw:
+            return None
+
+        ordering, seen = [], set()
+        for term in (term.strip() for term in raw.split(',')):
+            name = term[1:] if term.startswith('-') else term
+            if name not in self.ordering_fields:
+                raise ParseError(f"Cannot order by: {term}")
+            if name not in seen:
+                seen.add(name)
+                ordering.append(term)
+
+        if 'id' not in seen:
+            ordering.append('id')
+        return tuple(ordering)
+
+    def get_fields(self):
+        """Return the payload fields the client picked, or None for all of them"""
+        raw = self.params.get(self.fields_param)
+        if not raw:
+            return None
+
+        fields = tuple(dict.fromkeys(
+            field.strip() for field in raw.split(',') if field.strip()))
+        unknown = [field for field in fields if field not in self.fields]
+        if unknown or not fields:
+            raise ParseError(f"Unknown fields: {', '.join(unknown)}")
+        return fields
+
+
+class EventQuery(ListQuery):
+    """Filters for /events
+
+    Date ranges seek on event_date_time_id_idx, organizer and game on
+    their foreign key indexes.
+    """
+    filters = {
+        'dateFrom': (_date, 'date__gte'),
+        'dateTo': (_date, 'date__lte'),
+        'organizerId': (_integer, 'organizer_id'),
+        'gameId': (_integer, 'game_id'),
+        'gameTypeId': (_integer, 'game__game_type_id'),
+        'skillLevel': (_integer, 'game__skill_level'),
+        'joined': (_boolean, 'joined'),
+        'hasFreeSlots': (_boolean, _free_slots),
+    }
+    ordering_fields = ('id', 'date', 'time', 'attendees_count', 'description')
+    fields = ('id', 'date', 'time', 'game', 'organizer', 'description',
+              'joined', 'attendees_count')
+
+
+class GameQuery(ListQuery):
+    """Filters for /games, all backed by an index on the games table"""
+    filters = {
+        'type': (_integer, 'game_type_id'),
+        'skillLevel': (_integer, 'skill_level'),
+        'gamerId': (_integer, 'gamer_id'),
+    }
+    ordering_fields = ('id', 'title', 'maker', 'number_of_players',
+                       'skill_level', 'event_count')
+    fields = ('id', 'title', 'maker', 'number_of_players', 'skill_level',
+              'game_type', 'gamer', 'event_count', 'user_event_count')
+
+
+class UpcomingQuery(ListQuery):
+    """Time window and limit for /events/upcoming
+
+    `from` defaults to now and `to` to no end; `limit` caps how many of
+    the earliest events in the window come back. `from` is inclusive and
+    a `to` datetime exclusive, while a `to` date includes that whole day,
+    like the `to` of the reports.
+    """
+    fields = EventQuery.fields
+    max_limit = 500
+
+    def get_window(self):
+        """Return the (start, end) of the window, end None when open"""
+        try:
+            start = _datetime(self.params['from']) if self.params.get('from') else timezone.now()
+        except ValueError as ex:
+            raise ParseError(f"Invalid from: {self.params['from']}") from ex
+        try:
+            end = _datetime(self.params['to'], whole_day=True) if self.params.get('to') else None
+        except ValueError as ex:
+            raise ParseError(f"Invalid to: {self.params['to']}") from ex
+        if end is not None and end < start:
+            raise ParseError("to must not be before from")
+        return start, end
+
+    def get_limit(self):
+        """Return the requested number of events, LEVELUP_PAGE_SIZE by default"""
+        raw = self.params.get('limit')
+        if not raw:
+            return getattr(settings, 'LEVELUP_PAGE_SIZE', 50)
+        try:
+            limit = int(raw)
+        except ValueError:
+            limit = 0
+        if limit <= 0:
+            raise ParseError(f"Invalid limit: {raw}")
+        return min(limit, self.max_limit)
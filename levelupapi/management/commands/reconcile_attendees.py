@@ -0,0 +1,35 @@
+"""Management command that repairs drift in Event.attendees_count"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Now
+from levelupapi.models import Event, EventGamer
+
+
+class Command(BaseCommand):
+    help = 'Recount event attendees and fix any stored attendees_count that drifted'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Report drifted events without changing them')
+
+    def handle(self, *args, **options):
+        attendees = EventGamer.objects.filter(
+            event=OuterRef('pk')
+        ).order_by().values('event').annotate(count=Count('pk')).values('count')
+        actual = Coalesce(Subquery(attendees), 0)
+
+        with transaction.atomic():
+            drifted = Event.objects.annotate(
+                actual_count=actual
+            ).exclude(attendees_count=F('actual_count'))
+            count = drifted.count()
+
+            if count and not options['dry_run']:
+                Event.objects.filter(
+                    pk__in=drifted.values('pk')
+                ).update(attendees_count=actual, updated_at=Now())
+
+        verb = 'Found' if options['dry_run'] else 'Fixed'
+        self.stdout.write(f"{verb} {count} event(s) with a drifted attendee count")
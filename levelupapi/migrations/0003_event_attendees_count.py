@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def count_attendees(apps, schema_editor):
+    """Backfill the counter from the attendance rows that already exist"""
+    Event = apps.get_model('levelupapi', 'Event')
+    EventGamer = apps.get_model('levelupapi', 'EventGamer')
+    attendees = EventGamer.objects.filter(
+        event=models.OuterRef('pk')
+    ).order_by().values('event').annotate(count=models.Count('pk')).values('count')
+    Event.objects.update(
+        attendees_count=Coalesce(models.Subquery(attendees), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('levelupapi', '0002_auto_20211101_1634'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='attendees_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='event',
+            name='game',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='levelupapi.game'),
+        ),
+        migrations.RunPython(count_attendees, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:43
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def remove_duplicate_attendance(apps, schema_editor):
+    """Keep the oldest row of every (event, gamer) pair so the constraint can be added"""
+    Event = apps.get_model('levelupapi', 'Event')
+    EventGamer = apps.get_model('levelupapi', 'EventGamer')
+
+    keep = EventGamer.objects.values('event', 'gamer').annotate(
+        first=models.Min('pk')).values('first')
+    duplicates = EventGamer.objects.exclude(pk__in=keep)
+    event_ids = list(duplicates.values_list('event', flat=True).distinct())
+    if not event_ids:
+        return
+
+    duplicates.delete()
+
+    # Duplicates were counted by 0003, so recount the events that had them
+    attendees = EventGamer.objects.filter(
+        event=models.OuterRef('pk')
+    ).order_by().values('event').annotate(count=models.Count('pk')).values('count')
+    Event.objects.filter(pk__in=event_ids).update(
+        attendees_count=Coalesce(models.Subquery(attendees), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('levelupapi', '0003_event_attendees_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_attendance, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['game', 'date', 'time'], name='event_game_date_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['date', 'time', 'id'], name='event_date_time_id_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='eventgamer',
+            constraint=models.UniqueConstraint(fields=('event', 'gamer'), name='unique_event_gamer'),
+        ),
+    ]
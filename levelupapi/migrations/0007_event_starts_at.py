@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:02
+
+import datetime
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+BATCH_SIZE = 2000
+
+
+def set_starts_at(apps, schema_editor):
+    """Backfill starts_at from the date and time of every existing event"""
+    Event = apps.get_model('levelupapi', 'Event')
+    zone = timezone.get_default_timezone()
+    batch = []
+    for event in Event.objects.only('id', 'date', 'time').iterator(chunk_size=BATCH_SIZE):
+        event.starts_at = datetime.datetime.combine(event.date, event.time)
+        if settings.USE_TZ:
+            event.starts_at = timezone.make_aware(event.starts_at, zone)
+        batch.append(event)
+        if len(batch) >= BATCH_SIZE:
+            Event.objects.bulk_update(batch, ['starts_at'])
+            batch = []
+    if batch:
+        Event.objects.bulk_update(batch, ['starts_at'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('levelupapi', '0006_list_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='starts_at',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.RunPython(set_starts_at, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='event',
+            name='starts_at',
+            field=models.DateTimeField(editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['starts_at', 'id'], name='event_starts_at_id_idx'),
+        ),
+    ]
@@ -3,3 +3,4 @@ from .game_type import GameType
 from .event_gamer import EventGamer
 from .event import Event
 from .game import Game
+from .tombstone import Tombstone
@@ -1,4 +1,18 @@
+import datetime
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
+
+
+def event_start(date, time):
+    """Combine an event's date and wall-clock time into an aware datetime
+
+    The date and time are local to TIME_ZONE, as entered by organizers.
+    """
+    starts_at = datetime.datetime.combine(date, time)
+    if settings.USE_TZ:
+        return timezone.make_aware(starts_at, timezone.get_default_timezone())
+    return starts_at
 
 
 class Event(models.Model):
@@ -14,6 +28,34 @@ class Event(models.Model):
     organizer = models.ForeignKey("Gamer", on_delete=models.CASCADE)
     attendees = models.ManyToManyField(
         "Gamer", through="EventGamer", related_name="attending")
+    # Kept in step by EventView.signup, see the reconcile_attendees command
+    attendees_count = models.PositiveIntegerField(default=0)
+    # Drives the ETag and Last-Modified headers of the API views
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    # `date` and `time` as one sortable value, set by save(); code that
+    # writes events without save() (bulk_create, update()) must set it
+    starts_at = models.DateTimeField(editable=False)
+
+    class Meta:
+        indexes = [
+            # Events for a game in calendar order
+            models.Index(fields=['game', 'date', 'time'], name='event_game_date_time_idx'),
+            # Keyset pagination over (date, time, id)
+            models.Index(fields=['date', 'time', 'id'], name='event_date_time_id_idx'),
+            # Upcoming events are a range scan in start order
+            models.Index(fields=['starts_at', 'id'], name='event_starts_at_id_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        # Views assign the raw strings from the request body
+        self.starts_at = event_start(
+            self._meta.get_field('date').to_python(self.date),
+            self._meta.get_field('time').to_python(self.time))
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'date', 'time'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'starts_at'}
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.game.title} on {self.date}"
@@ -5,6 +5,12 @@ class EventGamer(models.Model):
     gamer = models.ForeignKey("Gamer", on_delete=models.CASCADE)
     event = models.ForeignKey("Event", on_delete=models.CASCADE)
 
+    class Meta:
+        constraints = [
+            # A gamer attends an event once; also serves (event, gamer) lookups
+            models.UniqueConstraint(fields=['event', 'gamer'], name='unique_event_gamer'),
+        ]
+
     def __str__(self):
         return f"{self.gamer.user.first_name} attending {self.event.game.title} on {self.event.date}"
     
\ No newline at end of file
@@ -8,6 +8,15 @@ class Game(models.Model):
     gamer = models.ForeignKey("Gamer", on_delete=models.CASCADE)
     number_of_players = models.IntegerField()
     skill_level = models.IntegerField()
+    # Drives the ETag and Last-Modified headers of the API views
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            # The skillLevel filter on /games, alone or with a game type
+            models.Index(fields=['skill_level', 'id'], name='game_skill_level_id_idx'),
+            models.Index(fields=['game_type', 'skill_level'], name='game_type_skill_level_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -4,6 +4,8 @@ from django.db import models
 class GameType(models.Model):
 
     label = models.CharField(max_length=50)
+    # Drives the ETag and Last-Modified headers of the API views
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return self.label
\ No newline at end of file
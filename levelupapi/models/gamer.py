@@ -6,6 +6,9 @@ class Gamer(models.Model):
 
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     bio = models.CharField(max_length=50)
+    # Drives the ETag and Last-Modified headers of the payloads that nest
+    # the gamer; saving the user bumps it too, see levelupapi/signals.py
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return f"{self.user.first_name} {self.user.last_name}"
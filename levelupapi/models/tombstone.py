@@ -0,0 +1,17 @@
+from django.db import models
+
+
+class Tombstone(models.Model):
+    """When a row was last deleted from one of the tables behind the API
+
+    max(updated_at) can't see a row that is gone, so the validators in
+    levelupapi/conditional.py take the newer of it and the table's
+    tombstone as Last-Modified. Written by levelupapi/signals.py.
+    """
+
+    # The model's label, e.g. levelupapi.Event
+    table = models.CharField(max_length=100, unique=True)
+    deleted_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.table} rows deleted as of {self.deleted_at}"
@@ -0,0 +1,195 @@
+"""Keyset (cursor) pagination for the list endpoints"""
+import base64
+import binascii
+import json
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Paginate a queryset by seeking past the last row seen
+
+    Every page is a `WHERE (key) > (last key) ORDER BY key LIMIT n` query,
+    so deep pages cost the same as the first one. The cursor handed to
+    clients is an opaque base64 token holding the boundary row's key.
+
+    Pagination is opt in: clients that send neither `cursor` nor
+    `page_size` get the full, unpaginated list they always have.
+
+    The key is the class's `ordering` unless the view passes the sort
+    the client asked for. It must end in a unique field, and cursors
+    only work with the ordering they were issued for.
+    """
+    ordering = ('id',)
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self, ordering=None):
+        if ordering:
+            self.ordering = tuple(ordering)
+        self.request = None
+        self.page_size = None
+        self.page = []
+        self.has_next = False
+        self.has_previous = False
+
+    def is_requested(self, request):
+        """Return True if the client asked for a page instead of the full list"""
+        return (
+            self.cursor_query_param in request.query_params or
+            self.page_size_query_param in request.query_params
+        )
+
+    def get_page_size(self, request):
+        """Read the page size from the query string, falling back to the setting"""
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+            if page_size > 0:
+                return min(page_size, self.max_page_size)
+        except (KeyError, ValueError):
+            pass
+        return getattr(settings, 'LEVELUP_PAGE_SIZE', 50)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        reverse, position = self.decode_cursor(request, queryset.model)
+
+        ordering = self.ordering
+        if reverse:
+            ordering = tuple(self._flip(field) for field in ordering)
+        queryset = queryset.order_by(*ordering)
+
+        if position is not None:
+            queryset = queryset.filter(self._seek(ordering, position))
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+
+        if reverse:
+            rows.reverse()
+            self.has_previous = has_more
+            self.has_next = True
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        self.page = rows
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data
+        })
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(False, self.page[-1])
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            # Walked past the end, so the previous page is simply the first one
+            return remove_query_param(
+                self.request.build_absolute_uri(), self.cursor_query_param)
+        return self.encode_cursor(True, self.page[0])
+
+    def encode_cursor(self, reverse, row):
+        """Build the URL for the page before or after the given row"""
+        position = [self._value(row, field.lstrip('-')) for field in self.ordering]
+        position = [
+            value.isoformat() if hasattr(value, 'isoformat') else value
+            for value in position
+        ]
+        payload = json.dumps(
+            {'r': reverse, 'p': position, 'o': list(self.ordering)}, separators=(',', ':'))
+        token = base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+        return replace_query_param(
+            self.request.build_absolute_uri(), self.cursor_query_param, token)
+
+    def decode_cursor(self, request, model):
+        """Turn the cursor query parameter back into (reverse, position)
+
+        Returns:
+            tuple -- reverse flag and key values, or (False, None) for the first page
+        """
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return False, None
+
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode('ascii')))
+            reverse = bool(payload['r'])
+            position = payload['p']
+            ordering = payload.get('o', list(self.ordering))
+            if ordering != list(self.ordering) or len(position) != len(self.ordering):
+                raise ValueError
+            position = [
+                self._to_python(model, field.lstrip('-'), value)
+                for field, value in zip(self.ordering, position)
+            ]
+        except (TypeError, ValueError, KeyError, binascii.Error, UnicodeEncodeError) as ex:
+            raise NotFound(self.invalid_cursor_message) from ex
+
+        return reverse, position
+
+    @staticmethod
+    def _to_python(model, name, value):
+        try:
+            return model._meta.get_field(name).to_python(value)
+        except FieldDoesNotExist:
+            # Annotations such as counts are plain JSON numbers already
+            return value
+
+    @staticmethod
+    def _flip(field):
+        return field[1:] if field.startswith('-') else f"-{field}"
+
+    @staticmethod
+    def _value(row, name):
+        if isinstance(row, dict):
+            return row[name]
+        return getattr(row, name)
+
+    @staticmethod
+    def _seek(ordering, position):
+        """Build the row-value comparison `(a, b, c) > (x, y, z)` as OR'd Q objects
+
+        The OR'd terms alone can't drive an index range scan, so the
+        comparison is also bounded by `a >= x`, which lets the database
+        seek straight to the cursor position on the leading column.
+        """
+        condition = Q()
+        for i, field in enumerate(ordering):
+            name = field.lstrip('-')
+            operator = 'lt' if field.startswith('-') else 'gt'
+            term = Q(**{f"{name}__{operator}": position[i]})
+            for previous, value in zip(ordering[:i], position[:i]):
+                term &= Q(**{previous.lstrip('-'): value})
+            condition |= term
+
+        leading = ordering[0]
+        operator = 'lte' if leading.startswith('-') else 'gte'
+        return Q(**{f"{leading.lstrip('-')}__{operator}": position[0]}) & condition
+
+
+class EventPagination(KeysetPagination):
+    """Events are paged in calendar order"""
+    ordering = ('date', 'time', 'id')
+
+
+class GamePagination(KeysetPagination):
+    """Games are paged in creation order"""
+    ordering = ('id',)
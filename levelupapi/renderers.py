@@ -0,0 +1,64 @@
+"""Renderers used by the levelupapi views"""
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - the stdlib encoder is used instead
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer that encodes with orjson when it is installed
+
+    The bytes match DRF's stdlib renderer. Dates, times and datetimes are
+    passed through to DRF's encoder instead of orjson's own formatting,
+    and so is everything else orjson doesn't know (Decimal, lazy strings,
+    querysets...). Indented output, ASCII-only output and payloads orjson
+    rejects (such as integers wider than 64 bits) go through the stdlib
+    renderer.
+
+    Floats are the one difference: orjson writes `1e16` where the stdlib
+    writes `1e+16`, and writes non-finite values as null rather than
+    failing. No API payload holds a float today.
+    """
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        if (orjson is None or self.ensure_ascii or not self.compact or
+                self.get_indent(accepted_media_type, renderer_context)):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+            )
+        except (orjson.JSONEncodeError, TypeError, ValueError):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Escaped like JSONRenderer does: valid JSON, but not valid JavaScript
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Render a list as newline-delimited JSON, one object per line
+
+    Listing views stream NDJSON themselves when this renderer is
+    negotiated; this class covers everything else (paginated pages,
+    error bodies) so those still come back as valid NDJSON.
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        renderer = FastJSONRenderer()
+        rows = data if isinstance(data, list) else [data]
+        return b''.join(renderer.render(row) + b'\n' for row in rows)
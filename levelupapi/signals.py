@@ -0,0 +1,128 @@
+"""Signal receivers that keep cached payloads in step with the database
+
+A profile payload holds the gamer's user info, the events they host and
+the events they attend along with each event's game title. Every
+receiver here works out exactly which gamers' payloads a change touches
+and drops only those. The in-process game type catalog is simply
+dropped whenever a game type changes.
+
+Deleting a row the API serves also moves its table's tombstone, which
+the conditional GET validators read.
+"""
+from django.contrib.auth.models import User
+from django.db.models.functions import Now
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from levelupapi.authentication import forget_tokens
+from levelupapi.cache import invalidate_game_types, invalidate_profiles
+from levelupapi.models import Event, EventGamer, Game, Gamer, GameType, Tombstone
+
+
+def _event_attendee_ids(event_ids):
+    return EventGamer.objects.filter(
+        event_id__in=event_ids).values_list('gamer_id', flat=True)
+
+
+@receiver(pre_save, sender=Event)
+def remember_event_organizer(sender, instance, **kwargs):
+    """Note the current organizer so a hand-off invalidates both gamers"""
+    instance._previous_organizer_id = None
+    if instance.pk is not None:
+        instance._previous_organizer_id = Event.objects.filter(
+            pk=instance.pk).values_list('organizer_id', flat=True).first()
+
+
+@receiver(post_save, sender=Event)
+def event_saved(sender, instance, created, **kwargs):
+    """An event shows up in its organizer's and its attendees' profiles"""
+    gamer_ids = {instance.organizer_id, getattr(instance, '_previous_organizer_id', None)}
+    if not created:
+        gamer_ids.update(_event_attendee_ids([instance.pk]))
+    invalidate_profiles(gamer_ids)
+
+
+@receiver(post_delete, sender=Event)
+def event_deleted(sender, instance, **kwargs):
+    """Attendance rows cascade first and invalidate their own gamers"""
+    invalidate_profiles([instance.organizer_id])
+
+
+@receiver(post_save, sender=EventGamer)
+@receiver(post_delete, sender=EventGamer)
+def attendance_changed(sender, instance, **kwargs):
+    """Joining or leaving changes the gamer's attending list"""
+    invalidate_profiles([instance.gamer_id])
+
+
+@receiver(m2m_changed, sender=Event.attendees.through)
+def attendees_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Cover event.attendees.add/remove/clear, which skip the EventGamer signals"""
+    if action == 'pre_clear':
+        if reverse:
+            instance._cleared_gamer_ids = [instance.pk]
+        else:
+            instance._cleared_gamer_ids = list(_event_attendee_ids([instance.pk]))
+    elif action == 'post_clear':
+        invalidate_profiles(getattr(instance, '_cleared_gamer_ids', []))
+    elif action in ('post_add', 'post_remove'):
+        invalidate_profiles([instance.pk] if reverse else pk_set)
+
+
+@receiver(post_save, sender=Game)
+def game_saved(sender, instance, created, **kwargs):
+    """Profiles embed the game title of every hosted and attended event"""
+    if created:
+        return
+
+    events = Event.objects.filter(game=instance)
+    gamer_ids = set(events.values_list('organizer_id', flat=True))
+    gamer_ids.update(_event_attendee_ids(events.values('pk')))
+    invalidate_profiles(gamer_ids)
+
+
+@receiver(post_save, sender=Gamer)
+@receiver(post_delete, sender=Gamer)
+def gamer_saved(sender, instance, **kwargs):
+    """The gamer's bio is part of their own profile"""
+    invalidate_profiles([instance.pk])
+    forget_tokens(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, update_fields=None, **kwargs):
+    """So are the names and username on the gamer's user
+
+    Events nest the organizer's names, so the gamer's updated_at moves
+    with them and the ETags of those payloads change. Recording a login
+    touches neither.
+    """
+    gamers = Gamer.objects.filter(user=instance)
+    if update_fields is None or set(update_fields) != {'last_login'}:
+        gamers.update(updated_at=Now())
+    invalidate_profiles(gamers.values_list('pk', flat=True))
+    forget_tokens(instance.pk)
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted(sender, instance, **kwargs):
+    """A revoked token must stop authenticating straight away"""
+    forget_tokens(instance.user_id)
+
+
+@receiver(post_save, sender=GameType)
+@receiver(post_delete, sender=GameType)
+def game_type_changed(sender, instance, **kwargs):
+    """Game types are served from an in-process copy of the table"""
+    invalidate_game_types()
+
+
+@receiver(post_delete, sender=Event)
+@receiver(post_delete, sender=Game)
+@receiver(post_delete, sender=GameType)
+@receiver(post_delete, sender=Gamer)
+def row_deleted(sender, instance, **kwargs):
+    """A shrinking listing needs a newer Last-Modified than its remaining rows"""
+    Tombstone.objects.update_or_create(
+        table=sender._meta.label, defaults={'deleted_at': timezone.now()})
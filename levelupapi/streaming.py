@@ -0,0 +1,110 @@
+"""Streaming responses for exporting whole listings
+
+Bodies are built by sync generators. Under ASGI a StreamingHttpResponse
+would consume such a generator in one go (Django lists it in a worker
+thread), holding the whole export in memory, so streaming_body() hands
+ASGI requests an async iterator that pulls one chunk at a time instead.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from levelupapi.renderers import FastJSONRenderer, NDJSONRenderer
+
+
+def stream_requested(request):
+    """Return the streaming format a client asked for, or None
+
+    Clients opt in with `?stream=1` for a chunked JSON array, or with
+    `?stream=ndjson` / `Accept: application/x-ndjson` for NDJSON.
+    """
+    if request.accepted_renderer.format == NDJSONRenderer.format:
+        return 'ndjson'
+
+    stream = request.query_params.get('stream', '').lower()
+    if stream == 'ndjson':
+        return 'ndjson'
+    if stream in ('1', 'true', 'json'):
+        return 'json'
+    return None
+
+
+async def _pull_chunks(chunks):
+    """Iterate a sync generator from async code, one chunk per worker call
+
+    Every step runs thread-sensitive, in the thread that ran the request's
+    sync view, so a cursor the generator holds open stays on the
+    connection it was created on.
+    """
+    step = sync_to_async(next, thread_sensitive=True)
+    done = object()
+    try:
+        while True:
+            chunk = await step(chunks, done)
+            if chunk is done:
+                return
+            yield chunk
+    finally:
+        # Closes the cursor when a client goes away mid-download
+        await sync_to_async(chunks.close, thread_sensitive=True)()
+
+
+def streaming_body(request, chunks):
+    """Return the body for a StreamingHttpResponse built from a sync generator
+
+    Method arguments:
+      request -- The Django or DRF request being answered
+      chunks -- Generator yielding the encoded body
+    """
+    if isinstance(getattr(request, '_request', request), ASGIRequest):
+        return _pull_chunks(chunks)
+    return chunks
+
+
+def _serialize_rows(queryset, serializer_class, context, ndjson):
+    """Yield encoded rows in batches so memory stays flat for any table size"""
+    chunk_size = getattr(settings, 'LEVELUP_STREAM_CHUNK_SIZE', 2000)
+    serializer = serializer_class(context=context)
+    renderer = FastJSONRenderer()
+
+    separator = b'\n' if ndjson else b','
+    buffer = []
+    first = True
+
+    if not ndjson:
+        yield b'['
+
+    for instance in queryset.iterator(chunk_size=chunk_size):
+        row = renderer.render(serializer.to_representation(instance))
+        if ndjson:
+            buffer.append(row + separator)
+        else:
+            buffer.append(row if first else separator + row)
+            first = False
+
+        if len(buffer) >= chunk_size:
+            yield b''.join(buffer)
+            buffer = []
+
+    if buffer:
+        yield b''.join(buffer)
+
+    if not ndjson:
+        yield b']'
+
+
+def stream_response(queryset, serializer_class, context, stream_format):
+    """Build a StreamingHttpResponse that serializes a queryset row by row
+
+    `context['request']` decides between a sync and an async body.
+
+    Returns:
+        StreamingHttpResponse -- NDJSON lines or a chunked JSON array
+    """
+    ndjson = stream_format == 'ndjson'
+    content_type = NDJSONRenderer.media_type if ndjson else 'application/json'
+    chunks = _serialize_rows(queryset, serializer_class, context, ndjson)
+    return StreamingHttpResponse(
+        streaming_body(context['request'], chunks),
+        content_type=content_type
+    )
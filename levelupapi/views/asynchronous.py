@@ -0,0 +1,152 @@
+"""Async implementations of the read-only endpoints, routed under ASGI
+
+levelup/urls_asgi.py puts these in front of the regular routes when the
+app is served by levelup/asgi.py. They read with the async ORM and
+build payloads with the row serializers, so a request waiting on a slow
+client holds no thread.
+
+Only plain, authenticated JSON GETs are served here. Anything else
+(writes, query parameters, other formats, bad credentials, missing rows)
+is handed to the synchronous DRF view that levelup/urls.py routes the
+request to, so responses and errors stay exactly the same.
+
+The async ORM calls used here (`aget`, `aiterator`) need Django 4.1 or
+newer.
+"""
+from functools import wraps
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Exists, OuterRef
+from django.http import HttpResponse
+from django.urls import resolve
+from django.views.decorators.csrf import csrf_exempt
+from levelupapi.authentication import GamerTokenAuthentication
+from levelupapi.cache import acache_profile, agame_types, aget_cached_profile
+from levelupapi.conditional import (
+    aconditional_response, catalog_state, collection_state, instance_state)
+from levelupapi.models import Event, EventGamer, Game, Gamer
+from levelupapi.renderers import FastJSONRenderer
+from levelupapi.views.event import EventSerializer
+from levelupapi.views.game_type import GameTypeSerializer
+from levelupapi.views.planner import plan_queryset
+from levelupapi.views.rows import (
+    EventRowSerializer, ProfileEventRowSerializer, profile_gamer_data)
+
+SYNC_URLCONF = 'levelup.urls'
+
+_authentication = GamerTokenAuthentication()
+
+
+async def _delegate(request):
+    """Hand the request to the synchronous view levelup/urls.py routes it to"""
+    match = resolve(request.path_info, urlconf=SYNC_URLCONF)
+    return await sync_to_async(match.func)(request, *match.args, **match.kwargs)
+
+
+def _plain_json_get(request):
+    """True for a GET/HEAD without query parameters that accepts JSON"""
+    return (
+        request.method in ('GET', 'HEAD') and
+        not request.GET and
+        'text/html' not in request.headers.get('Accept', '') and
+        request.accepts('application/json')
+    )
+
+
+def _json(data):
+    return HttpResponse(FastJSONRenderer().render(data), content_type='application/json')
+
+
+def async_read(state_func=None):
+    """Serve a plain JSON read asynchronously, delegating everything else
+
+    Method arguments:
+      state_func -- Conditional GET validators, as for conditional_get
+    """
+    def decorator(view):
+        @csrf_exempt
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if not _plain_json_get(request):
+                return await _delegate(request)
+
+            gamer = await _authentication.aauthenticate(request)
+            if gamer is None:
+                return await _delegate(request)
+            request.gamer = gamer
+
+            if state_func is None:
+                return await view(request, *args, **kwargs)
+            return await aconditional_response(request, state_func, view, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@async_read(catalog_state)
+async def game_type_list(request):
+    """Handle GET requests to get all game types"""
+    catalog = await agame_types()
+    return _json(GameTypeSerializer(list(catalog.values()), many=True).data)
+
+
+@async_read(catalog_state)
+async def game_type_detail(request, pk):
+    """Handle GET requests for single game type"""
+    catalog = await agame_types()
+    try:
+        game_type = catalog.get(int(pk))
+    except ValueError:
+        game_type = None
+    if game_type is None:
+        return await _delegate(request)
+    return _json(GameTypeSerializer(game_type).data)
+
+
+@async_read(collection_state(Event, Game, Gamer))
+async def event_list(request):
+    """Handle GET requests to events resource"""
+    events = Event.objects.annotate(
+        joined=Exists(
+            EventGamer.objects.filter(event=OuterRef('pk'), gamer=request.gamer)
+        )
+    )
+    serializer = EventRowSerializer()
+    chunk_size = getattr(settings, 'LEVELUP_STREAM_CHUNK_SIZE', 2000)
+    rows = [
+        serializer.to_representation(row)
+        async for row in EventRowSerializer.select(events).aiterator(chunk_size=chunk_size)
+    ]
+    return _json(rows)
+
+
+@async_read(instance_state(Event, 'game', 'organizer'))
+async def event_detail(request, pk):
+    """Handle GET requests for single event"""
+    try:
+        event = await plan_queryset(Event.objects.all(), EventSerializer).aget(pk=pk)
+    except (Event.DoesNotExist, ValueError):
+        return await _delegate(request)
+    # Every relation the serializer touches is already joined
+    return _json(EventSerializer(event).data)
+
+
+@async_read()
+async def profile(request):
+    """Handle GET requests to profile resource"""
+    gamer = request.gamer
+    payload = await aget_cached_profile(gamer.id)
+    if payload is None:
+        serializer = ProfileEventRowSerializer()
+        payload = {
+            "gamer": profile_gamer_data(gamer),
+            "attending": [
+                serializer.to_representation(row)
+                async for row in serializer.select(gamer.attending.all())
+            ],
+            "hosting": [
+                serializer.to_representation(row)
+                async for row in serializer.select(gamer.event_set.all())
+            ],
+        }
+        await acache_profile(gamer.id, payload)
+    return _json(payload)
@@ -6,14 +6,30 @@ from django.http import HttpResponseServerError
 from django.contrib.auth import get_user_model
 from rest_framework.decorators import action
 from rest_framework.viewsets import ViewSet
+from rest_framework.settings import api_settings
 from rest_framework.response import Response
 from rest_framework import serializers, status
-from django.db.models import Count, Q
-from levelupapi.models import Event, Gamer
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, F, OuterRef
+from django.db.models.functions import Greatest, Now
+from django.utils.dateparse import parse_date, parse_time
+from levelupapi.cache import invalidate_profiles
+from levelupapi.conditional import collection_state, conditional_get, instance_state
+from levelupapi.filters import EventQuery, UpcomingQuery
+from levelupapi.models import Event, EventGamer, Game, Gamer
+from levelupapi.models.event import event_start
+from levelupapi.renderers import NDJSONRenderer
+from levelupapi.streaming import stream_requested, stream_response
+from levelupapi.pagination import EventPagination
+from levelupapi.views.planner import plan_queryset
+from levelupapi.views.rows import (
+    EventRowSerializer, SparseFieldsMixin, TimedDataMixin, TimedListSerializer,
+    fast_serializers_enabled)
 
 
 class EventView(ViewSet):
     """Level up events"""
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, NDJSONRenderer]
 
     def create(self, request):
         """Handle POST operations
@@ -22,8 +38,8 @@ class EventView(ViewSet):
             Response -- JSON serialized event instance
         """
 
-        # Uses the token passed in the `Authorization` header
-        gamer = Gamer.objects.get(user=request.auth.user)
+        # The gamer is resolved from the token in the `Authorization` header
+        gamer = request.gamer
 
         # Try to save the new event to the database, then
         # serialize the event instance as JSON, and send the
@@ -48,6 +64,7 @@ class EventView(ViewSet):
         except ValidationError as ex:
             return Response({"reason": ex.message}, status=status.HTTP_400_BAD_REQUEST)
 
+    @conditional_get(instance_state(Event, 'game', 'organizer'))
     def retrieve(self, request, pk=None):
         """Handle GET requests for single event
 
@@ -67,7 +84,7 @@ class EventView(ViewSet):
         Returns:
             Response -- Empty body with 204 status code
         """
-        gamer = Gamer.objects.get(user=request.auth.user)
+        gamer = request.gamer
 
         # Do mostly the same thing as POST, but instead of
         # creating a new instance of Event, get the event record
@@ -102,54 +119,122 @@ class EventView(ViewSet):
         except Exception as ex:
             return Response({'message': ex.args[0]}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    @conditional_get(collection_state(Event, Game, Gamer))
     def list(self, request):
         """Handle GET requests to events resource
 
         Returns:
             Response -- JSON serialized list of events
         """
-        # Get the current authenticated user
-        gamer = Gamer.objects.get(user=request.auth.user)
-        events = Event.objects.all()
-        # events = Event.objects.annotate(attendees_count=Count('attendees'))
+        # Get the current authenticated gamer
+        gamer = request.gamer
+        # attendees_count is stored on the event, so only `joined` needs
+        # a lookup into the join table and no GROUP BY is required
         events = Event.objects.annotate(
-            attendees_count=Count('attendees'),
-            joined=Count(
-                'attendees',
-                filter=Q(attendees=gamer)
+            joined=Exists(
+                EventGamer.objects.filter(event=OuterRef('pk'), gamer=gamer)
             )
         )
-        Event.objects.filter(
-            Q(organizer=gamer) &
-            Q(game__gamer=gamer)
-        )
-
         # # Set the `joined` property on every event
         # for event in events:
         #     # Check to see if the gamer is in the attendees list on the event
         #     event.joined = gamer in event.attendees.all()
 
-        # Support filtering events by game
-        game = self.request.query_params.get('gameId', None)
-        if game is not None:
-            events = events.filter(game__id=type)
+        # Server-side filters, sorting and sparse fieldsets
+        #    http://localhost:8000/events?gameId=1&dateFrom=2022-01-01
+        #    http://localhost:8000/events?hasFreeSlots=true&ordering=-date,time
+        #    http://localhost:8000/events?fields=id,date,game
+        query = EventQuery(request)
+        events = query.filter_queryset(events)
+        ordering = query.get_ordering()
+        fields = query.get_fields()
+        context = {'request': request, 'fields': fields}
+
+        paginator = EventPagination(ordering)
+        if ordering is not None:
+            events = events.order_by(*ordering)
+
+        # Either read just the columns behind the picked fields for the
+        # row serializer, or join the game and organizer up front so the
+        # serializer doesn't run extra queries for every event
+        if fast_serializers_enabled():
+            serializer_class = EventRowSerializer
+            keys = [field.lstrip('-') for field in paginator.ordering]
+            events = serializer_class.select(events, fields, keys)
+        else:
+            serializer_class = EventSerializer
+            events = plan_queryset(events, EventSerializer)
+
+        # Clients that send a cursor or page_size get one page at a time
+        #    http://localhost:8000/events?page_size=20
+        if paginator.is_requested(request):
+            page = paginator.paginate_queryset(events, request, view=self)
+            serializer = serializer_class(page, many=True, context=context)
+            return paginator.get_paginated_response(serializer.data)
+
+        # Whole-table exports stream rows instead of building one big list
+        #    http://localhost:8000/events?stream=ndjson
+        stream_format = stream_requested(request)
+        if stream_format is not None:
+            return stream_response(events, serializer_class, context, stream_format)
+
+        serializer = serializer_class(events, many=True, context=context)
+        return Response(serializer.data)
+
+    @action(methods=['get'], detail=False)
+    # url: /events/upcoming
+    def upcoming(self, request):
+        """Handle GET requests for the next events in a time window
 
-        serializer = EventSerializer(
-            events, many=True, context={'request': request})
+            http://localhost:8000/events/upcoming
+            http://localhost:8000/events/upcoming?from=2022-01-01T18:00&to=2022-01-08&limit=10
+
+        `to=2022-01-08` includes events on January 8; a `to` with a time
+        is exclusive.
+
+        Returns:
+            Response -- JSON serialized list of events, earliest first
+        """
+        gamer = request.gamer
+        query = UpcomingQuery(request)
+        start, end = query.get_window()
+        fields = query.get_fields()
+        context = {'request': request, 'fields': fields}
+
+        # A range scan of event_starts_at_id_idx that stops after `limit`
+        # rows, already in start order, so nothing is sorted
+        events = Event.objects.filter(starts_at__gte=start)
+        if end is not None:
+            events = events.filter(starts_at__lt=end)
+        events = events.annotate(
+            joined=Exists(
+                EventGamer.objects.filter(event=OuterRef('pk'), gamer=gamer)
+            )
+        ).order_by('starts_at', 'id')
+
+        if fast_serializers_enabled():
+            serializer_class = EventRowSerializer
+            events = serializer_class.select(events, fields)
+        else:
+            serializer_class = EventSerializer
+            events = plan_queryset(events, EventSerializer)
+
+        serializer = serializer_class(
+            events[:query.get_limit()], many=True, context=context)
         return Response(serializer.data)
 
     @action(methods=['post', 'delete'], detail=True)
     # url: /events/pk/signup
     def signup(self, request, pk=None):
         """Managing gamers signing up for events"""
-        # Django uses the `Authorization` header to determine
-        # which user is making the request to sign up
-        gamer = Gamer.objects.get(user=request.auth.user)
+        # The gamer making the request is resolved from the
+        # `Authorization` header by GamerTokenAuthentication
+        gamer = request.gamer
 
         try:
             # Handle the case if the client specifies a game
             # that doesn't exist
-            event = Event.objects.get(pk=pk)
+            event = Event.objects.select_related('game').get(pk=pk)
         except Event.DoesNotExist:
             return Response(
                 {'message': 'Event does not exist.'},
@@ -158,24 +243,259 @@ class EventView(ViewSet):
 
         # A gamer wants to sign up for an event
         if request.method == "POST":
+            if EventGamer.objects.filter(event=event, gamer=gamer).exists():
+                return Response({'message': 'Already attending.'}, status=status.HTTP_200_OK)
+
             try:
-                # Using the attendees field on the event makes it simple to add a gamer to the event
-                # .add(gamer) will insert into the join table a new row the gamer_id and the event_id
-                event.attendees.add(gamer)
+                # Claim a seat with a conditional UPDATE on the stored
+                # count, which only locks this event's row, then insert
+                # the join table row. A concurrent duplicate trips the
+                # unique constraint and rolls the claimed seat back.
+                with transaction.atomic():
+                    if not _claim_seats(event, 1):
+                        return Response(
+                            {'message': 'Event is full.'},
+                            status=status.HTTP_409_CONFLICT
+                        )
+                    EventGamer.objects.create(event=event, gamer=gamer)
                 return Response({}, status=status.HTTP_201_CREATED)
+            except IntegrityError:
+                return Response({'message': 'Already attending.'}, status=status.HTTP_200_OK)
             except Exception as ex:
                 return Response({'message': ex.args[0]})
 
         # User wants to leave a previously joined event
         elif request.method == "DELETE":
             try:
-                # The many to many relationship has a .remove method that removes the gamer from the attendees list
-                # The method deletes the row in the join table that has the gamer_id and event_id
-                event.attendees.remove(gamer)
+                # Delete the row in the join table that has the gamer_id and event_id,
+                # and drop the stored attendee count by however many rows went away
+                with transaction.atomic():
+                    removed, _ = EventGamer.objects.filter(
+                        event=event, gamer=gamer).delete()
+                    if removed:
+                        _release_seats(event, removed)
                 return Response(None, status=status.HTTP_204_NO_CONTENT)
             except Exception as ex:
                 return Response({'message': ex.args[0]})
 
+    @action(methods=['post'], detail=False)
+    # url: /events/bulk
+    def bulk(self, request):
+        """Create a batch of events in one transaction
+
+        Expects a JSON array of events shaped like the body of a POST
+        to /events. Valid events are inserted with a single bulk INSERT;
+        each item gets its own result so one bad event doesn't sink the
+        rest of the batch.
+
+        Returns:
+            Response -- Per-item results; 201, 207 or 400 status code
+        """
+        gamer = request.gamer
+        items = request.data
+        if not isinstance(items, list) or not items:
+            return Response(
+                {'message': 'Expected a non-empty JSON array of events.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Look up every referenced game in one query
+        game_ids = [item.get('gameId') for item in items if isinstance(item, dict)]
+        games = Game.objects.in_bulk(
+            [game_id for game_id in game_ids if isinstance(game_id, int)])
+
+        results = []
+        events = []
+        for index, item in enumerate(items):
+            event, errors = _build_event(item, games, gamer)
+            if errors:
+                results.append({'index': index, 'status': 400, 'errors': errors})
+            else:
+                results.append({'index': index, 'status': 201})
+                events.append((index, event))
+
+        if events:
+            with transaction.atomic():
+                Event.objects.bulk_create([event for _, event in events])
+
+            # bulk_create skips post_save, so drop the organizer's profile here
+            invalidate_profiles([gamer.id])
+
+            serializer = EventSerializer(context={'request': request})
+            for index, event in events:
+                results[index]['event'] = serializer.to_representation(event)
+
+        return Response(results, status=_batch_status(len(events), len(items)))
+
+    @action(methods=['post'], detail=True, url_path='signup/bulk')
+    # url: /events/pk/signup/bulk
+    def signup_bulk(self, request, pk=None):
+        """Sign a roster of gamers up for an event in one transaction
+
+        Expects `{"gamerIds": [...]}`. Only the event's organizer can
+        register other gamers.
+
+        Returns:
+            Response -- Per-gamer results; 201, 207 or 400 status code
+        """
+        try:
+            event = Event.objects.select_related('game').get(pk=pk)
+        except Event.DoesNotExist:
+            return Response(
+                {'message': 'Event does not exist.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if event.organizer_id != request.gamer.id:
+            return Response(
+                {'message': 'Only the organizer can register a roster.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        gamer_ids = request.data.get('gamerIds') if isinstance(request.data, dict) else None
+        if not isinstance(gamer_ids, list) or not gamer_ids:
+            return Response(
+                {'message': 'Expected a non-empty gamerIds array.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        with transaction.atomic():
+            ids = [gamer_id for gamer_id in gamer_ids if isinstance(gamer_id, int)]
+            existing = set(Gamer.objects.filter(pk__in=ids).values_list('pk', flat=True))
+            attending = set(EventGamer.objects.filter(
+                event=event, gamer_id__in=existing).values_list('gamer_id', flat=True))
+
+            # Each gamer who isn't attending yet wants one seat, in roster order
+            wanted = list(dict.fromkeys(
+                gamer_id for gamer_id in ids
+                if gamer_id in existing and gamer_id not in attending))
+
+            seats = _claim_seats(event, len(wanted)) if wanted else 0
+            if wanted:
+                # A gamer may have signed up on their own since attendance
+                # was read. A claim holds the event's row, so this read is
+                # final; their seats go to the next gamers in line.
+                attending.update(EventGamer.objects.filter(
+                    event=event, gamer_id__in=wanted).values_list('gamer_id', flat=True))
+            seated = [gamer_id for gamer_id in wanted if gamer_id not in attending][:seats]
+            if len(seated) < seats:
+                _release_seats(event, seats - len(seated))
+
+            results = []
+            added = set()
+            for gamer_id in gamer_ids:
+                if not isinstance(gamer_id, int) or gamer_id not in existing:
+                    results.append({'gamerId': gamer_id, 'status': 400,
+                                    'message': 'Gamer does not exist.'})
+                elif gamer_id in attending or gamer_id in added:
+                    results.append({'gamerId': gamer_id, 'status': 200,
+                                    'message': 'Already attending.'})
+                elif gamer_id in seated:
+                    results.append({'gamerId': gamer_id, 'status': 201})
+                    added.add(gamer_id)
+                else:
+                    # Past the event's capacity; repeats are turned away too
+                    results.append({'gamerId': gamer_id, 'status': 409,
+                                    'message': 'Event is full.'})
+
+            if seated:
+                # One INSERT for the whole roster, and one m2m_changed
+                # signal for the cache and report receivers
+                event.attendees.add(*seated)
+
+        signed_up = sum(1 for result in results if result['status'] in (200, 201))
+        return Response(results, status=_batch_status(signed_up, len(gamer_ids)))
+
+
+def _claim_seats(event, seats):
+    """Reserve up to `seats` places at an event, never going past its capacity
+
+    Each attempt is a single conditional `UPDATE ... WHERE attendees_count
+    <= capacity - n`, so concurrent signups only contend for the event's
+    row and can never overbook it. When the whole request doesn't fit,
+    the remaining places are claimed by compare-and-set on the count read
+    back. Must run inside the caller's transaction.
+
+    Returns:
+        int -- Number of seats claimed, from 0 up to `seats`
+    """
+    capacity = event.game.number_of_players
+    events = Event.objects.filter(pk=event.pk)
+    if events.filter(attendees_count__lte=capacity - seats).update(
+            attendees_count=F('attendees_count') + seats, updated_at=Now()):
+        return seats
+
+    while True:
+        taken = events.values_list('attendees_count', flat=True).first()
+        wanted = min(seats, capacity - taken) if taken is not None else 0
+        if wanted <= 0:
+            return 0
+        if events.filter(attendees_count=taken).update(
+                attendees_count=taken + wanted, updated_at=Now()):
+            return wanted
+
+
+def _release_seats(event, seats):
+    """Give `seats` places at an event back, never taking the count below zero"""
+    Event.objects.filter(pk=event.pk).update(
+        attendees_count=Greatest(F('attendees_count') - seats, 0), updated_at=Now())
+
+
+def _build_event(item, games, gamer):
+    """Validate one item of a bulk request and build its unsaved Event
+
+    Returns:
+        tuple -- (Event, None) when valid, otherwise (None, errors by field)
+    """
+    if not isinstance(item, dict):
+        return None, {'non_field_errors': 'Expected an object.'}
+
+    errors = {}
+    for field in ('date', 'time', 'gameId', 'description'):
+        if item.get(field) in (None, ''):
+            errors[field] = 'This field is required.'
+
+    try:
+        date = parse_date(str(item.get('date', '')))
+        if date is None and 'date' not in errors:
+            errors['date'] = 'Expected a date like 2021-12-23.'
+    except ValueError:
+        errors['date'] = 'Invalid date.'
+
+    try:
+        time = parse_time(str(item.get('time', '')))
+        if time is None and 'time' not in errors:
+            errors['time'] = 'Expected a time like 12:00:00.'
+    except ValueError:
+        errors['time'] = 'Invalid time.'
+
+    game = games.get(item.get('gameId')) if isinstance(item.get('gameId'), int) else None
+    if game is None and 'gameId' not in errors:
+        errors['gameId'] = 'Game does not exist.'
+
+    if errors:
+        return None, errors
+
+    # Attach the game and organizer so serializing the result needs no query
+    # bulk_create skips Event.save(), which sets starts_at otherwise
+    return Event(
+        date=date,
+        time=time,
+        starts_at=event_start(date, time),
+        game=game,
+        description=item['description'],
+        organizer=gamer
+    ), None
+
+
+def _batch_status(succeeded, total):
+    """201 when the whole batch went through, 400 when none did, else 207"""
+    if succeeded == total:
+        return status.HTTP_201_CREATED
+    if succeeded == 0:
+        return status.HTTP_400_BAD_REQUEST
+    return status.HTTP_207_MULTI_STATUS
+
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -191,18 +511,28 @@ class GamerSerializer(serializers.ModelSerializer):
         fields = ['id','user']
 
 
-class EventSerializer(serializers.ModelSerializer):
+class EventGameSerializer(serializers.ModelSerializer):
+    """The game nested in an event; `updated_at` stays out of the payload"""
+    class Meta:
+        model = Game
+        fields = ('id', 'title', 'maker', 'number_of_players',
+                  'skill_level', 'game_type', 'gamer')
+
+
+class EventSerializer(TimedDataMixin, SparseFieldsMixin, serializers.ModelSerializer):
     """JSON serializer for events
 
     Arguments:
         serializer type
     """
+    game = EventGameSerializer(many=False)
     organizer = GamerSerializer(many=False)
     joined = serializers.BooleanField(required=False)
-    attendees_count = serializers.IntegerField(default=None)
+    attendees_count = serializers.IntegerField(read_only=True)
     
     class Meta:
         model = Event
         fields = ('id', 'date', 'time', 'game',
                   'organizer', 'description', 'joined', 'attendees_count')
         depth = 1
+        list_serializer_class = TimedListSerializer
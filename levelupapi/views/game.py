@@ -3,15 +3,43 @@ from django.core.exceptions import ValidationError
 from rest_framework import status
 from django.http import HttpResponseServerError
 from rest_framework.viewsets import ViewSet
+from rest_framework.settings import api_settings
 from rest_framework.response import Response
 from rest_framework import serializers
 from rest_framework import status
 from django.db.models import Count, Q
-from levelupapi.models import Game, GameType, Gamer
+from levelupapi.cache import attach_game_types, get_game_type
+from levelupapi.conditional import collection_state, conditional_get, instance_state
+from levelupapi.filters import GameQuery
+from levelupapi.models import Event, Game, Gamer, GameType
+from levelupapi.renderers import NDJSONRenderer
+from levelupapi.streaming import stream_requested, stream_response
+from levelupapi.views.game_type import GameTypeSerializer
+from levelupapi.pagination import GamePagination
+from levelupapi.views.rows import (
+    GameRowSerializer, SparseFieldsMixin, TimedDataMixin, TimedListSerializer,
+    fast_serializers_enabled)
+
+
+def _wanted_counts(query):
+    """Names of the event counts a games list returns or sorts on"""
+    wanted = set(query.get_fields() or query.fields)
+    wanted.update(field.lstrip('-') for field in query.get_ordering() or ())
+    return [name for name in ('event_count', 'user_event_count') if name in wanted]
+
+
+def _games_state(request, *args, **kwargs):
+    """Validators for /games; events only matter when a count is in the payload"""
+    # The game's gamer is nested in every game in the list
+    models = [Game, GameType, Gamer]
+    if _wanted_counts(GameQuery(request)):
+        models.append(Event)
+    return collection_state(*models)(request, *args, **kwargs)
 
 
 class GameView(ViewSet):
     """Level up games"""
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, NDJSONRenderer]
 
     def create(self, request):
         """Handle POST operations
@@ -20,13 +48,16 @@ class GameView(ViewSet):
             Response -- JSON serialized game instance
         """
 
-        # Uses the token passed in the `Authorization` header
-        gamer = Gamer.objects.get(user=request.auth.user)
+        # The gamer is resolved from the token in the `Authorization` header
+        gamer = request.gamer
 
-        # Use the Django ORM to get the record from the database
-        # whose `id` is what the client passed as the
-        # `gameTypeId` in the body of the request.
-        game_type = GameType.objects.get(pk=request.data["gameTypeId"])
+        # Look up the game type whose `id` is what the client passed
+        # as the `gameTypeId` in the body of the request. The catalog
+        # is cached in process, so this doesn't touch the database.
+        game_type = get_game_type(request.data.get("gameTypeId"))
+        if game_type is None:
+            return Response({"reason": "Unknown gameTypeId"},
+                            status=status.HTTP_400_BAD_REQUEST)
 
         # Try to save the new game to the database, then
         # serialize the game instance as JSON, and send the
@@ -52,6 +83,7 @@ class GameView(ViewSet):
         except ValidationError as ex:
             return Response({"reason": ex.message}, status=status.HTTP_400_BAD_REQUEST)
 
+    @conditional_get(instance_state(Game, 'game_type', 'gamer'))
     def retrieve(self, request, pk=None):
         """Handle GET requests for single game
 
@@ -64,7 +96,8 @@ class GameView(ViewSet):
             #   http://localhost:8000/games/2
             #
             # The `2` at the end of the route becomes `pk`
-            game = Game.objects.get(pk=pk)
+            game = Game.objects.select_related('gamer').get(pk=pk)
+            attach_game_types([game])
             serializer = GameSerializer(game, context={'request': request})
             return Response(serializer.data)
         except Exception as ex:
@@ -76,7 +109,7 @@ class GameView(ViewSet):
         Returns:
             Response -- Empty body with 204 status code
         """
-        gamer = Gamer.objects.get(user=request.auth.user)
+        gamer = request.gamer
 
         # Do mostly the same thing as POST, but instead of
         # creating a new instance of Game, get the game record
@@ -88,7 +121,10 @@ class GameView(ViewSet):
         game.skill_level = request.data["skillLevel"]
         game.gamer = gamer
 
-        game_type = GameType.objects.get(pk=request.data["gameTypeId"])
+        game_type = get_game_type(request.data.get("gameTypeId"))
+        if game_type is None:
+            return Response({"reason": "Unknown gameTypeId"},
+                            status=status.HTTP_400_BAD_REQUEST)
         game.game_type = game_type
         game.save()
 
@@ -114,38 +150,84 @@ class GameView(ViewSet):
         except Exception as ex:
             return Response({'message': ex.args[0]}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    @conditional_get(_games_state)
     def list(self, request):
         """Handle GET requests to games resource
 
         Returns:
             Response -- JSON serialized list of games
         """
-        gamer = Gamer.objects.get(user=request.auth.user)
-        games = Game.objects.all()
-        games = Game.objects.annotate(event_count=Count('events'),
-                                      user_event_count=(
-                                          Count('events', filter=Q(gamer=gamer)))
-                                      )
-
-        # Support filtering games by type
-        #    http://localhost:8000/games?type=1
-        #
-        # That URL will retrieve all tabletop games
-        game_type = self.request.query_params.get('type', None)
-        if game_type is not None:
-            games = games.filter(game_type__id=game_type)
-
-        serializer = GameSerializer(
-            games, many=True, context={'request': request})
+        gamer = request.gamer
+
+        # Server-side filters, sorting and sparse fieldsets
+        #    http://localhost:8000/games?type=1&skillLevel=3
+        #    http://localhost:8000/games?ordering=-event_count,title
+        #    http://localhost:8000/games?fields=id,title
+        query = GameQuery(request)
+        ordering = query.get_ordering()
+        fields = query.get_fields()
+        context = {'request': request, 'fields': fields}
+
+        # The counts join and group every event, so they are only
+        # computed when they are returned or sorted on
+        counts = {
+            'event_count': Count('events'),
+            'user_event_count': Count('events', filter=Q(gamer=gamer)),
+        }
+        games = Game.objects.select_related('gamer').annotate(
+            **{name: counts[name] for name in _wanted_counts(query)})
+        games = query.filter_queryset(games)
+
+        paginator = GamePagination(ordering)
+        if ordering is not None:
+            games = games.order_by(*ordering)
+
+        # The row serializer reads flat rows and takes the nested game
+        # type from the cached catalog, as do the model instances below
+        fast = fast_serializers_enabled()
+        serializer_class = GameRowSerializer if fast else GameSerializer
+        if fast:
+            keys = [field.lstrip('-') for field in paginator.ordering]
+            games = serializer_class.select(games, fields, keys)
+
+        # Clients that send a cursor or page_size get one page at a time
+        if paginator.is_requested(request):
+            page = paginator.paginate_queryset(games, request, view=self)
+            if not fast:
+                attach_game_types(page)
+            serializer = serializer_class(page, many=True, context=context)
+            return paginator.get_paginated_response(serializer.data)
+
+        # Whole-table exports stream rows instead of building one big list
+        #    http://localhost:8000/games?stream=ndjson
+        stream_format = stream_requested(request)
+        if stream_format is not None:
+            if not fast:
+                games = games.select_related('game_type')
+            return stream_response(games, serializer_class, context, stream_format)
+
+        if not fast:
+            # Nested game types come from the cached catalog instead of a join
+            games = attach_game_types(list(games))
+        serializer = serializer_class(games, many=True, context=context)
         return Response(serializer.data)
 
 
-class GameSerializer(serializers.ModelSerializer):
+class GameGamerSerializer(serializers.ModelSerializer):
+    """The gamer nested in a game"""
+    class Meta:
+        model = Gamer
+        fields = ('id', 'bio', 'user')
+
+
+class GameSerializer(TimedDataMixin, SparseFieldsMixin, serializers.ModelSerializer):
     """JSON serializer for games
 
     Arguments:
         serializer type
     """
+    game_type = GameTypeSerializer(many=False)
+    gamer = GameGamerSerializer(many=False)
     event_count = serializers.IntegerField(default=None)
     user_event_count = serializers.IntegerField(default=None)
 
@@ -154,3 +236,4 @@ class GameSerializer(serializers.ModelSerializer):
         fields = ('id', 'title', 'maker', 'number_of_players',
                   'skill_level', 'game_type', 'gamer', 'event_count', 'user_event_count')
         depth = 1
+        list_serializer_class = TimedListSerializer
@@ -1,34 +1,45 @@
 """View module for handling requests about game types"""
-from django.http import HttpResponseServerError
+from rest_framework import status
 from rest_framework.viewsets import ViewSet
 from rest_framework.response import Response
 from rest_framework import serializers
+from levelupapi.cache import game_types as cached_game_types, get_game_type
+from levelupapi.conditional import catalog_state, conditional_get
 from levelupapi.models import GameType
+from levelupapi.views.rows import TimedDataMixin, TimedListSerializer
 
 
 class GameTypeView(ViewSet):
-    """Level up game types"""
+    """Level up game types
 
+    Both actions are served from the in-process game type catalog, so
+    neither touches the database once it is loaded.
+    """
+
+    @conditional_get(catalog_state)
     def retrieve(self, request, pk=None):
         """Handle GET requests for single game type
 
         Returns:
-            Response -- JSON serialized game type
+            Response -- JSON serialized game type, or 404
         """
-        try:
-            game_type = GameType.objects.get(pk=pk)
-            serializer = GameTypeSerializer(game_type, context={'request': request})
-            return Response(serializer.data)
-        except Exception as ex:
-            return HttpResponseServerError(ex)
+        game_type = get_game_type(pk)
+        if game_type is None:
+            return Response(
+                {'message': 'GameType matching query does not exist.'},
+                status=status.HTTP_404_NOT_FOUND)
+
+        serializer = GameTypeSerializer(game_type, context={'request': request})
+        return Response(serializer.data)
 
+    @conditional_get(catalog_state)
     def list(self, request):
         """Handle GET requests to get all game types
 
         Returns:
             Response -- JSON serialized list of game types
         """
-        game_types = GameType.objects.all()
+        game_types = list(cached_game_types().values())
 
         # Note the additional `many=True` argument to the
         # serializer. It's needed when you are serializing
@@ -37,7 +48,7 @@ class GameTypeView(ViewSet):
             game_types, many=True, context={'request': request})
         return Response(serializer.data)
 
-class GameTypeSerializer(serializers.ModelSerializer):
+class GameTypeSerializer(TimedDataMixin, serializers.ModelSerializer):
     """JSON serializer for game types
 
     Arguments:
@@ -46,3 +57,4 @@ class GameTypeSerializer(serializers.ModelSerializer):
     class Meta:
         model = GameType
         fields = ('id', 'label')
+        list_serializer_class = TimedListSerializer
@@ -0,0 +1,71 @@
+"""Module for deriving the joins a serializer needs from its declared fields"""
+from functools import lru_cache
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+
+def _walk(serializer, model, prefix, in_prefetch, select, prefetch):
+    """Collect relation lookups touched by a serializer's fields
+
+    Method arguments:
+      serializer -- The serializer instance whose fields are walked
+      model -- The model class the serializer represents
+      prefix -- Lookup prefix for nested serializers, e.g. `organizer__`
+      in_prefetch -- True once a many relation has been crossed
+      select -- List collecting select_related lookups
+      prefetch -- List collecting prefetch_related lookups
+    """
+    for field in serializer.fields.values():
+        if field.write_only or field.source == '*' or '.' in field.source:
+            continue
+
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            # Annotations and properties don't need a join
+            continue
+
+        if not model_field.is_relation:
+            continue
+
+        # A plain primary key field reads the `_id` column, no join needed
+        if not isinstance(field, (serializers.BaseSerializer, serializers.ManyRelatedField)):
+            continue
+
+        lookup = f"{prefix}{field.source}"
+        many = model_field.many_to_many or model_field.one_to_many
+        if many or in_prefetch:
+            prefetch.append(lookup)
+        else:
+            select.append(lookup)
+
+        child = field.child if isinstance(field, serializers.ListSerializer) else field
+        if isinstance(child, serializers.BaseSerializer):
+            _walk(child, model_field.related_model, f"{lookup}__",
+                  in_prefetch or many, select, prefetch)
+
+
+@lru_cache(maxsize=None)
+def related_lookups(serializer_class):
+    """Return the select_related and prefetch_related lookups for a serializer
+
+    Returns:
+        tuple -- (select_related lookups, prefetch_related lookups)
+    """
+    select, prefetch = [], []
+    _walk(serializer_class(), serializer_class.Meta.model, '', False, select, prefetch)
+    return tuple(select), tuple(prefetch)
+
+
+def plan_queryset(queryset, serializer_class):
+    """Add the joins a serializer will need so rows serialize without extra queries
+
+    Returns:
+        QuerySet -- The queryset with select_related/prefetch_related applied
+    """
+    select, prefetch = related_lookups(serializer_class)
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    return queryset
@@ -3,6 +3,10 @@ from rest_framework.response import Response
 from rest_framework import serializers
 from levelupapi.models import Game, Event, Gamer
 from django.contrib.auth import get_user_model
+from levelupapi.cache import cache_profile, get_cached_profile
+from levelupapi.views.rows import (
+    ProfileEventRowSerializer, TimedDataMixin, TimedListSerializer,
+    fast_serializers_enabled, profile_gamer_data)
 
 @api_view(['GET'])
 def user_profile(request):
@@ -11,7 +15,14 @@ def user_profile(request):
     Returns:
         Response -- JSON representation of user info and events
     """
-    gamer = Gamer.objects.get(user=request.auth.user)
+    gamer = request.gamer
+
+    # The rendered payload is cached per gamer and dropped by the
+    # receivers in levelupapi/signals.py whenever it changes
+    profile = get_cached_profile(gamer.id)
+    if profile is not None:
+        return Response(profile)
+
     # events = Event.objects.all()
     
     # TODO: Use the django orm to filter events if the gamer is attending the event
@@ -21,19 +32,29 @@ def user_profile(request):
 
     # TODO: Use the orm to filter events if the gamer is hosting the event
 
-    attending = EventSerializer(
-        attending, many=True, context={'request': request})
-    hosting = EventSerializer(
-        hosting, many=True, context={'request': request})
-    gamer = GamerSerializer(
-        gamer, many=False, context={'request': request})
+    if fast_serializers_enabled():
+        # Flat rows with the game title joined in, and the gamer that
+        # authentication already loaded
+        gamer_data = profile_gamer_data(gamer)
+        attending = ProfileEventRowSerializer(
+            ProfileEventRowSerializer.select(attending), many=True).data
+        hosting = ProfileEventRowSerializer(
+            ProfileEventRowSerializer.select(hosting), many=True).data
+    else:
+        gamer_data = GamerSerializer(
+            gamer, many=False, context={'request': request}).data
+        attending = EventSerializer(
+            attending, many=True, context={'request': request}).data
+        hosting = EventSerializer(
+            hosting, many=True, context={'request': request}).data
 
     # Manually construct the JSON structure you want in the response
     profile = {
-        "gamer": gamer.data,
-        "attending": attending.data,
-        "hosting": hosting.data
+        "gamer": gamer_data,
+        "attending": attending,
+        "hosting": hosting
     }
+    cache_profile(gamer.id, profile)
 
     return Response(profile)
 
@@ -44,7 +65,7 @@ class UserSerializer(serializers.ModelSerializer):
         fields = ('first_name', 'last_name', 'username')
 
 
-class GamerSerializer(serializers.ModelSerializer):
+class GamerSerializer(TimedDataMixin, serializers.ModelSerializer):
     """JSON serializer for gamers"""
     user = UserSerializer(many=False)
 
@@ -60,10 +81,11 @@ class GameSerializer(serializers.ModelSerializer):
         fields = ('title',)
 
 
-class EventSerializer(serializers.ModelSerializer):
+class EventSerializer(TimedDataMixin, serializers.ModelSerializer):
     """JSON serializer for events"""
     game = GameSerializer(many=False)
 
     class Meta:
         model = Event
-        fields = ('id', 'game', 'description', 'date', 'time')
\ No newline at end of file
+        fields = ('id', 'game', 'description', 'date', 'time')
+        list_serializer_class = TimedListSerializer
\ No newline at end of file
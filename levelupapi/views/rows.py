@@ -0,0 +1,237 @@
+"""Serializers that build list payloads straight from `.values()` rows
+
+`ModelSerializer` with `depth = 1` builds a field tree and nested
+serializer instances and walks them for every row, which dominates the
+cost of rendering large lists. The classes here produce the very same
+JSON as their `ModelSerializer` counterparts from flat `.values()` rows.
+Views pick them when `LEVELUP_FAST_SERIALIZERS` is on.
+
+Keys are listed in the order DRF emits them: for nested models that is
+the primary key, then plain fields, then relations.
+"""
+from abc import ABC, abstractmethod
+from django.conf import settings
+from rest_framework import serializers
+from levelup.middleware import serializer_timing
+from levelupapi.cache import game_types, get_game_type
+
+# DRF's own field conversions, so dates and times format exactly alike
+_date = serializers.DateField().to_representation
+_time = serializers.TimeField().to_representation
+
+
+def fast_serializers_enabled():
+    """Return True when list views should use the row serializers"""
+    return getattr(settings, 'LEVELUP_FAST_SERIALIZERS', True)
+
+
+class SparseFieldsMixin:
+    """Drop the fields a client left out of `?fields=` from a DRF serializer
+
+    The picked fields are passed as `context['fields']`, like the row
+    serializers below take them.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = self.context.get('fields')
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class TimedDataMixin:
+    """Count building a DRF serializer's `data` towards the `ser` metric
+
+    Serializers using it set `list_serializer_class = TimedListSerializer`
+    in their Meta, so `many=True` lists are timed as well.
+    """
+
+    @property
+    def data(self):
+        with serializer_timing():
+            return super().data
+
+
+class TimedListSerializer(TimedDataMixin, serializers.ListSerializer):
+    """ListSerializer for serializers that use TimedDataMixin"""
+
+
+class RowSerializer(ABC):
+    """Minimal stand-in for a serializer that reads `.values()` rows
+
+    Subclasses map every payload field to the `columns` it is built from
+    and build one full payload in `build`. Instances take the same
+    arguments and expose the same `data` and `to_representation` as a
+    DRF serializer, so pagination and streaming accept either.
+
+    With `context['fields']` set only those payload fields are selected
+    and returned.
+    """
+    columns = {}
+
+    def __init__(self, instance=None, many=False, context=None):
+        self.instance = instance
+        self.many = many
+        self.context = context or {}
+        self.fields = self.context.get('fields')
+        if self.fields is not None:
+            # Columns a sparse select leaves out read as None
+            self._blank = dict.fromkeys(
+                column for columns in self.columns.values() for column in columns)
+
+    @classmethod
+    def select(cls, queryset, fields=None, keys=()):
+        """Narrow a queryset to the columns behind the given payload fields
+
+        Method arguments:
+          fields -- Payload fields to build, all of them if None
+          keys -- Extra columns to read, such as the pagination keys
+        """
+        fields = cls.columns if fields is None else fields
+        columns = [column for field in fields for column in cls.columns[field]]
+        return queryset.values(*dict.fromkeys([*columns, *keys]))
+
+    @property
+    def data(self):
+        with serializer_timing():
+            if self.many:
+                return [self.to_representation(row) for row in self.instance]
+            return self.to_representation(self.instance)
+
+    def to_representation(self, row):
+        """Build the payload of one row, trimmed to the picked fields"""
+        if self.fields is None:
+            return self.build(row)
+        payload = self.build({**self._blank, **row})
+        return {field: payload[field] for field in self.fields}
+
+    @abstractmethod
+    def build(self, row):
+        """Build the full payload of one row with every column present"""
+
+
+class EventRowSerializer(RowSerializer):
+    """Rows for levelupapi.views.event.EventSerializer"""
+    columns = {
+        'id': ('id',),
+        'date': ('date',),
+        'time': ('time',),
+        'game': ('game_id', 'game__title', 'game__maker', 'game__number_of_players',
+                 'game__skill_level', 'game__game_type_id', 'game__gamer_id'),
+        'organizer': ('organizer_id', 'organizer__user__first_name',
+                      'organizer__user__last_name'),
+        'description': ('description',),
+        'joined': ('joined',),
+        'attendees_count': ('attendees_count',),
+    }
+
+    def build(self, row):
+        return {
+            'id': row['id'],
+            'date': _date(row['date']),
+            'time': _time(row['time']),
+            'game': {
+                'id': row['game_id'],
+                'title': row['game__title'],
+                'maker': row['game__maker'],
+                'number_of_players': row['game__number_of_players'],
+                'skill_level': row['game__skill_level'],
+                'game_type': row['game__game_type_id'],
+                'gamer': row['game__gamer_id'],
+            },
+            'organizer': {
+                'id': row['organizer_id'],
+                'user': {
+                    'first_name': row['organizer__user__first_name'],
+                    'last_name': row['organizer__user__last_name'],
+                },
+            },
+            'description': row['description'],
+            'joined': bool(row['joined']),
+            'attendees_count': row['attendees_count'],
+        }
+
+
+class GameRowSerializer(RowSerializer):
+    """Rows for levelupapi.views.game.GameSerializer
+
+    The nested game type comes from the cached catalog, so the rows
+    only carry its id.
+    """
+    columns = {
+        'id': ('id',),
+        'title': ('title',),
+        'maker': ('maker',),
+        'number_of_players': ('number_of_players',),
+        'skill_level': ('skill_level',),
+        'game_type': ('game_type_id',),
+        'gamer': ('gamer_id', 'gamer__user_id', 'gamer__bio'),
+        'event_count': ('event_count',),
+        'user_event_count': ('user_event_count',),
+    }
+
+    def __init__(self, instance=None, many=False, context=None):
+        super().__init__(instance, many, context)
+        self._game_types = {}
+
+    def _game_type(self, game_type_id):
+        if game_type_id is None:
+            return None
+        payload = self._game_types.get(game_type_id)
+        if payload is None:
+            game_type = game_types().get(game_type_id) or get_game_type(game_type_id)
+            payload = {'id': game_type.id, 'label': game_type.label}
+            self._game_types[game_type_id] = payload
+        return payload
+
+    def build(self, row):
+        event_count = row['event_count']
+        user_event_count = row['user_event_count']
+        return {
+            'id': row['id'],
+            'title': row['title'],
+            'maker': row['maker'],
+            'number_of_players': row['number_of_players'],
+            'skill_level': row['skill_level'],
+            'game_type': self._game_type(row['game_type_id']),
+            'gamer': {
+                'id': row['gamer_id'],
+                'bio': row['gamer__bio'],
+                'user': row['gamer__user_id'],
+            },
+            'event_count': None if event_count is None else int(event_count),
+            'user_event_count': None if user_event_count is None else int(user_event_count),
+        }
+
+
+class ProfileEventRowSerializer(RowSerializer):
+    """Rows for levelupapi.views.profile.EventSerializer"""
+    columns = {
+        'id': ('id',),
+        'game': ('game__title',),
+        'description': ('description',),
+        'date': ('date',),
+        'time': ('time',),
+    }
+
+    def build(self, row):
+        return {
+            'id': row['id'],
+            'game': {'title': row['game__title']},
+            'description': row['description'],
+            'date': _date(row['date']),
+            'time': _time(row['time']),
+        }
+
+
+def profile_gamer_data(gamer):
+    """The levelupapi.views.profile.GamerSerializer payload of a loaded gamer"""
+    return {
+        'user': {
+            'first_name': gamer.user.first_name,
+            'last_name': gamer.user.last_name,
+            'username': gamer.user.username,
+        },
+        'bio': gamer.bio,
+    }
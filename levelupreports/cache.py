@@ -0,0 +1,70 @@
+"""Version stamps for the per-gamer fragments of the HTML reports
+
+Each gamer's section of a report page is cached by `{% cache %}` under
+the gamer's id and current version stamp. The report signals give a
+gamer a new stamp whenever rows of theirs change in a summary table, so
+the next page view renders just that gamer's section again and the
+fragments built from the old data are left to expire.
+
+The stamps are only useful when every worker reads the same ones, so
+the `reports` cache has to be shared between processes (see CACHES in
+levelup/settings.py).
+"""
+import time
+from django.core.cache import caches
+from django.db import transaction
+
+REPORT_CACHE = 'reports'
+
+
+def _version_key(gamer_id):
+    return f"report-version:{gamer_id}"
+
+
+def gamer_versions(gamer_ids):
+    """Return {gamer_id: version stamp}, stamping gamers seen the first time"""
+    cache = caches[REPORT_CACHE]
+    keys = {_version_key(gamer_id): gamer_id for gamer_id in gamer_ids}
+    versions = {keys[key]: stamp for key, stamp in cache.get_many(keys).items()}
+
+    missing = {key: time.time_ns() for key, gamer_id in keys.items() if gamer_id not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update((keys[key], stamp) for key, stamp in missing.items())
+    return versions
+
+
+def attach_versions(groups, versions):
+    """Set `version` on each gamer group of a report page, for its fragment key
+
+    `versions` must come from gamer_versions() called before the page's
+    rows were read; see bump_gamer_versions.
+    """
+    for group in groups:
+        group['version'] = versions[group['gamer_id']]
+    return groups
+
+
+def bump_gamer_versions(gamer_ids):
+    """Give gamers a new version stamp once the current transaction commits
+
+    Bumping before the commit would let a concurrent page view cache the
+    old rows under the new stamp. Page views read the stamps before the
+    rows for the same reason: rows read after a stamp are never older
+    than it.
+    """
+    gamer_ids = {gamer_id for gamer_id in gamer_ids if gamer_id is not None}
+    if not gamer_ids:
+        return
+
+    def bump():
+        stamp = time.time_ns()
+        caches[REPORT_CACHE].set_many(
+            {_version_key(gamer_id): stamp for gamer_id in gamer_ids}, timeout=None)
+
+    transaction.on_commit(bump)
+
+
+def clear_report_fragments():
+    """Drop every cached fragment and stamp, e.g. after a full rebuild"""
+    caches[REPORT_CACHE].clear()
@@ -0,0 +1,15 @@
+"""Management command that rebuilds the report summary tables from scratch"""
+from django.core.management.base import BaseCommand
+from levelupreports.cache import clear_report_fragments
+from levelupreports.summaries import EVENTS, GAMES, rebuild
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the pre-joined report tables, e.g. after loading fixtures'
+
+    def handle(self, *args, **options):
+        for summary in (GAMES, EVENTS):
+            count = rebuild(summary)
+            self.stdout.write(
+                f"Rebuilt {summary.model._meta.db_table} with {count} row(s)")
+        clear_report_fragments()
@@ -0,0 +1,74 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:48
+
+from django.db import migrations, models
+
+
+POPULATE_GAMES = """
+    INSERT INTO levelupreports_usergamesummary
+    (game_id, gamer_id, full_name, title, maker, number_of_players, skill_level, game_type_id)
+    SELECT g.id, gr.id, u.first_name || ' ' || u.last_name, g.title, g.maker,
+    g.number_of_players, g.skill_level, g.game_type_id
+    FROM levelupapi_game g
+    JOIN levelupapi_gamer gr on gr.id = g.gamer_id
+    JOIN auth_user u on u.id = gr.user_id
+"""
+
+POPULATE_EVENTS = """
+    INSERT INTO levelupreports_usereventsummary
+    (attendance_id, event_id, game_id, gamer_id, full_name, game_title, date, time)
+    SELECT eg.id, e.id, ga.id, g.id, u.first_name || ' ' || u.last_name, ga.title, e.date, e.time
+    FROM levelupapi_eventgamer eg
+    JOIN levelupapi_event e on e.id = eg.event_id
+    JOIN levelupapi_gamer g on g.id = eg.gamer_id
+    JOIN auth_user u on u.id = g.user_id
+    JOIN levelupapi_game ga on ga.id = e.game_id
+"""
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('levelupapi', '0004_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserEventSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('attendance_id', models.BigIntegerField(unique=True)),
+                ('event_id', models.BigIntegerField(db_index=True)),
+                ('game_id', models.BigIntegerField(db_index=True)),
+                ('gamer_id', models.BigIntegerField()),
+                ('full_name', models.CharField(max_length=301)),
+                ('game_title', models.CharField(max_length=50)),
+                ('date', models.DateField()),
+                ('time', models.TimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['gamer_id', 'date', 'time'], name='userevent_gamer_date_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='UserGameSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('game_id', models.BigIntegerField(unique=True)),
+                ('gamer_id', models.BigIntegerField()),
+                ('full_name', models.CharField(max_length=301)),
+                ('title', models.CharField(max_length=50)),
+                ('maker', models.CharField(max_length=50)),
+                ('number_of_players', models.IntegerField()),
+                ('skill_level', models.IntegerField()),
+                ('game_type_id', models.BigIntegerField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['gamer_id', 'game_id'], name='usergame_gamer_game_idx')],
+            },
+        ),
+        migrations.RunSQL(POPULATE_GAMES, migrations.RunSQL.noop),
+        migrations.RunSQL(POPULATE_EVENTS, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,2 @@
+from .user_game_summary import UserGameSummary
+from .user_event_summary import UserEventSummary
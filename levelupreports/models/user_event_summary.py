@@ -0,0 +1,26 @@
+from django.db import models
+
+
+class UserEventSummary(models.Model):
+    """
+    One row per attendance, pre-joined with the gamer's name and the game title
+    for the events by user report
+    """
+
+    attendance_id = models.BigIntegerField(unique=True)
+    event_id = models.BigIntegerField(db_index=True)
+    game_id = models.BigIntegerField(db_index=True)
+    gamer_id = models.BigIntegerField()
+    full_name = models.CharField(max_length=301)
+    game_title = models.CharField(max_length=50)
+    date = models.DateField()
+    time = models.TimeField()
+
+    class Meta:
+        indexes = [
+            # The report reads every row in gamer order, then by date
+            models.Index(fields=['gamer_id', 'date', 'time'], name='userevent_gamer_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.full_name} attending {self.game_title} on {self.date}"
@@ -0,0 +1,25 @@
+from django.db import models
+
+
+class UserGameSummary(models.Model):
+    """
+    One row per game, pre-joined with its owner's name for the games by user report
+    """
+
+    game_id = models.BigIntegerField(unique=True)
+    gamer_id = models.BigIntegerField()
+    full_name = models.CharField(max_length=301)
+    title = models.CharField(max_length=50)
+    maker = models.CharField(max_length=50)
+    number_of_players = models.IntegerField()
+    skill_level = models.IntegerField()
+    game_type_id = models.BigIntegerField()
+
+    class Meta:
+        indexes = [
+            # The report reads every row in gamer order
+            models.Index(fields=['gamer_id', 'game_id'], name='usergame_gamer_game_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.full_name} owns {self.title}"
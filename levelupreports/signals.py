@@ -0,0 +1,91 @@
+"""Signal receivers that refresh the report summary tables incrementally
+
+Every gamer whose summary rows change gets a new fragment version stamp,
+so their cached sections of the HTML reports are rendered again.
+
+Fixture loads (`raw` saves) are skipped because related rows may not be
+loaded yet; run `manage.py rebuild_reports` afterwards instead.
+"""
+from django.contrib.auth.models import User
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from levelupapi.models import Event, EventGamer, Game, Gamer
+from levelupreports.cache import bump_gamer_versions
+from levelupreports.summaries import EVENTS, GAMES, refresh, remove
+
+
+@receiver(post_save, sender=Game)
+def game_saved(sender, instance, raw=False, **kwargs):
+    """A game's own row, and the title on every attendance of its events"""
+    if raw:
+        return
+    changed = refresh(GAMES, 'game_id', [instance.pk])
+    changed |= refresh(EVENTS, 'game_id', [instance.pk])
+    bump_gamer_versions(changed)
+
+
+@receiver(post_delete, sender=Game)
+def game_deleted(sender, instance, **kwargs):
+    changed = remove(GAMES, 'game_id', [instance.pk])
+    changed |= remove(EVENTS, 'game_id', [instance.pk])
+    bump_gamer_versions(changed)
+
+
+@receiver(post_save, sender=Event)
+def event_saved(sender, instance, created, raw=False, **kwargs):
+    """Date, time and game are copied onto every attendance of the event"""
+    if raw or created:
+        return
+    bump_gamer_versions(refresh(EVENTS, 'event_id', [instance.pk]))
+
+
+@receiver(post_delete, sender=Event)
+def event_deleted(sender, instance, **kwargs):
+    bump_gamer_versions(remove(EVENTS, 'event_id', [instance.pk]))
+
+
+@receiver(post_save, sender=EventGamer)
+def attendance_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    bump_gamer_versions(refresh(EVENTS, 'attendance_id', [instance.pk]))
+
+
+@receiver(post_delete, sender=EventGamer)
+def attendance_deleted(sender, instance, **kwargs):
+    bump_gamer_versions(remove(EVENTS, 'attendance_id', [instance.pk]))
+
+
+@receiver(m2m_changed, sender=Event.attendees.through)
+def attendees_changed(sender, instance, action, reverse, **kwargs):
+    """event.attendees.add/remove/clear don't send the EventGamer signals"""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    bump_gamer_versions(refresh(EVENTS, 'gamer_id' if reverse else 'event_id', [instance.pk]))
+
+
+@receiver(post_save, sender=Gamer)
+def gamer_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    changed = refresh(GAMES, 'gamer_id', [instance.pk])
+    changed |= refresh(EVENTS, 'gamer_id', [instance.pk])
+    bump_gamer_versions(changed)
+
+
+@receiver(post_delete, sender=Gamer)
+def gamer_deleted(sender, instance, **kwargs):
+    changed = remove(GAMES, 'gamer_id', [instance.pk])
+    changed |= remove(EVENTS, 'gamer_id', [instance.pk])
+    bump_gamer_versions(changed)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, raw=False, **kwargs):
+    """Both reports show the gamer's full name"""
+    if raw or created:
+        return
+    gamer_ids = list(Gamer.objects.filter(user=instance).values_list('pk', flat=True))
+    changed = refresh(GAMES, 'gamer_id', gamer_ids)
+    changed |= refresh(EVENTS, 'gamer_id', gamer_ids)
+    bump_gamer_versions(changed)
@@ -0,0 +1,127 @@
+"""Pre-joined summary tables behind the report views
+
+Each summary table holds the rows a report used to build with a
+multi-way JOIN. Rows are refreshed from the source tables by the same
+SELECT, restricted to the ids that changed, so the incremental refresh
+and the full rebuild can never disagree.
+"""
+from collections import namedtuple
+from django.db import connection, transaction
+from levelupreports.models import UserEventSummary, UserGameSummary
+
+Summary = namedtuple('Summary', ['model', 'columns', 'select', 'keys'])
+
+GAMES = Summary(
+    model=UserGameSummary,
+    columns=('game_id', 'gamer_id', 'full_name', 'title', 'maker',
+             'number_of_players', 'skill_level', 'game_type_id'),
+    select="""
+        SELECT
+        g.id,
+        gr.id,
+        u.first_name || ' ' || u.last_name,
+        g.title,
+        g.maker,
+        g.number_of_players,
+        g.skill_level,
+        g.game_type_id
+        FROM levelupapi_game g
+        JOIN levelupapi_gamer gr on gr.id = g.gamer_id
+        JOIN auth_user u on u.id = gr.user_id
+    """,
+    # Summary column -> source column it is filtered on
+    keys={'game_id': 'g.id', 'gamer_id': 'gr.id'}
+)
+
+EVENTS = Summary(
+    model=UserEventSummary,
+    columns=('attendance_id', 'event_id', 'game_id', 'gamer_id', 'full_name',
+             'game_title', 'date', 'time'),
+    select="""
+        SELECT
+        eg.id,
+        e.id,
+        ga.id,
+        g.id,
+        u.first_name || ' ' || u.last_name,
+        ga.title,
+        e.date,
+        e.time
+        FROM levelupapi_eventgamer eg
+        JOIN levelupapi_event e on e.id = eg.event_id
+        JOIN levelupapi_gamer g on g.id = eg.gamer_id
+        JOIN auth_user u on u.id = g.user_id
+        JOIN levelupapi_game ga on ga.id = e.game_id
+    """,
+    keys={'attendance_id': 'eg.id', 'event_id': 'e.id',
+          'game_id': 'ga.id', 'gamer_id': 'g.id'}
+)
+
+# Stay well under SQLite's limit on bound parameters
+_BATCH_SIZE = 500
+
+
+def _batches(ids):
+    ids = sorted({pk for pk in ids if pk is not None})
+    for start in range(0, len(ids), _BATCH_SIZE):
+        yield ids[start:start + _BATCH_SIZE]
+
+
+def _gamer_ids(db_cursor, table, column, batch):
+    """Gamers owning the summary rows whose column matches the batch"""
+    if column == 'gamer_id':
+        return set(batch)
+    placeholders = ', '.join(['%s'] * len(batch))
+    db_cursor.execute(
+        f"SELECT DISTINCT gamer_id FROM {table} WHERE {column} IN ({placeholders})", batch)
+    return {row[0] for row in db_cursor.fetchall()}
+
+
+def remove(summary, column, ids):
+    """Delete the summary rows whose column matches any of the ids
+
+    Returns:
+        set -- Ids of the gamers whose rows were deleted
+    """
+    table = summary.model._meta.db_table
+    gamer_ids = set()
+    with transaction.atomic(), connection.cursor() as db_cursor:
+        for batch in _batches(ids):
+            gamer_ids |= _gamer_ids(db_cursor, table, column, batch)
+            placeholders = ', '.join(['%s'] * len(batch))
+            db_cursor.execute(
+                f"DELETE FROM {table} WHERE {column} IN ({placeholders})", batch)
+    return gamer_ids
+
+
+def refresh(summary, column, ids):
+    """Re-derive the summary rows whose column matches any of the ids
+
+    Returns:
+        set -- Ids of the gamers whose rows were replaced, before or after
+    """
+    table = summary.model._meta.db_table
+    columns = ', '.join(summary.columns)
+    gamer_ids = set()
+    with transaction.atomic(), connection.cursor() as db_cursor:
+        for batch in _batches(ids):
+            gamer_ids |= _gamer_ids(db_cursor, table, column, batch)
+            placeholders = ', '.join(['%s'] * len(batch))
+            db_cursor.execute(
+                f"DELETE FROM {table} WHERE {column} IN ({placeholders})", batch)
+            db_cursor.execute(
+                f"INSERT INTO {table} ({columns}) {summary.select} "
+                f"WHERE {summary.keys[column]} IN ({placeholders})", batch)
+            # A row can move to another gamer, e.g. when a game changes hands
+            gamer_ids |= _gamer_ids(db_cursor, table, column, batch)
+    return gamer_ids
+
+
+def rebuild(summary):
+    """Throw away and re-derive every row of a summary table"""
+    table = summary.model._meta.db_table
+    columns = ', '.join(summary.columns)
+    with transaction.atomic(), connection.cursor() as db_cursor:
+        db_cursor.execute(f"DELETE FROM {table}")
+        db_cursor.execute(f"INSERT INTO {table} ({columns}) {summary.select}")
+        return db_cursor.rowcount
@@ -0,0 +1,83 @@
+"""Streaming CSV and NDJSON exports of the report queries
+
+    http://localhost:8000/reports/usergames?format=csv
+    http://localhost:8000/reports/userevents?format=ndjson
+
+An export writes one flat line per row of the report's query, read from
+the cursor with fetchmany, so memory use does not grow with the size of
+the report, under WSGI and ASGI alike (see levelupapi/streaming.py).
+Exports are not paged; a date window still applies.
+"""
+import csv
+import io
+from django.conf import settings
+from django.db import connection
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
+from levelupapi.renderers import FastJSONRenderer, NDJSONRenderer
+from levelupapi.streaming import streaming_body
+from levelupreports.views.helpers import fetch_batches
+
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': NDJSONRenderer.media_type,
+}
+
+
+def _csv_chunks(columns, batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for rows in batches:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+    # Headers only, for an empty report
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def _ndjson_chunks(columns, batches):
+    renderer = FastJSONRenderer()
+    for rows in batches:
+        yield b''.join(renderer.render(dict(zip(columns, row))) + b'\n' for row in rows)
+
+
+def _export_chunks(sql, params, export_format):
+    """Run the query and yield the encoded export a fetchmany batch at a time"""
+    chunk_size = getattr(settings, 'LEVELUP_STREAM_CHUNK_SIZE', 2000)
+    chunks = _csv_chunks if export_format == 'csv' else _ndjson_chunks
+
+    # The cursor stays open until the last batch has been sent
+    with connection.cursor() as db_cursor:
+        db_cursor.execute(sql, params)
+        columns = [col[0] for col in db_cursor.description]
+        yield from chunks(columns, fetch_batches(db_cursor, chunk_size))
+
+
+def export_response(request, sql, filename, params=()):
+    """Stream a report as CSV or NDJSON when `?format=` asks for it
+
+    Method arguments:
+      request -- The report request
+      sql -- The report's SELECT, one output line per row
+      filename -- Download name without extension
+      params -- Parameters of the SELECT
+
+    Returns:
+        HttpResponse -- The export, a 400 for an unknown format, or None
+                        when the report should render as HTML
+    """
+    export_format = request.GET.get('format', '').lower()
+    if export_format in ('', 'html'):
+        return None
+    if export_format not in CONTENT_TYPES:
+        return HttpResponseBadRequest(f"Unknown format: {export_format}")
+
+    response = StreamingHttpResponse(
+        streaming_body(request, _export_chunks(sql, params, export_format)),
+        content_type=CONTENT_TYPES[export_format]
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{export_format}"'
+    return response
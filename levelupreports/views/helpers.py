@@ -1,8 +1,144 @@
-def dict_fetch_all(cursor):
-    """Return all rows from a cursor as a list of dictionaries"""
+"""Cursor helpers for the raw SQL reports
+
+Rows come back lazily, a fetchmany batch at a time, as namedtuples that
+share one class per column list instead of a dict per row repeating
+every column name. fetch_columns instead gathers a result set into one
+list per column.
+"""
+from collections import namedtuple
+from functools import lru_cache
+from itertools import chain
+from operator import itemgetter
+
+DEFAULT_BATCH_SIZE = 2000
+
+
+@lru_cache(maxsize=64)
+def _row_class(columns):
+    return namedtuple('Row', columns, rename=True)
+
+
+def row_type(cursor):
+    """Return the namedtuple class for the columns of an executed cursor"""
+    return _row_class(tuple(col[0] for col in cursor.description))
+
+
+def fetch_batches(cursor, size=DEFAULT_BATCH_SIZE):
+    """Yield the remaining rows of a cursor as lists of at most `size` tuples"""
+    while True:
+        rows = cursor.fetchmany(size)
+        if not rows:
+            return
+        yield rows
+
+
+def iter_rows(cursor, batch_size=DEFAULT_BATCH_SIZE):
+    """Lazily yield the rows of an executed cursor as namedtuples
+
+    Only one batch of rows is held at a time, so a report can be walked
+    from start to end in constant memory.
+    """
+    make = row_type(cursor)._make
+    for rows in fetch_batches(cursor, batch_size):
+        yield from map(make, rows)
+
+
+def fetch_columns(cursor, batch_size=DEFAULT_BATCH_SIZE):
+    """Fetch the rows of an executed cursor as one list per column
+
+    Returns:
+        dict -- {column name: list of that column's values, in row order}
+    """
     columns = [col[0] for col in cursor.description]
-    return [
-        dict(zip(columns, row))
-        for row in cursor.fetchall()
-    ]
+    values = [[] for _ in columns]
+    for rows in fetch_batches(cursor, batch_size):
+        for column, batch in zip(values, zip(*rows)):
+            column.extend(batch)
+    return dict(zip(columns, values))
+
+
+def _subscripts(row, names):
+    """Positions of the named columns in a namedtuple row, the names for a dict"""
+    fields = getattr(row, '_fields', None)
+    if fields is None:
+        return names
+    return tuple(fields.index(name) for name in names)
+
+
+def _readers(rows, key, group_fields, item_fields):
+    """Peek at the first row and build column readers that suit its type
+
+    Returns:
+        tuple -- (rows, key getter, group dict builder, item dict builder),
+                 or None when there are no rows
+    """
+    rows = iter(rows)
+    first = next(rows, None)
+    if first is None:
+        return None
+
+    def builder(fields):
+        pairs = tuple(zip(fields, _subscripts(first, fields)))
+        return lambda row: {field: row[at] for field, at in pairs}
+
+    key_at = _subscripts(first, (key,))[0]
+    return chain((first,), rows), itemgetter(key_at), builder(group_fields), builder(item_fields)
+
+
+def group_rows(rows, key, group_fields, item_fields, items_name):
+    """Group flat rows into one dictionary per key holding a list of items
+
+    The groups are indexed by key in a dictionary, so each row is placed
+    in constant time and the whole grouping is a single O(n) pass. Groups
+    come out in the order their key first appears.
+
+    Method arguments:
+      rows -- Iterable of row dictionaries or namedtuples
+      key -- Column that identifies a group, e.g. `gamer_id`
+      group_fields -- Columns copied once onto each group
+      item_fields -- Columns copied into each item of the group
+      items_name -- Name of the list of items on each group
+    """
+    readers = _readers(rows, key, group_fields, item_fields)
+    if readers is None:
+        return []
+    rows, get_key, build_group, build_item = readers
+
+    groups = {}
+    for row in rows:
+        row_key = get_key(row)
+        group = groups.get(row_key)
+        if group is None:
+            group = build_group(row)
+            group[items_name] = []
+            groups[row_key] = group
+        group[items_name].append(build_item(row))
+    return list(groups.values())
+
+
+def iter_grouped_rows(rows, key, group_fields, item_fields, items_name):
+    """Yield the same groups as group_rows from rows already sorted by key
+
+    When the SQL orders rows by the group key, a group is complete as soon
+    as the key changes, so groups can be handed on one at a time without
+    holding the others in memory.
+    """
+    readers = _readers(rows, key, group_fields, item_fields)
+    if readers is None:
+        return
+    rows, get_key, build_group, build_item = readers
+
+    group = None
+    current_key = None
+    for row in rows:
+        row_key = get_key(row)
+        if group is None or row_key != current_key:
+            if group is not None:
+                yield group
+            current_key = row_key
+            group = build_group(row)
+            group[items_name] = []
+        group[items_name].append(build_item(row))
 
+    if group is not None:
+        yield group
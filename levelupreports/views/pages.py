@@ -0,0 +1,118 @@
+"""Gamer-level keyset pages and date windows for the report views
+
+    http://localhost:8000/reports/usergames?after=120&page_size=25
+    http://localhost:8000/reports/userevents?from=2022-01-01&to=2022-03-31
+
+A report page holds whole gamers: `after` is the last gamer id of the
+previous page, so every page is an index seek on gamer_id and costs the
+same however deep it is. Date windows are plain conditions pushed down
+into the report's SQL.
+"""
+from django.conf import settings
+from django.utils.dateparse import parse_date
+
+MAX_PAGE_SIZE = 500
+
+
+def where_clause(conditions):
+    """Join SQL conditions into a WHERE clause, or nothing without any"""
+    if not conditions:
+        return ''
+    return 'WHERE ' + ' AND '.join(conditions)
+
+
+def _integer(request, param, default, minimum):
+    raw = request.GET.get(param)
+    if raw in (None, ''):
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        value = minimum - 1
+    if value < minimum:
+        raise ValueError(f"Invalid {param}: {raw}")
+    return value
+
+
+def date_window(request, column):
+    """Turn ?from=&to= into conditions on a date column, both ends inclusive
+
+    Returns:
+        tuple -- (list of SQL conditions, list of their parameters)
+
+    Raises:
+        ValueError -- For a date that is not YYYY-MM-DD
+    """
+    conditions, params = [], []
+    for param, operator in (('from', '>='), ('to', '<=')):
+        raw = request.GET.get(param)
+        if raw in (None, ''):
+            continue
+        try:
+            date = parse_date(raw)
+        except ValueError:
+            date = None
+        if date is None:
+            raise ValueError(f"Invalid {param}: {raw}")
+        conditions.append(f"{column} {operator} %s")
+        params.append(date)
+    return conditions, params
+
+
+class GamerPage:
+    """The gamers on one page of a report and the link to the next page"""
+
+    def __init__(self, request, gamer_ids, page_size):
+        self.gamer_ids = gamer_ids[:page_size]
+        self.has_next = len(gamer_ids) > page_size
+        self.is_first = 'after' not in request.GET
+        self.next_url = None
+        self.first_url = None
+
+        query = request.GET.copy()
+        query.pop('after', None)
+        if not self.is_first:
+            self.first_url = f"{request.path}?{query.urlencode()}"
+        if self.has_next:
+            query['after'] = self.gamer_ids[-1]
+            self.next_url = f"{request.path}?{query.urlencode()}"
+
+    def conditions(self, column):
+        """Conditions restricting the report query to this page's gamers
+
+        Returns:
+            tuple -- (list of SQL conditions, list of their parameters)
+        """
+        if not self.gamer_ids:
+            return ['1 = 0'], []
+        return [f"{column} BETWEEN %s AND %s"], [self.gamer_ids[0], self.gamer_ids[-1]]
+
+
+def gamer_page(request, db_cursor, table, conditions, params):
+    """Find the gamers on the requested page of a summary table
+
+    Reads one more gamer id than fits on the page, by seeking the
+    table's gamer_id index past `after`, to tell whether another page
+    follows. Only gamers with a row matching the conditions count.
+
+    Method arguments:
+      request -- The report request, read for `after` and `page_size`
+      db_cursor -- Cursor to run the query on
+      table -- Summary table, aliased `s` in the conditions
+      conditions, params -- The report's other filters, e.g. a date window
+
+    Raises:
+        ValueError -- For an `after` or `page_size` that is not a valid integer
+    """
+    default_size = getattr(settings, 'LEVELUP_REPORT_PAGE_SIZE', 50)
+    page_size = min(_integer(request, 'page_size', default_size, 1), MAX_PAGE_SIZE)
+    after = _integer(request, 'after', 0, 0)
+
+    db_cursor.execute(f"""
+        SELECT DISTINCT s.gamer_id
+        FROM {table} s
+        {where_clause(['s.gamer_id > %s', *conditions])}
+        ORDER BY s.gamer_id
+        LIMIT %s
+    """, [after, *params, page_size + 1])
+    return GamerPage(request, [row[0] for row in db_cursor.fetchall()], page_size)
@@ -1,71 +1,89 @@
 """Module for generating games by user report"""
+from django.conf import settings
+from django.http import HttpResponseBadRequest
 from django.shortcuts import render
 from django.db import connection
 from django.views import View
 
-from levelupreports.views.helpers import dict_fetch_all
+from levelupreports.cache import attach_versions, gamer_versions
+from levelupreports.views.export import export_response
+from levelupreports.views.helpers import group_rows, iter_rows
+from levelupreports.views.pages import date_window, gamer_page, where_clause
 
 
 class UserEventList(View):
-    def get(self, request):
-        with connection.cursor() as db_cursor:
+    table = 'levelupreports_usereventsummary'
 
-            # TODO: Write a query to get all games along with the gamer first name, last name, and id
-            db_cursor.execute("""
-                SELECT
-                e.date,
-                e.time,
-                u.first_name || " " || u.last_name as full_name,
-                g.id as gamer_id,
-                ga.title as game_title
-                FROM levelupapi_event e
-                JOIN levelupapi_eventgamer eg on e.id = eg.event_id
-                JOIN levelupapi_gamer g on eg.gamer_id = g.id
-                JOIN auth_user u on u.id = g.user_id
-                JOIN levelupapi_game ga on e.game_id = ga.id
-            """)
-            # Pass the db_cursor to the dict_fetch_all function to turn the fetch_all() response into a dictionary
-            dataset = dict_fetch_all(db_cursor)
+    # Attendance rows are pre-joined into the summary table by
+    # levelupreports/signals.py, so this is a single indexed scan
+    query = """
+        SELECT
+        s.date,
+        s.time,
+        s.full_name,
+        s.gamer_id,
+        s.game_title
+        FROM levelupreports_usereventsummary s
+        {where}
+        ORDER BY s.gamer_id, s.date, s.time
+    """
 
-            events_with_gamer = []
+    def get(self, request):
+        try:
+            # ?from=&to= narrow the report to events in a date window
+            conditions, params = date_window(request, 's.date')
+        except ValueError as ex:
+            return HttpResponseBadRequest(str(ex))
 
-            for row in dataset:
-                event = {
-                    'game_title': row['game_title'],
-                    'date': row['date'],
-                    'time': row['time']
-                }
+        # ?format=csv and ?format=ndjson stream the flat rows of the
+        # whole window instead of a page
+        export = export_response(
+            request, self.query.format(where=where_clause(conditions)),
+            filename='userevents', params=params)
+        if export is not None:
+            return export
+
+        with connection.cursor() as db_cursor:
+            try:
+                # Each page lists whole gamers, see levelupreports/views/pages.py
+                page = gamer_page(request, db_cursor, self.table, conditions, params)
+            except ValueError as ex:
+                return HttpResponseBadRequest(str(ex))
 
-                # This is using a generator comprehension to find the user_dict in the games_by_user list
-                # The next function grabs the dictionary at the beginning of the generator, if the generator is empty it returns None
-                # This code is equivalent to:
-                # user_dict = None
-                # for user_game in games_by_user:
-                #     if user_game['gamer_id'] == row['gamer_id']:
-                #         user_dict = user_game
+            # Stamps are read before the rows, so a section is never
+            # cached under a stamp newer than its data
+            versions = gamer_versions(page.gamer_ids)
 
-                user_dict = next(
-                    (user_event for user_event in events_with_gamer
-                     if user_event['gamer_id'] == row['gamer_id']),
-                    None
-                )
+            page_conditions, page_params = page.conditions('s.gamer_id')
+            db_cursor.execute(
+                self.query.format(where=where_clause(page_conditions + conditions)),
+                page_params + params)
+            # Rows are read lazily as namedtuples and grouped as they arrive
+            dataset = iter_rows(db_cursor)
 
-                if user_dict:
-                    user_dict['events'].append(event)
-                else:
+            # Nest each gamer's events under them in a single pass
+            events_with_gamer = group_rows(
+                dataset,
+                key='gamer_id',
+                group_fields=('gamer_id', 'full_name'),
+                item_fields=('game_title', 'date', 'time'),
+                items_name='events'
+            )
 
-                    events_with_gamer.append({
-                        "gamer_id": row['gamer_id'],
-                        "full_name": row['full_name'],
-                        "events": [event]
-                    })
+        # Each gamer's section is cached under their version stamp, so
+        # only gamers whose rows changed are rendered again
+        attach_versions(events_with_gamer, versions)
 
         # The template string must match the file name of the html template
         template = 'users/events_with_gamer.html'
 
         # The context will be a dictionary that the template can access to show data
         context = {
-            "user_events": events_with_gamer
+            "user_events": events_with_gamer,
+            "page": page,
+            "fragment_ttl": settings.LEVELUP_REPORT_FRAGMENT_TTL,
+            # Part of each fragment key, a gamer's section depends on it
+            "window": f"{request.GET.get('from', '')}:{request.GET.get('to', '')}"
         }
 
         return render(request, template, context)
@@ -1,31 +1,57 @@
 """Module for generating games by user report"""
+from django.conf import settings
+from django.http import HttpResponseBadRequest
 from django.shortcuts import render
 from django.db import connection
 from django.views import View
 
-from levelupreports.views.helpers import dict_fetch_all
+from levelupreports.cache import attach_versions, gamer_versions
+from levelupreports.views.export import export_response
+from levelupreports.views.helpers import group_rows, iter_rows
+from levelupreports.views.pages import gamer_page, where_clause
 
 
 class UserGameList(View):
+    table = 'levelupreports_usergamesummary'
+
+    # Games are pre-joined with their owner into the summary table by
+    # levelupreports/signals.py, so this is a single indexed scan
+    query = """
+        SELECT
+        s.title,
+        s.maker,
+        s.number_of_players,
+        s.skill_level,
+        s.game_type_id,
+        s.full_name,
+        s.gamer_id
+        FROM levelupreports_usergamesummary s
+        {where}
+        ORDER BY s.gamer_id, s.game_id
+    """
+
     def get(self, request):
+        # ?format=csv and ?format=ndjson stream the flat rows of the
+        # whole report instead of a page
+        export = export_response(request, self.query.format(where=''), filename='usergames')
+        if export is not None:
+            return export
+
         with connection.cursor() as db_cursor:
+            try:
+                # Each page lists whole gamers, see levelupreports/views/pages.py
+                page = gamer_page(request, db_cursor, self.table, [], [])
+            except ValueError as ex:
+                return HttpResponseBadRequest(str(ex))
 
-            # TODO: Write a query to get all games along with the gamer first name, last name, and id
-            db_cursor.execute("""
-                SELECT
-                g.title,
-                g.maker,
-                g.number_of_players,
-                g.skill_level,
-                g.game_type_id,
-                u.first_name || " " || u.last_name as full_name,
-                gr.id gamer_id
-                FROM levelupapi_game g
-                JOIN levelupapi_gamer gr on gr.id = g.gamer_id
-                JOIN auth_user u on u.id = gr.user_id
-            """)
-            # Pass the db_cursor to the dict_fetch_all function to turn the fetch_all() response into a dictionary
-            dataset = dict_fetch_all(db_cursor)
+            # Stamps are read before the rows, so a section is never
+            # cached under a stamp newer than its data
+            versions = gamer_versions(page.gamer_ids)
+
+            conditions, params = page.conditions('s.gamer_id')
+            db_cursor.execute(self.query.format(where=where_clause(conditions)), params)
+            # Rows are read lazily as namedtuples and grouped as they arrive
+            dataset = iter_rows(db_cursor)
 
             # Take the flat data from the dataset, and build the
             # following data structure for each gamer.
@@ -56,53 +82,28 @@ class UserGameList(View):
             #   },
             # ]
 
-            games_by_user = []
+            # Nest each gamer's games under them in a single pass
+            games_by_user = group_rows(
+                dataset,
+                key='gamer_id',
+                group_fields=('gamer_id', 'full_name'),
+                item_fields=('title', 'number_of_players', 'maker',
+                             'game_type_id', 'skill_level'),
+                items_name='games'
+            )
+
+        # Each gamer's section is cached under their version stamp, so
+        # only gamers whose rows changed are rendered again
+        attach_versions(games_by_user, versions)
 
-            for row in dataset:
-                # TODO: Create a dictionary called game that includes 
-                # the name, description, number_of_players, maker,
-                # game_type_id, and skill_level from the row dictionary
-                game = {
-                    'title': row['title'],
-                    'number_of_players': row['number_of_players'],
-                    'maker': row['maker'],
-                    'game_type_id': row['game_type_id'],
-                    'skill_level': row['skill_level']
-                }
-                
-                # This is using a generator comprehension to find the user_dict in the games_by_user list
-                # The next function grabs the dictionary at the beginning of the generator, if the generator is empty it returns None
-                # This code is equivalent to:
-                # user_dict = None
-                # for user_game in games_by_user:
-                #     if user_game['gamer_id'] == row['gamer_id']:
-                #         user_dict = user_game
-                
-                user_dict = next(
-                    (
-                        user_game for user_game in games_by_user
-                        if user_game['gamer_id'] == row['gamer_id']
-                    ),
-                    None
-                )
-                
-                if user_dict:
-                    # If the user_dict is already in the games_by_user list, append the game to the games list
-                    user_dict['games'].append(game)
-                else:
-                    # If the user is not on the games_by_user list, create and add the user to the list
-                    games_by_user.append({
-                        "gamer_id": row['gamer_id'],
-                        "full_name": row['full_name'],
-                        "games": [game]
-                    })
-        
         # The template string must match the file name of the html template
         template = 'users/list_with_games.html'
         
         # The context will be a dictionary that the template can access to show data
         context = {
-            "usergame_list": games_by_user
+            "usergame_list": games_by_user,
+            "page": page,
+            "fragment_ttl": settings.LEVELUP_REPORT_FRAGMENT_TTL
         }
 
         return render(request, template, context)
@@ -1,2 +1,10 @@
 from .game_tests import GameTests
-from .event_tests import EventTests
\ No newline at end of file
+from .event_tests import EventTests
+from .profile_tests import ProfileTests
+from .report_tests import ReportTests
+from .metrics_tests import RequestMetricsTests
+from .row_serializer_tests import RowSerializerTests
+from .renderer_tests import FastJSONRendererTests
+from .async_view_tests import AsyncViewTests
+from .database_tests import SQLitePragmaTests
+from .signup_race_tests import SignupRaceTests
@@ -0,0 +1,97 @@
+import json
+from unittest import mock
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+from levelupapi.models import GameType, Game, Gamer, Event, EventGamer
+
+
+@override_settings(ROOT_URLCONF='levelup.urls_asgi')
+class AsyncViewTests(APITestCase):
+    def setUp(self):
+        """
+        Create a gamer who hosts and attends an event
+        """
+        data = {
+            "username": "steve",
+            "password": "Admin8*",
+            "email": "steve@stevebrownlee.com",
+            "first_name": "Steve",
+            "last_name": "Brownlee",
+            "bio": "Love those gamez!!"
+        }
+        response = self.client.post("/register", data, format='json')
+        self.token = json.loads(response.content)["token"]
+        self.headers = {"headers": {"Authorization": "Token " + self.token}}
+        gamer = Gamer.objects.get(user__username="steve")
+
+        game_type = GameType.objects.create(label="Board game")
+        game = Game.objects.create(
+            title="Clue", maker="Milton Bradley", number_of_players=6,
+            skill_level=2, gamer=gamer, game_type=game_type)
+        self.event = Event.objects.create(
+            organizer=gamer, game=game, date="2021-12-23",
+            time="12:30:00", description="Game night")
+        EventGamer.objects.create(event=self.event, gamer=gamer)
+
+    async def assertSameAsSync(self, url):
+        """Fetch a URL through the async view and the DRF view and compare"""
+        with mock.patch('levelupapi.views.asynchronous._delegate',
+                        side_effect=AssertionError(f"{url} was delegated")):
+            response = await self.async_client.get(url, **self.headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        with override_settings(ROOT_URLCONF='levelup.urls'):
+            expected = await self.async_client.get(url, **self.headers)
+        self.assertEqual(response.content, expected.content)
+        self.assertEqual(response["ETag"], expected["ETag"])
+        return json.loads(response.content)
+
+    async def test_reads_match_sync_views(self):
+        """
+        Ensure the async views answer exactly like the DRF views
+        """
+        await self.assertSameAsSync("/gametypes")
+        await self.assertSameAsSync("/gametypes/1")
+        events = await self.assertSameAsSync("/events")
+        self.assertTrue(events[0]["joined"])
+        await self.assertSameAsSync(f"/events/{self.event.id}")
+
+        response = await self.async_client.get("/profile", **self.headers)
+        self.assertEqual(json.loads(response.content)["attending"][0]["game"]["title"], "Clue")
+
+    async def test_conditional_get(self):
+        """
+        Ensure the async views answer 304 for unchanged data
+        """
+        response = await self.async_client.get("/events", **self.headers)
+        response = await self.async_client.get(
+            "/events", headers={"Authorization": "Token " + self.token,
+                               "If-None-Match": response["ETag"]})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    async def test_stream_under_asgi(self):
+        """
+        Ensure streamed listings are pulled a chunk at a time under ASGI
+        """
+        response = await self.async_client.get("/events?stream=ndjson", **self.headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.is_async)
+        lines = b"".join([chunk async for chunk in response.streaming_content]).splitlines()
+        self.assertEqual(json.loads(lines[0])["id"], self.event.id)
+
+    async def test_delegates_to_sync_views(self):
+        """
+        Ensure writes, errors and query parameters are served by the DRF views
+        """
+        response = await self.async_client.get("/events")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        response = await self.async_client.get("/gametypes/99", **self.headers)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        response = await self.async_client.get("/events?page_size=1", **self.headers)
+        self.assertEqual(len(json.loads(response.content)["results"]), 1)
+
+        response = await self.async_client.delete(
+            f"/events/{self.event.id}", **self.headers)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,49 @@
+from django.db import connection
+from django.test import SimpleTestCase, override_settings
+from levelupapi.database import apply_sqlite_pragmas
+
+
+class SQLitePragmaTests(SimpleTestCase):
+    databases = {'default'}
+
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f"PRAGMA {name}")
+            return cursor.fetchone()[0]
+
+    def tearDown(self):
+        # Pragmas outlive the test on the shared in-memory connection
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA cache_size = -2000")
+            cursor.execute("PRAGMA busy_timeout = 0")
+
+    @override_settings(LEVELUP_SQLITE_PRAGMAS={'cache_size': -64000, 'busy_timeout': 5000})
+    def test_applies_configured_pragmas(self):
+        """New connections get every configured pragma"""
+        apply_sqlite_pragmas(sender=connection.__class__, connection=connection)
+
+        self.assertEqual(self.pragma('cache_size'), -64000)
+        self.assertEqual(self.pragma('busy_timeout'), 5000)
+
+    @override_settings(LEVELUP_SQLITE_PRAGMAS={})
+    def test_leaves_connection_alone_without_pragmas(self):
+        """Nothing runs when no pragmas are configured"""
+        before = self.pragma('cache_size')
+        apply_sqlite_pragmas(sender=connection.__class__, connection=connection)
+
+        self.assertEqual(self.pragma('cache_size'), before)
+
+    @override_settings(LEVELUP_SQLITE_PRAGMAS={'cache_size': '1; DROP TABLE auth_user'})
+    def test_rejects_unsafe_values(self):
+        """Values are formatted into the statement, so anything but a word is refused"""
+        with self.assertRaises(ValueError):
+            apply_sqlite_pragmas(sender=connection.__class__, connection=connection)
+
+    def test_production_profile_enables_wal(self):
+        """The production settings turn on WAL and keep connections open"""
+        # pylint: disable=import-outside-toplevel
+        from levelup import settings_production
+
+        self.assertEqual(settings_production.LEVELUP_SQLITE_PRAGMAS['journal_mode'], 'WAL')
+        self.assertEqual(settings_production.LEVELUP_SQLITE_PRAGMAS['synchronous'], 'NORMAL')
+        self.assertGreater(settings_production.DATABASES['default']['CONN_MAX_AGE'], 0)
@@ -1,7 +1,17 @@
+import datetime
 import json
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
 from rest_framework import status
+from rest_framework.authtoken.models import Token
 from rest_framework.test import APITestCase
-from levelupapi.models import GameType, Game, Gamer, Event
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models import F
+from django.utils import timezone
+from levelupapi.models import GameType, Game, Gamer, Event, EventGamer
+from levelupapi.views import event as event_views
 
 
 class EventTests(APITestCase):
@@ -158,4 +168,484 @@ class EventTests(APITestCase):
 
         response = self.client.delete(f'/events/{event.id}/signup')
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
-        self.assertEqual(len(event.attendees.all()), 0)
\ No newline at end of file
+        self.assertEqual(len(event.attendees.all()), 0)
+
+    def test_list_events_query_count(self):
+        """
+        Ensure listing events runs a constant number of queries
+        """
+        for i in range(10):
+            user = User.objects.create_user(
+                username=f"gamer{i}", password="Admin8*",
+                first_name=f"First{i}", last_name=f"Last{i}")
+            organizer = Gamer.objects.create(user=user, bio="Bio")
+            game = Game.objects.create(
+                game_type=self.game.game_type,
+                title=f"Game {i}",
+                maker="Hasbro",
+                gamer=organizer,
+                number_of_players=4,
+                skill_level=3
+            )
+            Event.objects.create(
+                organizer=organizer,
+                game=game,
+                time="12:30:00",
+                date="2021-12-23",
+                description=f"Event {i}"
+            )
+
+        # Token (with user and gamer) lookup, the event, game, gamer and
+        # tombstone version queries behind the ETag and a single events query
+        with self.assertNumQueries(6):
+            response = self.client.get('/events')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 10)
+        self.assertEqual(response.data[0]['game']['title'], "Game 0")
+        self.assertEqual(
+            response.data[0]['organizer']['user']['first_name'], "First0")
+
+    def test_paginate_events(self):
+        """
+        Ensure events can be walked one page at a time in calendar order
+        """
+        for date, time in [("2021-12-24", "09:00:00"), ("2021-12-23", "18:00:00"),
+                           ("2021-12-23", "12:00:00"), ("2021-12-23", "12:00:00"),
+                           ("2021-12-25", "08:00:00")]:
+            Event.objects.create(
+                organizer=self.gamer, game=self.game, date=date, time=time,
+                description="Game night")
+        expected = list(Event.objects.order_by(
+            'date', 'time', 'id').values_list('id', flat=True))
+
+        seen = []
+        pages = []
+        url = '/events?page_size=2'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pages.append(response.data)
+            seen.extend(event['id'] for event in response.data['results'])
+            url = response.data['next']
+
+        self.assertEqual(seen, expected)
+        self.assertEqual(len(pages), 3)
+        self.assertIsNone(pages[0]['previous'])
+
+        # Walk back from the last page
+        response = self.client.get(pages[-1]['previous'])
+        self.assertEqual(
+            [event['id'] for event in response.data['results']], expected[2:4])
+
+    def test_list_events_without_cursor(self):
+        """
+        Ensure clients that don't ask for a page still get a plain list
+        """
+        Event.objects.create(
+            organizer=self.gamer, game=self.game, date="2021-12-23",
+            time="12:00:00", description="Game night")
+
+        response = self.client.get('/events')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsInstance(response.data, list)
+
+        response = self.client.get('/events?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_stream_events(self):
+        """
+        Ensure events can be exported as NDJSON or a streamed JSON array
+        """
+        for description in ["Game night", "Tournament"]:
+            Event.objects.create(
+                organizer=self.gamer, game=self.game, date="2021-12-23",
+                time="12:00:00", description=description)
+        listed = self.client.get('/events').data
+
+        response = self.client.get('/events', HTTP_ACCEPT='application/x-ndjson')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line) for line in lines],
+                         json.loads(json.dumps(listed)))
+
+        response = self.client.get('/events?stream=1')
+        self.assertTrue(response.streaming)
+        self.assertEqual(json.loads(b''.join(response.streaming_content)),
+                         json.loads(json.dumps(listed)))
+
+    def test_signup_maintains_attendees_count(self):
+        """
+        Ensure joining and leaving keep the stored attendee count in step
+        """
+        event = Event.objects.create(
+            organizer=self.gamer, game=self.game, date="2021-12-23",
+            time="12:00:00", description="Game night")
+
+        self.client.post(f'/events/{event.id}/signup')
+        # Signing up twice doesn't count twice
+        self.client.post(f'/events/{event.id}/signup')
+        event.refresh_from_db()
+        self.assertEqual(event.attendees_count, 1)
+
+        response = self.client.get('/events')
+        self.assertEqual(response.data[0]['attendees_count'], 1)
+        self.assertTrue(response.data[0]['joined'])
+
+        self.client.delete(f'/events/{event.id}/signup')
+        event.refresh_from_db()
+        self.assertEqual(event.attendees_count, 0)
+
+    def test_reconcile_attendees(self):
+        """
+        Ensure the reconcile command repairs a drifted attendee count
+        """
+        event = Event.objects.create(
+            organizer=self.gamer, game=self.game, date="2021-12-23",
+            time="12:00:00", description="Game night", attendees_count=7)
+        event.attendees.add(self.gamer)
+
+        out = StringIO()
+        call_command('reconcile_attendees', stdout=out)
+        self.assertIn('Fixed 1 event(s)', out.getvalue())
+
+        event.refresh_from_db()
+        self.assertEqual(event.attendees_count, 1)
+
+    def test_bulk_create_events(self):
+        """
+        Ensure a batch of events is created together with per-item results
+        """
+        data = [
+            {"date": "2021-12-23", "time": "12:00:00",
+             "description": "Round 1", "gameId": self.game.id},
+            {"date": "2021-12-24", "time": "12:00:00",
+             "description": "Round 2", "gameId": self.game.id},
+            {"date": "not a date", "time": "12:00:00",
+             "description": "Round 3", "gameId": 999},
+        ]
+
+        response = self.client.post('/events/bulk', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual([result['status'] for result in response.data],
+                         [201, 201, 400])
+        self.assertEqual(response.data[1]['event']['description'], "Round 2")
+        self.assertEqual(response.data[1]['event']['game']['id'], self.game.id)
+        self.assertEqual(set(response.data[2]['errors']), {'date', 'gameId'})
+        self.assertEqual(Event.objects.count(), 2)
+
+    def test_bulk_signup(self):
+        """
+        Ensure an organizer can register a roster in one request
+        """
+        event = Event.objects.create(
+            organizer=self.gamer, game=self.game, date="2021-12-23",
+            time="12:00:00", description="Tournament")
+        roster = [
+            Gamer.objects.create(
+                user=User.objects.create_user(username=f"player{i}", password="Admin8*"),
+                bio="Bio")
+            for i in range(3)
+        ]
+        event.attendees.add(roster[0])
+        Event.objects.filter(pk=event.pk).update(attendees_count=1)
+
+        gamer_ids = [gamer.id for gamer in roster] + [999]
+        response = self.client.post(
+            f'/events/{event.id}/signup/bulk', {"gamerIds": gamer_ids}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual([result['status'] for result in response.data],
+                         [200, 201, 201, 400])
+
+        event.refresh_from_db()
+        self.assertEqual(event.attendees.count(), 3)
+        self.assertEqual(event.attendees_count, 3)
+
+    def test_conditional_get_events(self):
+        """
+        Ensure an unchanged event list answers 304 and a signup changes the ETag
+        """
+        event = Event.objects.create(
+            organizer=self.gamer, game=self.game, date="2021-12-23",
+            time="12:00:00", description="Game night")
+
+        response = self.client.get('/events')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+        self.assertIn('Last-Modified', response)
+
+        # Token lookup plus one version query per table and one for the
+        # tombstones, no serialization
+        with self.assertNumQueries(5):
+            response = self.client.get('/events', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.client.post(f'/events/{event.id}/signup')
+        response = self.client.get('/events', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+        # A single event validates against its own row, its game and its organizer
+        response = self.client.get(f'/events/{event.id}')
+        etag = response['ETag']
+        response = self.client.get(f'/events/{event.id}', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # The organizer's name is nested in the payload
+        list_etag = self.client.get('/events')['ETag']
+        self.gamer.user.first_name = "Stephen"
+        self.gamer.user.save()
+        response = self.client.get(f'/events/{event.id}', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['organizer']['user']['first_name'], "Stephen")
+        response = self.client.get('/events', HTTP_IF_NONE_MATCH=list_etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_conditional_get_events_after_delete(self):
+        """
+        Ensure deleting an event moves Last-Modified for If-Modified-Since clients
+        """
+        events = [
+            Event.objects.create(
+                organizer=self.gamer, game=self.game, date="2021-12-23",
+                time="12:00:00", description=f"Game night {i}")
+            for i in range(2)
+        ]
+        an_hour_ago = timezone.now() - datetime.timedelta(hours=1)
+        for model in (Event, Game, Gamer):
+            model.objects.update(updated_at=an_hour_ago)
+
+        last_modified = self.client.get('/events')['Last-Modified']
+        response = self.client.get('/events', HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.client.delete(f'/events/{events[0].id}')
+        response = self.client.get('/events', HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+        self.assertNotEqual(response['Last-Modified'], last_modified)
+
+    def test_filter_sort_and_pick_fields(self):
+        """
+        Ensure events can be filtered, sorted and trimmed on the server
+        """
+        chess = Game.objects.create(
+            game_type=self.game.game_type, title="Chess", maker="Anyone",
+            gamer=self.gamer, number_of_players=2, skill_level=4)
+        early = Event.objects.create(
+            organizer=self.gamer, game=self.game, date="2021-12-01",
+            time="18:00:00", description="Early")
+        full = Event.objects.create(
+            organizer=self.gamer, game=chess, date="2021-12-15",
+            time="10:00:00", description="Full", attendees_count=2)
+        late = Event.objects.create(
+            organizer=self.gamer, game=self.game, date="2021-12-31",
+            time="09:00:00", description="Late")
+        self.client.post(f'/events/{late.id}/signup')
+
+        def ids(url):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return [event['id'] for event in response.data]
+
+        self.assertEqual(ids(f'/events?gameId={chess.id}'), [full.id])
+        self.assertEqual(ids('/events?dateFrom=2021-12-10&dateTo=2021-12-20'), [full.id])
+        self.assertEqual(ids(f'/events?gameTypeId={chess.game_type_id}&skillLevel=4'), [full.id])
+        self.assertEqual(ids('/events?joined=true'), [late.id])
+        self.assertEqual(
+            ids('/events?hasFreeSlots=true&ordering=-date'), [late.id, early.id])
+        self.assertEqual(ids('/events?ordering=description'), [early.id, full.id, late.id])
+
+        response = self.client.get('/events?fields=id,date&ordering=date')
+        self.assertEqual(response.data[0], {'id': early.id, 'date': '2021-12-01'})
+
+        # Pages follow the requested sort too
+        response = self.client.get('/events?ordering=-date&page_size=2&fields=id')
+        self.assertEqual(response.data['results'], [{'id': late.id}, {'id': full.id}])
+        response = self.client.get(response.data['next'])
+        self.assertEqual(response.data['results'], [{'id': early.id}])
+
+        for url in ('/events?dateFrom=soon', '/events?ordering=game',
+                    '/events?fields=id,secret'):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_signup_respects_capacity(self):
+        """
+        Ensure signups stop at the game's number of players
+        """
+        duel = Game.objects.create(
+            game_type=self.game.game_type, title="Chess", maker="Anyone",
+            gamer=self.gamer, number_of_players=2, skill_level=4)
+        event = Event.objects.create(
+            organizer=self.gamer, game=duel, date="2021-12-23",
+            time="12:00:00", description="Duel")
+        rival = Gamer.objects.create(
+            user=User.objects.create_user(username="rival", password="Admin8*"), bio="Bio")
+        event.attendees.add(rival)
+        Event.objects.filter(pk=event.pk).update(attendees_count=1)
+
+        response = self.client.post(f'/events/{event.id}/signup')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        response = self.client.post(f'/events/{event.id}/signup')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        latecomer = Gamer.objects.create(
+            user=User.objects.create_user(username="late", password="Admin8*"), bio="Bio")
+        token = Token.objects.create(user=latecomer.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+        response = self.client.post(f'/events/{event.id}/signup')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+        event.refresh_from_db()
+        self.assertEqual(event.attendees_count, 2)
+        self.assertFalse(event.attendees.filter(pk=latecomer.pk).exists())
+
+    def test_bulk_signup_respects_capacity(self):
+        """
+        Ensure a roster larger than the free seats is cut off in order
+        """
+        event = Event.objects.create(
+            organizer=self.gamer, game=self.game, date="2021-12-23",
+            time="12:00:00", description="Tournament")
+        Event.objects.filter(pk=event.pk).update(attendees_count=3)
+        roster = [
+            Gamer.objects.create(
+                user=User.objects.create_user(username=f"player{i}", password="Admin8*"),
+                bio="Bio")
+            for i in range(3)
+        ]
+
+        response = self.client.post(
+            f'/events/{event.id}/signup/bulk',
+            {"gamerIds": [gamer.id for gamer in roster]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual([result['status'] for result in response.data], [201, 201, 409])
+
+        event.refresh_from_db()
+        self.assertEqual(event.attendees_count, self.game.number_of_players)
+        self.assertEqual(event.attendees.count(), 2)
+
+    def test_bulk_signup_repeats_and_races(self):
+        """
+        Ensure repeated and concurrently signed up gamers keep the count exact
+        """
+        first, second = [
+            Gamer.objects.create(
+                user=User.objects.create_user(username=f"player{i}", password="Admin8*"),
+                bio="Bio")
+            for i in range(2)
+        ]
+        event = Event.objects.create(
+            organizer=self.gamer, game=self.game, date="2021-12-23",
+            time="12:00:00", description="Tournament")
+        Event.objects.filter(pk=event.pk).update(attendees_count=4)
+
+        # One seat left: a repeat of a turned away gamer is turned away again
+        response = self.client.post(
+            f'/events/{event.id}/signup/bulk',
+            {"gamerIds": [first.id, second.id, second.id, first.id]}, format='json')
+        self.assertEqual([result['status'] for result in response.data], [201, 409, 409, 200])
+        event.refresh_from_db()
+        self.assertEqual(event.attendees_count, 5)
+        self.assertEqual(list(event.attendees.all()), [first])
+
+        # The first gamer signs up on their own while the roster is seated
+        event = Event.objects.create(
+            organizer=self.gamer, game=self.game, date="2021-12-24",
+            time="12:00:00", description="Rematch")
+        claim_seats = event_views._claim_seats
+
+        def claim_after_solo_signup(event, seats):
+            EventGamer.objects.create(event=event, gamer=first)
+            Event.objects.filter(pk=event.pk).update(attendees_count=F('attendees_count') + 1)
+            return claim_seats(event, seats)
+
+        with mock.patch('levelupapi.views.event._claim_seats', claim_after_solo_signup):
+            response = self.client.post(
+                f'/events/{event.id}/signup/bulk',
+                {"gamerIds": [first.id, second.id]}, format='json')
+        self.assertEqual([result['status'] for result in response.data], [200, 201])
+        event.refresh_from_db()
+        self.assertEqual(event.attendees_count, 2)
+        self.assertEqual(event.attendees.count(), 2)
+
+    def test_starts_at_follows_date_and_time(self):
+        """
+        Ensure starts_at is kept in step on save, update and bulk create
+        """
+        event = Event.objects.create(
+            date="2021-11-11", time="12:30:00", description="Describe",
+            game=self.game, organizer=self.gamer)
+        self.assertEqual(event.starts_at, datetime.datetime(
+            2021, 11, 11, 12, 30, tzinfo=datetime.timezone.utc))
+
+        data = {"date": "2021-11-12", "time": "18:00:00", "description": "Moved",
+                "game_id": self.game.id}
+        self.client.put(f"/events/{event.id}", data, format="json")
+        event.refresh_from_db()
+        self.assertEqual(event.starts_at, datetime.datetime(
+            2021, 11, 12, 18, 0, tzinfo=datetime.timezone.utc))
+
+        event.time = datetime.time(20, 0)
+        event.save(update_fields=['time'])
+        event.refresh_from_db()
+        self.assertEqual(event.starts_at.hour, 20)
+
+        data = [{"date": "2021-12-23", "time": "09:15:00",
+                 "description": "Bulk", "gameId": self.game.id}]
+        self.client.post('/events/bulk', data, format='json')
+        self.assertEqual(Event.objects.get(description="Bulk").starts_at, datetime.datetime(
+            2021, 12, 23, 9, 15, tzinfo=datetime.timezone.utc))
+
+    def test_upcoming_events(self):
+        """
+        Ensure /events/upcoming lists the earliest events in the window, in order
+        """
+        now = timezone.now()
+        for days, description in ((-1, "Past"), (3, "Later"), (1, "Soon"), (10, "Far")):
+            moment = now + datetime.timedelta(days=days)
+            Event.objects.create(
+                date=moment.date(), time=moment.time().replace(microsecond=0),
+                description=description, game=self.game, organizer=self.gamer)
+
+        response = self.client.get("/events/upcoming")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([event["description"] for event in response.data],
+                         ["Soon", "Later", "Far"])
+        self.assertIn("joined", response.data[0])
+
+        until = (now + datetime.timedelta(days=5)).date().isoformat()
+        response = self.client.get(f"/events/upcoming?to={until}&limit=1&fields=id,description")
+        self.assertEqual(response.data, [
+            {"id": Event.objects.get(description="Soon").id, "description": "Soon"}])
+
+        # A date-only `to` takes in the whole day, a datetime is exclusive
+        later = Event.objects.get(description="Later").starts_at
+        response = self.client.get("/events/upcoming", {"to": later.date().isoformat()})
+        self.assertEqual([event["description"] for event in response.data], ["Soon", "Later"])
+        response = self.client.get("/events/upcoming", {"to": later.isoformat()})
+        self.assertEqual([event["description"] for event in response.data], ["Soon"])
+
+        since = (now - datetime.timedelta(days=2)).isoformat()
+        response = self.client.get("/events/upcoming", {"from": since, "limit": 2})
+        self.assertEqual([event["description"] for event in response.data], ["Past", "Soon"])
+
+        for query in ("from=tomorrow", "limit=0", f"from={until}&to=2000-01-01"):
+            response = self.client.get(f"/events/upcoming?{query}")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, query)
+
+    def test_upcoming_events_use_starts_at_index(self):
+        """
+        Ensure the upcoming query is a range scan of the index, with no sort step
+        """
+        events = Event.objects.filter(starts_at__gte=timezone.now()).order_by('starts_at', 'id')
+        with connection.cursor() as cursor:
+            sql, params = events[:10].query.sql_with_params()
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            plan = " ".join(row[-1] for row in cursor.fetchall())
+
+        self.assertIn("event_starts_at_id_idx", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
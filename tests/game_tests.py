@@ -1,7 +1,12 @@
+import datetime
 import json
+from django.db import connection
+from django.utils import timezone
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 from rest_framework.test import APITestCase
-from levelupapi.models import GameType, Game, Gamer
+from levelupapi.cache import invalidate_game_types
+from levelupapi.models import GameType, Game, Gamer, Event
 
 class GameTests(APITestCase):
     def setUp(self):
@@ -163,3 +168,176 @@ class GameTests(APITestCase):
         # GET GAME AGAIN TO VERIFY 404 response
         response = self.client.get(f"/game/{game.id}")
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_paginate_games(self):
+        """
+        Ensure games can be walked one page at a time
+        """
+        for title in ["Sorry", "Clue", "Risk"]:
+            Game.objects.create(
+                game_type_id=1, skill_level=2, title=title, maker="Hasbro",
+                number_of_players=4, gamer_id=1)
+
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
+        response = self.client.get("/games?page_size=2")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [game["title"] for game in response.data["results"]], ["Sorry", "Clue"])
+
+        response = self.client.get(response.data["next"])
+        self.assertEqual(
+            [game["title"] for game in response.data["results"]], ["Risk"])
+        self.assertIsNone(response.data["next"])
+
+    def test_conditional_get_game_types(self):
+        """
+        Ensure game types answer 304 until one of them changes
+        """
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
+        response = self.client.get("/gametypes")
+        etag = response["ETag"]
+
+        response = self.client.get("/gametypes", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        response = self.client.get(
+            "/gametypes", HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        GameType.objects.create(label="Card game")
+        response = self.client.get("/gametypes", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 2)
+
+        # Dropping a type moves Last-Modified past the remaining rows
+        GameType.objects.update(updated_at=timezone.now() - datetime.timedelta(hours=1))
+        invalidate_game_types()
+        last_modified = self.client.get("/gametypes")["Last-Modified"]
+        GameType.objects.filter(label="Card game").delete()
+        response = self.client.get("/gametypes", HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+
+    def test_conditional_get_games_follow_gamer(self):
+        """
+        Ensure the games' ETags change when the nested gamer's bio does
+        """
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
+        gamer = Gamer.objects.get(user__username="steve")
+        game = Game.objects.create(
+            title="Clue", maker="Milton Bradley", number_of_players=6,
+            skill_level=2, gamer=gamer, game_type=GameType.objects.first())
+        etags = {url: self.client.get(url)["ETag"] for url in ("/games", f"/games/{game.id}")}
+
+        gamer.bio = "Dice everywhere"
+        gamer.save()
+        for url, etag in etags.items():
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["gamer"]["bio"], "Dice everywhere")
+
+    def test_conditional_get_games_follow_event_counts(self):
+        """
+        Ensure new events change the games' ETag only when a count is returned
+        """
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
+        gamer = Gamer.objects.get(user__username="steve")
+        game = Game.objects.create(
+            title="Clue", maker="Milton Bradley", number_of_players=6,
+            skill_level=2, gamer=gamer, game_type=GameType.objects.first())
+        urls = ("/games", "/games?fields=id,title", "/games?fields=id&ordering=-event_count")
+        etags = {url: self.client.get(url)["ETag"] for url in urls}
+
+        Event.objects.create(
+            date="2022-01-01", time="12:00:00", description="Murder mystery",
+            game=game, organizer=gamer)
+        statuses = {
+            url: self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code
+            for url, etag in etags.items()
+        }
+        self.assertEqual(statuses, {
+            "/games": status.HTTP_200_OK,
+            "/games?fields=id,title": status.HTTP_304_NOT_MODIFIED,
+            "/games?fields=id&ordering=-event_count": status.HTTP_200_OK,
+        })
+
+    def test_game_type_catalog_cache(self):
+        """
+        Ensure game types are served from the cache and refreshed on change
+        """
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
+        self.client.get("/gametypes")
+
+        # Only the token lookup; the catalog is already in memory
+        with self.assertNumQueries(1):
+            response = self.client.get("/gametypes/1")
+        self.assertEqual(response.data["label"], "Board game")
+
+        game_type = GameType.objects.get(pk=1)
+        game_type.label = "Tabletop game"
+        game_type.save()
+        response = self.client.get("/gametypes/1")
+        self.assertEqual(response.data["label"], "Tabletop game")
+
+        response = self.client.get("/gametypes/99")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_game_type_validated_from_cache(self):
+        """
+        Ensure games are written and listed without reading game types
+        """
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
+        data = {
+            "gameTypeId": 1,
+            "skillLevel": 5,
+            "title": "Clue",
+            "maker": "Milton Bradley",
+            "numberOfPlayers": 6,
+        }
+        self.client.get("/gametypes")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post("/games", data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(any(
+            'FROM "levelupapi_gametype"' in query['sql'] for query in queries))
+        self.assertEqual(response.data["game_type"]["label"], "Board game")
+
+        data["gameTypeId"] = 99
+        response = self.client.post("/games", data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get("/games")
+        self.assertEqual(response.data[0]["game_type"]["label"], "Board game")
+
+    def test_filter_sort_and_pick_fields(self):
+        """
+        Ensure games can be filtered, sorted and trimmed on the server
+        """
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
+        gamer = Gamer.objects.get(user__username="steve")
+        game_type = GameType.objects.get(pk=1)
+        clue = Game.objects.create(
+            title="Clue", maker="Milton Bradley", number_of_players=6,
+            skill_level=2, gamer=gamer, game_type=game_type)
+        chess = Game.objects.create(
+            title="Chess", maker="Anyone", number_of_players=2,
+            skill_level=5, gamer=gamer, game_type=game_type)
+        for day in (1, 2):
+            Event.objects.create(
+                organizer=gamer, game=chess, date=f"2021-12-0{day}",
+                time="12:00:00", description="Tournament")
+
+        response = self.client.get("/games?skillLevel=5&fields=id,title")
+        self.assertEqual(response.data, [{"id": chess.id, "title": "Chess"}])
+
+        response = self.client.get("/games?type=1&ordering=-event_count,title")
+        self.assertEqual([game["id"] for game in response.data], [chess.id, clue.id])
+
+        response = self.client.get("/games?ordering=title&page_size=1&fields=title")
+        self.assertEqual(response.data["results"], [{"title": "Chess"}])
+        response = self.client.get(response.data["next"])
+        self.assertEqual(response.data["results"], [{"title": "Clue"}])
+
+        response = self.client.get("/games?skillLevel=hard")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,76 @@
+import json
+import re
+import time
+from unittest import mock
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+from levelupapi.models import GameType
+
+
+class RequestMetricsTests(APITestCase):
+    def setUp(self):
+        """
+        Create a new account to make authenticated requests with
+        """
+        data = {
+            "username": "steve",
+            "password": "Admin8*",
+            "email": "steve@stevebrownlee.com",
+            "first_name": "Steve",
+            "last_name": "Brownlee",
+            "bio": "Love those gamez!!"
+        }
+        response = self.client.post("/register", data, format='json')
+        self.token = json.loads(response.content)["token"]
+
+    def make_client(self):
+        """Middleware is loaded on a client's first request, so use a fresh one"""
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
+        return client
+
+    @override_settings(LEVELUP_REQUEST_METRICS=True, LEVELUP_SLOW_QUERY_MS=0)
+    def test_server_timing_and_log(self):
+        """
+        Ensure timings are sent as a header and logged, with slow queries
+        """
+        with self.assertLogs('levelup.requests', level='INFO') as logs:
+            response = self.make_client().get("/gametypes")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        timing = response['Server-Timing']
+        for metric in ('db;dur=', 'desc="1 queries"', 'ser;dur=', 'app;dur=',
+                       'render;dur=', 'total;dur='):
+            self.assertIn(metric, timing)
+
+        self.assertIn('path=/gametypes status=200 queries=1', logs.output[0])
+        self.assertIn('ser_ms=', logs.output[0])
+        self.assertTrue(any('slow_query' in line for line in logs.output[1:]))
+
+    @override_settings(LEVELUP_REQUEST_METRICS=True)
+    def test_serializer_time(self):
+        """
+        Ensure time spent building serializer data is reported as ser, not app
+        """
+        def slow_representation(serializer, instance):
+            time.sleep(0.05)
+            return {}
+
+        game_type = GameType.objects.create(label="Board game")
+        with self.assertLogs('levelup.requests', level='INFO'), mock.patch(
+                'levelupapi.views.game_type.GameTypeSerializer.to_representation',
+                slow_representation):
+            response = self.make_client().get(f"/gametypes/{game_type.id}")
+
+        timings = dict(re.findall(r'(\w+);dur=([\d.]+)', response['Server-Timing']))
+        self.assertGreaterEqual(float(timings['ser']), 50)
+        self.assertLess(float(timings['app']), 50)
+
+    @override_settings(LEVELUP_REQUEST_METRICS=False)
+    def test_disabled(self):
+        """
+        Ensure nothing is added when the middleware is switched off
+        """
+        response = self.make_client().get("/gametypes")
+        self.assertNotIn('Server-Timing', response)
@@ -0,0 +1,118 @@
+import json
+from django.core.cache import caches
+from django.test import override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework import status
+from rest_framework.test import APITestCase
+from levelupapi.authentication import forget_tokens
+from levelupapi.models import GameType, Game, Gamer, Event
+
+
+class ProfileTests(APITestCase):
+    def setUp(self):
+        """
+        Create a new account with a game and an event it hosts
+        """
+        caches['profiles'].clear()
+        forget_tokens()
+
+        url = "/register"
+        data = {
+            "username": "steve",
+            "password": "Admin8*",
+            "email": "steve@stevebrownlee.com",
+            "first_name": "Steve",
+            "last_name": "Brownlee",
+            "bio": "Love those gamez!!"
+        }
+        response = self.client.post(url, data, format='json')
+        json_response = json.loads(response.content)
+        self.token = json_response["token"]
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
+
+        self.gamer = Gamer.objects.get(user=1)
+        game_type = GameType.objects.create(label="Board game")
+        self.game = Game.objects.create(
+            game_type=game_type,
+            title="Monopoly",
+            maker="Hasbro",
+            gamer=self.gamer,
+            number_of_players=5,
+            skill_level=2
+        )
+        self.event = Event.objects.create(
+            organizer=self.gamer,
+            game=self.game,
+            date="2021-12-23",
+            time="12:00:00",
+            description="Game night"
+        )
+
+    def test_profile_is_cached(self):
+        """
+        Ensure a repeated profile request is served from the cache
+        """
+        response = self.client.get("/profile")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["hosting"]), 1)
+        self.assertEqual(response.data["gamer"]["bio"], "Love those gamez!!")
+
+        # Only the token lookup runs on a cache hit
+        with self.assertNumQueries(1):
+            cached = self.client.get("/profile")
+        self.assertEqual(json.loads(cached.content), json.loads(response.content))
+
+    def test_profile_invalidated_by_signup(self):
+        """
+        Ensure joining and leaving an event refreshes the cached profile
+        """
+        response = self.client.get("/profile")
+        self.assertEqual(response.data["attending"], [])
+
+        self.client.post(f"/events/{self.event.id}/signup")
+        response = self.client.get("/profile")
+        self.assertEqual(len(response.data["attending"]), 1)
+
+        self.client.delete(f"/events/{self.event.id}/signup")
+        response = self.client.get("/profile")
+        self.assertEqual(response.data["attending"], [])
+
+    def test_profile_invalidated_by_game_change(self):
+        """
+        Ensure renaming a game refreshes the titles in the cached profile
+        """
+        self.client.get("/profile")
+
+        self.game.title = "Monopoly Deluxe"
+        self.game.save()
+
+        response = self.client.get("/profile")
+        self.assertEqual(
+            response.data["hosting"][0]["game"]["title"], "Monopoly Deluxe")
+
+    def test_profile_invalidated_by_event_delete(self):
+        """
+        Ensure deleting a hosted event drops it from the cached profile
+        """
+        self.client.get("/profile")
+        self.event.delete()
+
+        response = self.client.get("/profile")
+        self.assertEqual(response.data["hosting"], [])
+
+    @override_settings(LEVELUP_TOKEN_CACHE_TTL=60)
+    def test_cached_token_skips_database(self):
+        """
+        Ensure a cached token and profile answer without any query, and
+        that revoking the token takes effect immediately
+        """
+        self.client.get("/profile")
+
+        with self.assertNumQueries(0):
+            response = self.client.get("/profile")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        Token.objects.filter(key=self.token).delete()
+        response = self.client.get("/profile")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        forget_tokens()
@@ -0,0 +1,69 @@
+import datetime
+import decimal
+import uuid
+from collections import OrderedDict
+from unittest import mock
+from django.test import SimpleTestCase
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+from levelupapi.renderers import FastJSONRenderer
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    payload = [
+        OrderedDict([
+            ('id', 1),
+            ('date', datetime.date(2021, 12, 23)),
+            ('time', datetime.time(12, 30, 15, 250)),
+            ('updated_at', datetime.datetime(
+                2021, 12, 23, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc)),
+            ('naive', datetime.datetime(2021, 12, 23, 12, 30)),
+            ('price', decimal.Decimal('12.50')),
+            ('uuid', uuid.UUID('12345678-1234-5678-1234-567812345678')),
+            ('description', 'Game night\u2028\u2029 café \U0001F3B2 "quoted"'),
+            ('label', gettext_lazy('Board game')),
+            ('tags', ('a', 'b')),
+            ('joined', True),
+            ('missing', None),
+        ]),
+        {1: 'int key', 'nested': {'depth': [1, 2, {'x': []}]}},
+        2 ** 70,
+    ]
+
+    def assertSameBytes(self, data, media_type=None, context=None):
+        expected = JSONRenderer().render(data, media_type, context)
+        self.assertEqual(FastJSONRenderer().render(data, media_type, context), expected)
+        return expected
+
+    def test_matches_stdlib_renderer(self):
+        """
+        Ensure the fast renderer produces exactly the bytes DRF's renderer does
+        """
+        rendered = self.assertSameBytes(self.payload)
+        self.assertIn(b'\\u2028', rendered)
+        self.assertIn(b'"2021-12-23T12:30:15.123456Z"', rendered)
+
+        self.assertSameBytes(self.payload[:2])
+        self.assertSameBytes(None)
+        self.assertSameBytes({})
+
+    def test_indent_and_fallback(self):
+        """
+        Ensure indented output and a missing orjson go through the stdlib
+        """
+        self.assertSameBytes(self.payload, 'application/json; indent=4')
+        self.assertSameBytes(self.payload, None, {'indent': 2})
+
+        with mock.patch('levelupapi.renderers.orjson', None):
+            self.assertSameBytes(self.payload)
+
+    def test_rejects_what_stdlib_rejects(self):
+        """
+        Ensure aware times fail the same way they do with the stdlib renderer
+        """
+        aware = datetime.time(12, 30, tzinfo=timezone.get_fixed_timezone(60))
+        with self.assertRaises(ValueError):
+            JSONRenderer().render({'time': aware})
+        with self.assertRaises(ValueError):
+            FastJSONRenderer().render({'time': aware})
@@ -0,0 +1,340 @@
+import csv
+import json
+from io import StringIO
+from unittest import mock
+from django.contrib.auth.models import User
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from levelupapi.models import GameType, Game, Gamer, Event
+from levelupreports.cache import clear_report_fragments, gamer_versions
+from levelupreports.models import UserEventSummary, UserGameSummary
+from levelupreports.views.helpers import (
+    fetch_columns, group_rows, iter_grouped_rows, iter_rows)
+
+
+# The default reports cache is a shared directory in $TMPDIR, which
+# clear_report_fragments() below would wipe
+@override_settings(CACHES={
+    **settings.CACHES,
+    'reports': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'levelup-reports-tests',
+    },
+})
+class ReportTests(TestCase):
+    def setUp(self):
+        """
+        Create two gamers with games and an event each of them attends
+        """
+        clear_report_fragments()
+        game_type = GameType.objects.create(label="Board game")
+        self.gamers = []
+        for first_name in ("Admina", "Steve"):
+            user = User.objects.create_user(
+                username=first_name.lower(), password="Admin8*",
+                first_name=first_name, last_name="Straytor")
+            self.gamers.append(Gamer.objects.create(user=user, bio="Bio"))
+
+        self.games = [
+            Game.objects.create(
+                game_type=game_type, title=title, maker="Hasbro",
+                gamer=gamer, number_of_players=4, skill_level=2)
+            for title, gamer in (("Clue", self.gamers[0]), ("Sorry", self.gamers[1]),
+                                 ("Risk", self.gamers[0]))
+        ]
+        event = Event.objects.create(
+            organizer=self.gamers[0], game=self.games[0], date="2021-12-23",
+            time="12:00:00", description="Game night")
+        event.attendees.add(*self.gamers)
+        self.event = event
+
+    def test_games_by_user_report(self):
+        """
+        Ensure every gamer is listed once with all of their games
+        """
+        response = self.client.get("/reports/usergames")
+        self.assertEqual(response.status_code, 200)
+
+        usergames = response.context["usergame_list"]
+        self.assertEqual([user["full_name"] for user in usergames],
+                         ["Admina Straytor", "Steve Straytor"])
+        self.assertEqual([game["title"] for game in usergames[0]["games"]],
+                         ["Clue", "Risk"])
+        self.assertContains(response, "Title: Sorry")
+
+    def test_events_by_user_report(self):
+        """
+        Ensure every attendee is listed once with the events they attend
+        """
+        response = self.client.get("/reports/userevents")
+        self.assertEqual(response.status_code, 200)
+
+        user_events = response.context["user_events"]
+        self.assertEqual(len(user_events), 2)
+        self.assertEqual(user_events[1]["events"][0]["game_title"], "Clue")
+
+    @override_settings(LEVELUP_STREAM_CHUNK_SIZE=1)
+    def test_games_by_user_csv_export(self):
+        """
+        Ensure ?format=csv streams one line per game, batch by batch
+        """
+        response = self.client.get("/reports/usergames?format=csv")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        self.assertIn('filename="usergames.csv"', response["Content-Disposition"])
+
+        chunks = list(response.streaming_content)
+        rows = list(csv.reader(StringIO(b"".join(chunks).decode())))
+        self.assertEqual(rows[0], ["title", "maker", "number_of_players", "skill_level",
+                                   "game_type_id", "full_name", "gamer_id"])
+        self.assertEqual([row[0] for row in rows[1:]], ["Clue", "Risk", "Sorry"])
+        self.assertEqual(rows[1][5], "Admina Straytor")
+        # The header rides with the first batch, then one batch per row
+        self.assertEqual(len(chunks), 3)
+
+    @override_settings(LEVELUP_STREAM_CHUNK_SIZE=1)
+    async def test_csv_export_under_asgi(self):
+        """
+        Ensure exports stream chunk by chunk under ASGI instead of being listed
+        """
+        response = await self.async_client.get("/reports/usergames?format=csv")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_async)
+
+        chunks = [chunk async for chunk in response.streaming_content]
+        rows = list(csv.reader(StringIO(b"".join(chunks).decode())))
+        self.assertEqual([row[0] for row in rows[1:]], ["Clue", "Risk", "Sorry"])
+        self.assertEqual(len(chunks), 3)
+
+    def test_events_by_user_ndjson_export(self):
+        """
+        Ensure ?format=ndjson streams one JSON object per attendance
+        """
+        response = self.client.get("/reports/userevents?format=ndjson")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual([row["gamer_id"] for row in rows],
+                         [gamer.id for gamer in self.gamers])
+        self.assertEqual(rows[0], {
+            "date": "2021-12-23", "time": "12:00:00", "full_name": "Admina Straytor",
+            "gamer_id": self.gamers[0].id, "game_title": "Clue"})
+
+    def test_export_of_empty_report_and_unknown_format(self):
+        """
+        Ensure an empty CSV export still has its header and bad formats are refused
+        """
+        UserGameSummary.objects.all().delete()
+        response = self.client.get("/reports/usergames?format=csv")
+        self.assertEqual(b"".join(response.streaming_content).decode().strip(),
+                         "title,maker,number_of_players,skill_level,game_type_id,full_name,gamer_id")
+
+        response = self.client.get("/reports/usergames?format=xml")
+        self.assertEqual(response.status_code, 400)
+
+    def test_reports_page_by_gamer(self):
+        """
+        Ensure report pages hold whole gamers and link to the next page
+        """
+        response = self.client.get("/reports/usergames?page_size=1")
+        self.assertEqual(response.status_code, 200)
+        usergames = response.context["usergame_list"]
+        self.assertEqual(len(usergames), 1)
+        self.assertEqual([game["title"] for game in usergames[0]["games"]], ["Clue", "Risk"])
+
+        page = response.context["page"]
+        self.assertIsNone(page.first_url)
+        self.assertIn(f"after={self.gamers[0].id}", page.next_url)
+        self.assertContains(response, "Next page")
+
+        response = self.client.get(page.next_url)
+        self.assertEqual(response.context["usergame_list"][0]["full_name"], "Steve Straytor")
+        self.assertIsNone(response.context["page"].next_url)
+        self.assertEqual(response.context["page"].first_url, "/reports/usergames?page_size=1")
+
+        response = self.client.get(f"/reports/userevents?page_size=1&after={self.gamers[1].id}")
+        self.assertEqual(response.context["user_events"], [])
+
+        for query in ("page_size=0", "after=x", "page_size=-1"):
+            response = self.client.get(f"/reports/usergames?{query}")
+            self.assertEqual(response.status_code, 400, query)
+
+    def test_events_report_date_window(self):
+        """
+        Ensure ?from=&to= limit the events report and its export to the window
+        """
+        later = Event.objects.create(
+            organizer=self.gamers[1], game=self.games[1], date="2022-02-01",
+            time="18:00:00", description="Sorry night")
+        later.attendees.add(self.gamers[1])
+
+        response = self.client.get("/reports/userevents?from=2022-01-01")
+        user_events = response.context["user_events"]
+        self.assertEqual([user["full_name"] for user in user_events], ["Steve Straytor"])
+        self.assertEqual([event["game_title"] for event in user_events[0]["events"]], ["Sorry"])
+
+        response = self.client.get("/reports/userevents?to=2021-12-31")
+        self.assertEqual(
+            [len(user["events"]) for user in response.context["user_events"]], [1, 1])
+
+        response = self.client.get("/reports/userevents?from=2022-01-01&to=2022-02-01&format=ndjson")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line)["game_title"] for line in lines], ["Sorry"])
+
+        response = self.client.get("/reports/userevents?from=2022-13-01")
+        self.assertEqual(response.status_code, 400)
+
+    def test_report_sections_cached_per_gamer(self):
+        """
+        Ensure a gamer's cached section is rendered again only after their rows change
+        """
+        self.client.get("/reports/usergames")
+        versions = gamer_versions([gamer.id for gamer in self.gamers])
+
+        # Bypass the signals: the cached sections keep the old titles
+        UserGameSummary.objects.update(title="Stale")
+        response = self.client.get("/reports/usergames")
+        self.assertContains(response, "Title: Sorry")
+        self.assertNotContains(response, "Title: Stale")
+
+        # Nobody attends an event of this game, so only its owner changes
+        with self.captureOnCommitCallbacks(execute=True):
+            self.games[2].title = "Risk Legacy"
+            self.games[2].save()
+
+        after = gamer_versions([gamer.id for gamer in self.gamers])
+        self.assertNotEqual(after[self.gamers[0].id], versions[self.gamers[0].id])
+        self.assertEqual(after[self.gamers[1].id], versions[self.gamers[1].id])
+
+        # Only the owner's section is rendered from the table again
+        response = self.client.get("/reports/usergames")
+        self.assertContains(response, "Title: Risk Legacy")
+        self.assertContains(response, "Title: Stale")
+        self.assertContains(response, "Title: Sorry")
+
+        # Renaming a game both gamers attend retires both their sections
+        with self.captureOnCommitCallbacks(execute=True):
+            self.games[0].title = "Cluedo"
+            self.games[0].save()
+
+        final = gamer_versions([gamer.id for gamer in self.gamers])
+        self.assertNotEqual(final[self.gamers[1].id], after[self.gamers[1].id])
+        response = self.client.get("/reports/userevents")
+        self.assertContains(response, "Cluedo", count=2)
+
+    def test_report_stamps_read_before_rows(self):
+        """
+        Ensure a write landing between a page's two reads is not cached as current
+        """
+        self.client.get("/reports/usergames")
+
+        def write_then_read(gamer_ids):
+            # The write commits and bumps between the page's reads
+            with self.captureOnCommitCallbacks(execute=True):
+                self.games[1].title = "Sorry!"
+                self.games[1].save()
+            return gamer_versions(gamer_ids)
+
+        with mock.patch('levelupreports.views.users.gamesbyuser.gamer_versions',
+                        side_effect=write_then_read):
+            response = self.client.get("/reports/usergames")
+        self.assertContains(response, "Title: Sorry!")
+
+        response = self.client.get("/reports/usergames")
+        self.assertContains(response, "Title: Sorry!")
+
+    def test_group_rows(self):
+        """
+        Ensure grouping keeps first-seen order and the sorted variant agrees
+        """
+        rows = [
+            {"gamer_id": 2, "full_name": "B", "title": "x"},
+            {"gamer_id": 1, "full_name": "A", "title": "y"},
+            {"gamer_id": 2, "full_name": "B", "title": "z"},
+        ]
+        grouped = group_rows(rows, "gamer_id", ("gamer_id", "full_name"),
+                             ("title",), "games")
+        self.assertEqual(grouped, [
+            {"gamer_id": 2, "full_name": "B", "games": [{"title": "x"}, {"title": "z"}]},
+            {"gamer_id": 1, "full_name": "A", "games": [{"title": "y"}]},
+        ])
+
+        rows.sort(key=lambda row: row["gamer_id"])
+        streamed = list(iter_grouped_rows(rows, "gamer_id", ("gamer_id", "full_name"),
+                                          ("title",), "games"))
+        self.assertEqual(streamed, sorted(grouped, key=lambda group: group["gamer_id"]))
+
+    def test_cursor_helpers(self):
+        """
+        Ensure iter_rows, fetch_columns and the grouping agree on one query
+        """
+        query = """
+            SELECT s.gamer_id, s.full_name, s.title
+            FROM levelupreports_usergamesummary s
+            ORDER BY s.gamer_id, s.game_id
+        """
+        with connection.cursor() as db_cursor:
+            db_cursor.execute(query)
+            rows = iter_rows(db_cursor, batch_size=2)
+            first = next(rows)
+            rows = [first, *rows]
+
+        self.assertEqual(first._fields, ("gamer_id", "full_name", "title"))
+        self.assertEqual([row.title for row in rows], ["Clue", "Risk", "Sorry"])
+        self.assertEqual(
+            group_rows(rows, "gamer_id", ("gamer_id", "full_name"), ("title",), "games"),
+            group_rows([row._asdict() for row in rows], "gamer_id",
+                       ("gamer_id", "full_name"), ("title",), "games"))
+
+        with connection.cursor() as db_cursor:
+            db_cursor.execute(query)
+            columns = fetch_columns(db_cursor, batch_size=2)
+
+        self.assertEqual(columns, {
+            "gamer_id": [self.gamers[0].id, self.gamers[0].id, self.gamers[1].id],
+            "full_name": ["Admina Straytor", "Admina Straytor", "Steve Straytor"],
+            "title": ["Clue", "Risk", "Sorry"],
+        })
+
+    def test_summaries_follow_changes(self):
+        """
+        Ensure the summary tables pick up renames, departures and deletes
+        """
+        self.assertEqual(UserGameSummary.objects.count(), 3)
+        self.assertEqual(UserEventSummary.objects.count(), 2)
+
+        self.games[0].title = "Cluedo"
+        self.games[0].save()
+        self.assertEqual(
+            set(UserEventSummary.objects.values_list("game_title", flat=True)), {"Cluedo"})
+
+        user = self.gamers[1].user
+        user.last_name = "Brownlee"
+        user.save()
+        self.assertEqual(
+            UserGameSummary.objects.get(game_id=self.games[1].pk).full_name,
+            "Steve Brownlee")
+
+        self.event.attendees.remove(self.gamers[1])
+        self.assertEqual(UserEventSummary.objects.count(), 1)
+
+        self.games[0].delete()
+        self.assertEqual(UserEventSummary.objects.count(), 0)
+        self.assertEqual(UserGameSummary.objects.count(), 2)
+
+    def test_rebuild_reports(self):
+        """
+        Ensure the rebuild command restores summary rows that went missing
+        """
+        UserGameSummary.objects.all().delete()
+        UserEventSummary.objects.all().delete()
+
+        out = StringIO()
+        call_command("rebuild_reports", stdout=out)
+        self.assertIn("with 3 row(s)", out.getvalue())
+        self.assertEqual(UserEventSummary.objects.count(), 2)
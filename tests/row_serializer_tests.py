@@ -0,0 +1,90 @@
+import json
+from django.core.cache import caches
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+from levelupapi.cache import PROFILE_CACHE
+from levelupapi.models import GameType, Game, Gamer, Event, EventGamer
+
+
+class RowSerializerTests(APITestCase):
+    def setUp(self):
+        """
+        Create a gamer who hosts and attends events of two games
+        """
+        data = {
+            "username": "steve",
+            "password": "Admin8*",
+            "email": "steve@stevebrownlee.com",
+            "first_name": "Steve",
+            "last_name": "Brownlee",
+            "bio": "Love those gamez!!"
+        }
+        response = self.client.post("/register", data, format='json')
+        self.client.credentials(
+            HTTP_AUTHORIZATION='Token ' + json.loads(response.content)["token"])
+        gamer = Gamer.objects.get(user__username="steve")
+
+        board = GameType.objects.create(label="Board game")
+        cards = GameType.objects.create(label="Card game – édition")
+        clue = Game.objects.create(
+            title="Clue", maker="Milton Bradley", number_of_players=6,
+            skill_level=2, gamer=gamer, game_type=board)
+        Game.objects.create(
+            title="Uno", maker="Mattel", number_of_players=10,
+            skill_level=1, gamer=gamer, game_type=cards)
+        first = Event.objects.create(
+            organizer=gamer, game=clue, date="2021-12-23",
+            time="12:30:00", description="Game night \U0001F3B2")
+        Event.objects.create(
+            organizer=gamer, game=clue, date="2022-01-05",
+            time="09:00:15", description="Rematch")
+        EventGamer.objects.create(event=first, gamer=gamer)
+        Event.objects.filter(pk=first.pk).update(attendees_count=1)
+
+    def assertSamePayload(self, url):
+        """Fetch a URL through both serializer paths and compare the bytes"""
+        bodies = []
+        for fast in (False, True):
+            caches[PROFILE_CACHE].clear()
+            with override_settings(LEVELUP_FAST_SERIALIZERS=fast):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            if response.streaming:
+                bodies.append(b''.join(response.streaming_content))
+            else:
+                bodies.append(response.content)
+        self.assertEqual(bodies[0], bodies[1])
+        return json.loads(bodies[1]) if not url.endswith('ndjson') else bodies[1]
+
+    def test_events_identical(self):
+        """
+        Ensure the event row serializer matches EventSerializer byte for byte
+        """
+        events = self.assertSamePayload("/events")
+        self.assertEqual(len(events), 2)
+        self.assertTrue(events[0]["joined"])
+        self.assertEqual(list(events[0]["game"]), [
+            "id", "title", "maker", "number_of_players", "skill_level",
+            "game_type", "gamer"])
+        self.assertSamePayload("/events?page_size=1")
+        self.assertSamePayload("/events?stream=ndjson")
+
+    def test_games_identical(self):
+        """
+        Ensure the game row serializer matches GameSerializer byte for byte
+        """
+        games = self.assertSamePayload("/games")
+        self.assertEqual([game["event_count"] for game in games], [2, 0])
+        self.assertEqual(list(games[0]["game_type"]), ["id", "label"])
+        self.assertEqual(list(games[0]["gamer"]), ["id", "bio", "user"])
+        self.assertSamePayload("/games?page_size=1")
+        self.assertSamePayload("/games?stream=1")
+
+    def test_profile_identical(self):
+        """
+        Ensure the profile built from rows matches the serializers byte for byte
+        """
+        profile = self.assertSamePayload("/profile")
+        self.assertEqual(len(profile["hosting"]), 2)
+        self.assertEqual(profile["attending"][0]["game"]["title"], "Clue")
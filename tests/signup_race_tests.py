@@ -0,0 +1,66 @@
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connections
+from django.test import Client, TransactionTestCase, override_settings
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from levelupapi.models import Event, EventGamer, Game, Gamer, GameType
+
+
+@override_settings(CACHES={
+    **settings.CACHES,
+    'reports': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'levelup-reports-tests',
+    },
+})
+class SignupRaceTests(TransactionTestCase):
+    """Signups from many threads at once, each on its own connection"""
+    capacity = 5
+    threads = 8
+
+    def setUp(self):
+        users = User.objects.bulk_create(
+            [User(username=f"racer{i}") for i in range(20)])
+        gamers = Gamer.objects.bulk_create([Gamer(user=user, bio="") for user in users])
+        self.keys = [Token.objects.create(user=user).key for user in users]
+
+        game = Game.objects.create(
+            game_type=GameType.objects.create(label="Board game"), title="Popular",
+            maker="Anyone", gamer=gamers[0], number_of_players=self.capacity,
+            skill_level=1)
+        self.event = Event.objects.create(
+            game=game, organizer=gamers[0], date="2022-01-01", time="12:00:00",
+            description="Everyone wants in")
+
+    def test_concurrent_signups_respect_capacity(self):
+        """
+        Ensure racing signups fill the event exactly and never overbook it
+        """
+        url = f"/events/{self.event.id}/signup"
+
+        def signup(key):
+            try:
+                response = Client().post(url, HTTP_AUTHORIZATION=f"Token {key}")
+                return response.status_code, response.json().get('message')
+            finally:
+                connections.close_all()
+
+        # Every gamer tries twice, so repeats race their own first attempt
+        with ThreadPoolExecutor(max_workers=self.threads) as pool:
+            results = Counter(pool.map(signup, self.keys * 2))
+
+        # Database errors also answer 200, so the messages are checked too
+        self.assertLessEqual(set(results), {
+            (status.HTTP_200_OK, 'Already attending.'),
+            (status.HTTP_201_CREATED, None),
+            (status.HTTP_409_CONFLICT, 'Event is full.'),
+        })
+        self.assertEqual(results[(status.HTTP_201_CREATED, None)], self.capacity)
+
+        self.event.refresh_from_db()
+        rows = EventGamer.objects.filter(event=self.event).count()
+        self.assertEqual(self.event.attendees_count, rows)
+        self.assertLessEqual(rows, self.capacity)